@@ -0,0 +1,139 @@
+import math
+import time
+
+# ==== АРХІВ ====
+# рядків за одне читання з бази
+ARCHIVE_PAGE_SIZE = 100
+# скільки сторінок тримаємо в RecycleView одночасно
+ARCHIVE_WINDOW_PAGES = 3
+# за скільки рядків до краю вікна підтягуємо сусідню сторінку
+ARCHIVE_PREFETCH_ROWS = 30
+
+
+def format_session_row(session: dict) -> dict:
+    """Рядок списку архівних сесій."""
+    finished_at = session.get("finished_at") or 0.0
+    started_at = session.get("started_at") or finished_at
+    when = time.strftime("%d.%m.%Y %H:%M", time.localtime(started_at))
+    parts = [f"{when}–{time.strftime('%H:%M', time.localtime(finished_at))}"]
+    distance_m = session.get("distance_m")
+    if distance_m:
+        parts.append(f"{distance_m:g} м")
+    if session.get("caliber"):
+        parts.append(session["caliber"])
+    parts.append(f"пострілів: {session.get('shot_count', 0)}")
+    return {"text": "  ·  ".join(parts), "session_id": session["session_id"], "session": session}
+
+
+class WindowedPager:
+    """Ковзне вікно рядків RecycleView над довгим списком у базі.
+
+    У data лежить не більше window_pages сторінок, починаючи з рядка start
+    повного списку. Коли видима частина підходить до краю вікна, сусідня
+    сторінка читається у фоновому потоці бази, а дальня з протилежного боку
+    відкидається. Висота рядка фіксована (default_size), тож видимі рядки
+    рахуються прямо зі scroll_y, а позиція після зсуву вікна зберігається.
+    """
+
+    def __init__(
+        self,
+        rv,
+        page_size: int = ARCHIVE_PAGE_SIZE,
+        window_pages: int = ARCHIVE_WINDOW_PAGES,
+        prefetch_rows: int = ARCHIVE_PREFETCH_ROWS,
+    ):
+        self.rv = rv
+        self.page_size = page_size
+        self.window_rows = page_size * max(window_pages, 2)
+        self.prefetch_rows = prefetch_rows
+        self.start = 0
+        self.total = 0
+        self._fetch = None
+        self._build_rows = None
+        self._generation = 0
+        self._loading = False
+        rv.bind(scroll_y=self._on_scroll, height=self._on_scroll)
+
+    def reset(self, fetch, build_rows) -> None:
+        """Новий список: fetch(offset, limit, callback(total, page)), build_rows(page)."""
+        self._fetch = fetch
+        self._build_rows = build_rows
+        self._generation += 1
+        self._loading = False
+        self.start = 0
+        self.total = 0
+        self.rv.data = []
+        self.rv.scroll_y = 1.0
+        self._request(0, self.page_size, True)
+
+    def clear(self) -> None:
+        self._fetch = None
+        self._generation += 1
+        self._loading = False
+        self.start = 0
+        self.total = 0
+        self.rv.data = []
+
+    # ---- вікно ----
+
+    def _row_height(self) -> float:
+        return self.rv.layout_manager.default_size[1]
+
+    def _top_px(self) -> float:
+        overflow = len(self.rv.data) * self._row_height() - self.rv.height
+        return (1.0 - self.rv.scroll_y) * max(overflow, 0.0)
+
+    def _scroll_to(self, top_px: float) -> None:
+        overflow = len(self.rv.data) * self._row_height() - self.rv.height
+        if overflow <= 0:
+            self.rv.scroll_y = 1.0
+            return
+        self.rv.scroll_y = 1.0 - min(max(top_px, 0.0), overflow) / overflow
+
+    def _on_scroll(self, *_args) -> None:
+        if self._loading or self._fetch is None:
+            return
+        count = len(self.rv.data)
+        row_height = self._row_height()
+        first = int(self._top_px() // row_height)
+        last = first + math.ceil(self.rv.height / row_height)
+        if last + self.prefetch_rows >= count and self.start + count < self.total:
+            self._request(self.start + count, self.page_size, True)
+        elif first < self.prefetch_rows and self.start > 0:
+            offset = max(self.start - self.page_size, 0)
+            self._request(offset, self.start - offset, False)
+
+    def _request(self, offset: int, limit: int, at_end: bool) -> None:
+        self._loading = True
+        generation = self._generation
+        self._fetch(
+            offset,
+            limit,
+            lambda total, page: self._on_page(generation, offset, at_end, total, page),
+        )
+
+    def _on_page(self, generation: int, offset: int, at_end: bool, total: int, page) -> None:
+        if generation != self._generation:
+            return  # відповідь для попереднього списку
+        self._loading = False
+        self.total = total
+        rows = self._build_rows(page)
+        data = list(self.rv.data)
+        top_px = self._top_px()
+        if at_end:
+            data.extend(rows)
+            dropped = max(len(data) - self.window_rows, 0)
+            del data[:dropped]
+            self.start = offset + len(rows) - len(data)
+            top_px -= dropped * self._row_height()
+        else:
+            data[:0] = rows
+            del data[self.window_rows:]
+            self.start = offset
+            top_px += len(rows) * self._row_height()
+        self.rv.data = data
+        # розкладка одразу, щоб зберегти позицію ще до кадру
+        self.rv.refresh_views()
+        self._scroll_to(top_px)
+        if rows:
+            self._on_scroll()
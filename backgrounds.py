@@ -0,0 +1,187 @@
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+
+from kivy.clock import Clock
+from kivy.core.image import ImageLoader
+from kivy.graphics.texture import Texture
+
+# NumPy не обовʼязковий: без нього зменшуємо проріджуванням рядків
+from lazy import numpy
+
+# файл у user_data_dir з розмірами зображень (щоб знати пропорцію без декодування)
+BACKGROUND_META_NAME = "backgrounds.json"
+# скільки різних фонів тримаємо в памʼяті (поточний + кілька попередніх)
+BACKGROUND_CACHE_SIZE = 3
+
+
+def _channels(fmt: str) -> int:
+    return {"luminance": 1, "luminance_alpha": 2}.get(fmt, len(fmt))
+
+
+def _downscale(data: bytes, width: int, height: int, fmt: str, factor: int):
+    """Зменшує сирі пікселі в factor разів -> (bytes, width, height)."""
+    channels = _channels(fmt)
+    stride = len(data) // height
+    out_w = width // factor
+    out_h = height // factor
+    np = numpy()
+    if np is not None:
+        pixels = np.frombuffer(data, dtype=np.uint8, count=stride * height)
+        pixels = pixels.reshape(height, stride)[:, :width * channels]
+        pixels = pixels.reshape(height, width, channels)[:out_h * factor, :out_w * factor]
+        # середнє по квадрату factor x factor — без муару на тонких кільцях
+        sums = np.zeros((out_h, out_w, channels), dtype=np.uint32)
+        for row in range(factor):
+            for column in range(factor):
+                sums += pixels[row::factor, column::factor]
+        return (sums // (factor * factor)).astype(np.uint8).tobytes(), out_w, out_h
+
+    rows = []
+    step = factor * channels
+    for row in range(0, out_h * factor, factor):
+        line = data[row * stride:row * stride + width * channels]
+        out = bytearray(out_w * channels)
+        for channel in range(channels):
+            out[channel::channels] = line[channel::step][:out_w]
+        rows.append(bytes(out))
+    return b"".join(rows), out_w, out_h
+
+
+class BackgroundTextures:
+    """Спільні фонові текстури мішеней: одна на файл на весь процес.
+
+    Декодування — у фоновому потоці, зменшення до роздільності екрана там же;
+    текстура з mipmap створюється в Kivy-потоці. Розміри зображень пишуться
+    у файл-супутник, тож пропорцію для розкладки відомо ще до декодування.
+    """
+
+    def __init__(self, cache_size: int = BACKGROUND_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.meta_path = None
+        self.max_side = 0  # 0 — без зменшення
+        self._textures: OrderedDict = OrderedDict()
+        self._waiting: dict[str, list] = {}
+        self._meta = None
+
+    def configure(self, meta_path=None, max_side: int = 0) -> None:
+        self.meta_path = meta_path
+        self.max_side = int(max_side)
+        self._meta = None
+
+    # ---- пропорція ----
+
+    def ratio(self, path: str):
+        """width / height з кешу чи файлу-супутника; None, якщо ще не декодували."""
+        key = os.path.abspath(path)
+        entry = self._load_meta().get(key)
+        if not entry or entry.get("stamp") != self._stamp(key):
+            return None
+        try:
+            return float(entry["width"]) / float(entry["height"])
+        except (KeyError, TypeError, ValueError, ZeroDivisionError):
+            return None
+
+    # ---- текстури ----
+
+    def request(self, path: str, callback):
+        """Готова текстура одразу або None і пізніше callback(path, texture, ratio)."""
+        key = os.path.abspath(path)
+        texture = self._textures.get(key)
+        if texture is not None:
+            self._textures.move_to_end(key)
+            return texture
+        waiting = self._waiting.get(key)
+        if waiting is not None:
+            waiting.append(callback)
+            return None
+        self._waiting[key] = [callback]
+        threading.Thread(
+            target=self._decode,
+            args=(key, self.max_side),
+            name="background-decode",
+            daemon=True,
+        ).start()
+        return None
+
+    def clear(self) -> None:
+        self._textures.clear()
+
+    def _decode(self, key: str, max_side: int) -> None:
+        try:
+            # ImageLoader без populate() не чіпає GL — безпечно поза Kivy-потоком
+            image = ImageLoader.load(key, keep_data=True, nocache=True)
+            data = image._data[0]
+            width, height = data.width, data.height
+            pixels = data.data
+            factor = math.ceil(max(width, height) / max_side) if max_side else 1
+            if factor > 1:
+                pixels, out_w, out_h = _downscale(pixels, width, height, data.fmt, factor)
+            else:
+                out_w, out_h = width, height
+            decoded = (pixels, out_w, out_h, data.fmt, data.flip_vertical, width, height)
+        except Exception as error:
+            print("Не вдалося завантажити фон", key, ":", error)
+            decoded = None
+        Clock.schedule_once(lambda _dt: self._finish(key, decoded), 0)
+
+    def _finish(self, key: str, decoded) -> None:
+        callbacks = self._waiting.pop(key, [])
+        texture = None
+        ratio = None
+        if decoded is not None:
+            pixels, out_w, out_h, fmt, flip_vertical, width, height = decoded
+            texture = Texture.create(size=(out_w, out_h), colorfmt=fmt, mipmap=True)
+            texture.min_filter = "linear_mipmap_linear"
+            texture.blit_buffer(pixels, colorfmt=fmt, bufferfmt="ubyte")
+            if flip_vertical:
+                texture.flip_vertical()
+            self._textures[key] = texture
+            while len(self._textures) > self.cache_size:
+                self._textures.popitem(last=False)
+            ratio = width / float(height)
+            self._remember_size(key, width, height)
+        for callback in callbacks:
+            callback(key, texture, ratio)
+
+    # ---- файл-супутник ----
+
+    @staticmethod
+    def _stamp(key: str):
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return None
+        return [stat.st_size, int(stat.st_mtime)]
+
+    def _load_meta(self) -> dict:
+        if self._meta is None:
+            self._meta = {}
+            if self.meta_path and os.path.exists(self.meta_path):
+                try:
+                    with open(self.meta_path, "r", encoding="utf-8") as handle:
+                        self._meta = json.load(handle)
+                except (OSError, ValueError) as error:
+                    print("Пошкоджений кеш розмірів фону:", error)
+        return self._meta
+
+    def _remember_size(self, key: str, width: int, height: int) -> None:
+        meta = self._load_meta()
+        entry = {"width": width, "height": height, "stamp": self._stamp(key)}
+        if meta.get(key) == entry:
+            return
+        meta[key] = entry
+        if not self.meta_path:
+            return
+        temp_path = self.meta_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                json.dump(meta, handle)
+            os.replace(temp_path, self.meta_path)
+        except OSError as error:
+            print("Не вдалося зберегти розміри фону:", error)
+
+
+background_textures = BackgroundTextures()
@@ -0,0 +1,179 @@
+import math
+from collections import OrderedDict
+from functools import lru_cache
+
+# NumPy не обовʼязковий: без нього пакетні розрахунки йдуть чистим Python
+from lazy import numpy
+
+MM_IN_METER = 1000.0
+MOA_IN_RADIANS = math.radians(1 / 60.0)
+MIL_IN_RADIANS = 0.001
+
+UNIT_MOA = "MOA"
+UNIT_MIL = "MIL"
+UNIT_RADIANS = {
+    UNIT_MOA: MOA_IN_RADIANS,
+    UNIT_MIL: MIL_IN_RADIANS,
+}
+
+# ціна кліку барабанчика прицілу: назва -> (одиниця, крок)
+CLICK_VALUES = {
+    "1/8 MOA": (UNIT_MOA, 0.125),
+    "1/4 MOA": (UNIT_MOA, 0.25),
+    "1/2 MOA": (UNIT_MOA, 0.5),
+    "0.1 MIL": (UNIT_MIL, 0.1),
+}
+DEFAULT_CLICK = "1/4 MOA"
+
+# скільки відформатованих поправок (постріл, дистанція) тримаємо в памʼяті
+ADJUSTMENT_CACHE_SIZE = 8192
+# менше за це — вважаємо нулем
+_ZERO_EPSILON = 1e-6
+
+
+@lru_cache(maxsize=64)
+def mm_per_unit(unit: str, distance_m: float) -> float:
+    """Скільки мм на мішені дає одна одиниця (MOA/MIL) на дистанції."""
+    return math.tan(UNIT_RADIANS[unit]) * distance_m * MM_IN_METER
+
+
+class AdjustmentEngine:
+    """Поправки прицілу в кліках: одиночні (з кешем) і пакетні для цілих колонок."""
+
+    def __init__(
+        self,
+        click: str = DEFAULT_CLICK,
+        cache_size: int = ADJUSTMENT_CACHE_SIZE,
+    ):
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self.configure(click)
+
+    def configure(self, click: str) -> None:
+        unit, step = CLICK_VALUES[click]
+        self.click = click
+        self.unit = unit
+        self.step = step
+        # три знаки після коми вистачає для 1/8 MOA
+        self._decimals = 3 if step < 0.25 else 2
+        self._cache.clear()
+
+    # ---- одиночні значення ----
+
+    def to_units(self, value_mm: float, distance_m: float) -> float:
+        scale = mm_per_unit(self.unit, distance_m)
+        if scale == 0:
+            return 0.0
+        return value_mm / scale
+
+    def clicks(self, value_units: float) -> int:
+        """Кількість кліків (за модулем), округлення вгору — як і раніше."""
+        magnitude = abs(value_units)
+        if magnitude < _ZERO_EPSILON:
+            return 0
+        return math.ceil(magnitude / self.step)
+
+    def format_value(self, value_units: float) -> str:
+        return self._format_clicks(self.clicks(value_units))
+
+    def format_axis(
+        self,
+        value_mm: float,
+        distance_m: float,
+        positive_label: str,
+        negative_label: str,
+    ) -> tuple[str, str]:
+        clicks = self._signed_clicks(self.to_units(value_mm, distance_m))
+        direction = positive_label if clicks >= 0 else negative_label
+        return direction, self._format_clicks(abs(clicks))
+
+    def format_adjustment(
+        self,
+        x_mm: float,
+        y_mm: float,
+        distance_m: float,
+        shot_id=None,
+    ) -> str:
+        """'U 1.25     R 0.5' для одного пострілу; результат кешується."""
+        key = (shot_id, x_mm, y_mm, distance_m)
+        text = self._cache.get(key)
+        if text is not None:
+            self._cache.move_to_end(key)
+            return text
+
+        text = self._format_pair(
+            self.to_units(y_mm, distance_m),
+            self.to_units(x_mm, distance_m),
+        )
+        self._cache[key] = text
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return text
+
+    # ---- пакетні розрахунки ----
+
+    def batch_clicks(self, xs, ys, distance_m: float):
+        """Кліки для цілих колонок x/y (мм).
+
+        Повертає (vertical, horizontal) — знакові кількості кліків
+        (+ це U/R, - це D/L). Нуль кліків завжди вважається U/R.
+        """
+        scale = mm_per_unit(self.unit, distance_m)
+        if scale == 0:
+            zeros = [0] * len(xs)
+            return zeros, list(zeros)
+        np = numpy()
+        if np is not None:
+            return (
+                self._np_signed_clicks(np, np.asarray(ys, dtype=float) / scale),
+                self._np_signed_clicks(np, np.asarray(xs, dtype=float) / scale),
+            )
+        inv = 1.0 / scale
+        return (
+            [self._signed_clicks(value * inv) for value in ys],
+            [self._signed_clicks(value * inv) for value in xs],
+        )
+
+    def format_batch(self, xs, ys, distance_m: float) -> list[str]:
+        """Текст поправки для кожного пострілу з колонок x/y."""
+        vertical, horizontal = self.batch_clicks(xs, ys, distance_m)
+        formatted: dict = {}  # однакових значень кліків мало — форматуємо раз
+        texts = []
+        for v_clicks, h_clicks in zip(vertical, horizontal):
+            v_text = formatted.get(v_clicks)
+            if v_text is None:
+                v_text = formatted[v_clicks] = self._format_clicks(abs(v_clicks))
+            h_text = formatted.get(h_clicks)
+            if h_text is None:
+                h_text = formatted[h_clicks] = self._format_clicks(abs(h_clicks))
+            texts.append(
+                f"{'U' if v_clicks >= 0 else 'D'} {v_text}     "
+                f"{'R' if h_clicks >= 0 else 'L'} {h_text}",
+            )
+        return texts
+
+    # ---- внутрішнє ----
+
+    def _signed_clicks(self, value_units: float) -> int:
+        clicks = self.clicks(value_units)
+        return -clicks if value_units < 0 else clicks
+
+    def _np_signed_clicks(self, np, values) -> list[int]:
+        magnitudes = np.abs(values)
+        clicks = np.ceil(magnitudes / self.step).astype(np.int64)
+        clicks[magnitudes < _ZERO_EPSILON] = 0
+        return np.where(values < 0, -clicks, clicks).tolist()
+
+    def _format_pair(self, vertical: float, horizontal: float) -> str:
+        v_clicks = self._signed_clicks(vertical)
+        h_clicks = self._signed_clicks(horizontal)
+        return (
+            f"{'U' if v_clicks >= 0 else 'D'} {self._format_clicks(abs(v_clicks))}     "
+            f"{'R' if h_clicks >= 0 else 'L'} {self._format_clicks(abs(h_clicks))}"
+        )
+
+    def _format_clicks(self, clicks: int) -> str:
+        if clicks == 0:
+            return "0"
+        text = f"{clicks * self.step:.{self._decimals}f}".rstrip("0").rstrip(".")
+        return text or "0"
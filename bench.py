@@ -0,0 +1,496 @@
+"""Безголові бенчмарки гарячих шляхів застосунку.
+
+Kivy працює без видимого вікна (SDL offscreen), застосунок будується з main.kv
+як зазвичай, а кадри крутимо вручну через EventLoop.idle(). Сервер —
+local_server у тому ж процесі, локальна сесія — у тимчасовій теці.
+
+Для кожного сценарію й розміру (10, 100, 1 000, 10 000 пострілів) пишемо час
+операції, час кадру після неї, виділення памʼяті (tracemalloc) і пікове RSS:
+
+    python bench.py                        # JSON у stdout, таблиця в stderr
+    python bench.py --sizes 100 1000 --repeat 3 --output bench.json
+    python bench.py --scenarios select_point history_entries
+
+Холодний старт міряється окремо: main.py запускається новим процесом кілька
+разів (перший прогін — прогрів), час — до першого кадру; медіана порівнюється
+з perf.STARTUP_BUDGET_MS, і за перевищення код виходу ненульовий:
+
+    python bench.py --cold-start --repeat 5
+"""
+
+import os
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+os.environ.setdefault("KIVY_NO_FILELOG", "1")
+os.environ.setdefault("SDL_VIDEODRIVER", "offscreen")
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from array import array
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+import kivy
+from kivy.base import EventLoop
+from kivy.uix.screenmanager import NoTransition
+
+import main
+import local_server
+from perf import STARTUP_BUDGET_MS, STARTUP_FIRST_FRAME
+from render import render_scheduler
+from wire import COORDS_BINARY_TYPE, decode_coords, encode_binary
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+DEFAULT_REPEAT = 5
+# скільки кадрів максимум чекаємо на фонову відповідь (мережа, диск)
+MAX_WAIT_FRAMES = 2000
+# кадри після підготовки сценарію — щоб відкладена робота не потрапила в замір
+SETTLE_FRAMES = 3
+# скільки викликів select_point міряємо за один повтор
+SELECT_CALLS = 20
+# скільки максимум чекаємо один холодний старт
+COLD_START_TIMEOUT_S = 60
+
+
+class BenchApp(main.CoordinateApp):
+    """Застосунок зі своєю тимчасовою текою — справжню сесію не чіпаємо."""
+
+    def __init__(self, data_dir: str, **kwargs):
+        self._bench_data_dir = data_dir
+        super().__init__(**kwargs)
+
+    @property
+    def user_data_dir(self):
+        return self._bench_data_dir
+
+
+class Harness:
+    """Готовий до вимірів застосунок: вікно, корінь, екрани, сервер."""
+
+    def __init__(self, data_dir: str):
+        self.server, self.feed, _stats = local_server.serve(port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        main.SERVER_URL = f"http://127.0.0.1:{self.server.server_address[1]}"
+        main.STREAM_ENABLED = False
+
+        EventLoop.ensure_window()
+        self.app = BenchApp(data_dir)
+        self.app._run_prepare()
+        self.root = self.app.root
+        self.root._screen_manager.transition = NoTransition()
+        # чекаємо первинного /coords/all, далі мережа мовчить до diff-сценаріїв
+        self.wait_until(lambda: self.root.lane.poller.running)
+        self.root.pause_network()
+        # екран історії будується при першому переході
+        self.root.switch_to("history")
+        self.history = self.root._screen_manager.get_screen("history")
+        self.board = next(
+            widget
+            for widget in self.history.walk(restrict=True)
+            if isinstance(widget, main.PointBoard)
+        )
+        self.frame()
+
+    def close(self) -> None:
+        self.app.stop()
+        self.root.close_session_store()
+        self.server.shutdown()
+
+    # ---- кадри ----
+
+    def frame(self) -> float:
+        """Один кадр (Clock + малювання); повертає тривалість у мс."""
+        started = time.perf_counter()
+        EventLoop.idle()
+        return (time.perf_counter() - started) * 1000.0
+
+    def settle(self) -> None:
+        for _ in range(SETTLE_FRAMES):
+            self.frame()
+
+    def wait_until(self, condition) -> None:
+        for _ in range(MAX_WAIT_FRAMES):
+            if condition():
+                return
+            self.frame()
+            time.sleep(0.001)
+        raise TimeoutError("бенчмарк не дочекався фонової операції")
+
+    # ---- дані ----
+
+    def fill(self, count: int, seed: int = 0) -> None:
+        """Скидає сесію й додає count пострілів однією пачкою."""
+        root = self.root
+        lane = root.lane
+        # скидаємо без архіву: інакше архів у базі росте від сценарію до
+        # сценарію й спотворює наступні заміри
+        store, lane.store = lane.store, None
+        try:
+            root._local_clear_state()
+        finally:
+            lane.store = store
+        if store is not None:
+            store.clear()
+        rng = random.Random(seed)
+        half_w = main.A4_WIDTH_MM / 2.0
+        half_h = main.A4_HEIGHT_MM / 2.0
+        root.shots.append_columns(
+            array("q", range(1, count + 1)),
+            array("d", (round(rng.uniform(-half_w, half_w), 1) for _ in range(count))),
+            array("d", (round(rng.uniform(-half_h, half_h), 1) for _ in range(count))),
+            array("d", [root._current_radius_mm()]) * count,
+        )
+        root.latest_point = root.shots.last
+        root.selected_point_id = root.latest_point.id if count else -1
+        root.lane.set_last_id(count)
+        self.frame()
+
+
+# ==== СЦЕНАРІЇ ====
+# кожен: setup(harness, n) -> op; op() виконується під заміром, потім — кадр
+
+
+def scenario_refresh_points(harness: Harness, count: int):
+    """Повне перемалювання дошки з усіма пострілами."""
+    harness.fill(count)
+    board = harness.board
+
+    def op():
+        board._clear_drawn_points()
+        board._refresh_points()
+
+    return op
+
+
+def scenario_refresh_points_append(harness: Harness, count: int):
+    """Інкрементальне домальовування одного нового пострілу.
+
+    Малювання відкладене до кадру, тож відкладені оновлення виконуємо тут же,
+    інакше op міряв би лише додавання до сховища.
+    """
+    harness.fill(count)
+    root = harness.root
+    next_id = [count + 1]
+
+    def op():
+        point_id = next_id[0]
+        next_id[0] += 1
+        root.shots.append([main.Shot(point_id, 1.0, -1.0, root._current_radius_mm())])
+        render_scheduler.flush()
+
+    return op
+
+
+def scenario_update_history(harness: Harness, count: int):
+    """Повна перебудова RecycleView історії."""
+    harness.fill(count)
+    return harness.history._update_history
+
+
+def scenario_history_entries(harness: Harness, count: int):
+    """Побудова рядків історії (поправки для всіх пострілів)."""
+    harness.fill(count)
+    return harness.root.get_history_entries
+
+
+def scenario_diff_decode_json(harness: Harness, count: int):
+    """Розбір JSON-відповіді /coords/diff (у фоновому потоці HttpClient)."""
+    body = json.dumps(
+        {"session": "bench", "coords": _coords_json(count)},
+    ).encode("utf-8")
+    return lambda: decode_coords("application/json", body)
+
+
+def scenario_diff_decode_binary(harness: Harness, count: int):
+    """Розбір бінарної відповіді /coords/diff."""
+    coords = _coords_json(count)
+    body = encode_binary(
+        [item["id"] for item in coords],
+        [item["x"] for item in coords],
+        [item["y"] for item in coords],
+        "bench",
+    )
+    return lambda: decode_coords(COORDS_BINARY_TYPE, body)
+
+
+def scenario_diff_apply(harness: Harness, count: int):
+    """Kivy-потік: додавання розібраної пачки з count нових пострілів."""
+    root = harness.root
+    body = json.dumps({"coords": _coords_json(count)}).encode("utf-8")
+    batch = decode_coords("application/json", body)
+    harness.fill(0)
+    return lambda: root.lane.apply_batch(batch)
+
+
+def scenario_diff_roundtrip(harness: Harness, count: int):
+    """Повний шлях опитування: запит до local_server -> розбір -> додавання."""
+    root = harness.root
+    feed = harness.feed
+    harness.fill(0)
+    feed.clear()
+    root.lane.session = None  # новий токен сервера приймаємо без перезавантаження
+    for item in _coords_json(count):
+        feed.add(item["x"], item["y"])
+
+    def op():
+        root.lane.poll()
+        harness.wait_until(lambda: len(root.shots) >= count)
+
+    return op
+
+
+def scenario_select_point(harness: Harness, count: int):
+    """select_point для випадкових пострілів (час — на SELECT_CALLS викликів)."""
+    harness.fill(count)
+    root = harness.root
+    rng = random.Random(1)
+    ids = [rng.randint(1, count) for _ in range(SELECT_CALLS)]
+
+    def op():
+        for point_id in ids:
+            root.select_point(point_id)
+
+    return op
+
+
+SCENARIOS = {
+    "refresh_points": scenario_refresh_points,
+    "refresh_points_append": scenario_refresh_points_append,
+    "update_history": scenario_update_history,
+    "history_entries": scenario_history_entries,
+    "diff_decode_json": scenario_diff_decode_json,
+    "diff_decode_binary": scenario_diff_decode_binary,
+    "diff_apply": scenario_diff_apply,
+    "diff_roundtrip": scenario_diff_roundtrip,
+    "select_point": scenario_select_point,
+}
+
+
+def _coords_json(count: int) -> list[dict]:
+    rng = random.Random(count)
+    return [
+        {
+            "id": point_id,
+            "x": round(rng.uniform(-100.0, 100.0), 1),
+            "y": round(rng.uniform(-140.0, 140.0), 1),
+        }
+        for point_id in range(1, count + 1)
+    ]
+
+
+# ==== ЗАМІРИ ====
+
+
+def _summary(values: list[float]) -> dict:
+    return {
+        "min": round(min(values), 3),
+        "median": round(statistics.median(values), 3),
+        "max": round(max(values), 3),
+    }
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux віддає КіБ, macOS — байти
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def measure(harness: Harness, name: str, count: int, repeat: int) -> dict:
+    setup = SCENARIOS[name]
+    op_ms = []
+    frame_ms = []
+    for _ in range(repeat):
+        op = setup(harness, count)
+        harness.settle()
+        started = time.perf_counter()
+        op()
+        op_ms.append((time.perf_counter() - started) * 1000.0)
+        frame_ms.append(harness.frame())
+
+    # окремий прогін під tracemalloc — він сам сповільнює код
+    op = setup(harness, count)
+    harness.settle()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        op()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    harness.frame()
+
+    return {
+        "scenario": name,
+        "shots": count,
+        "repeat": repeat,
+        "op_ms": _summary(op_ms),
+        "frame_ms": _summary(frame_ms),
+        "alloc_bytes": after - before,
+        "alloc_peak_bytes": peak - before,
+        "rss_peak_kb": _peak_rss_kb(),
+    }
+
+
+def run(sizes, scenarios, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="coords-bench-") as data_dir:
+        harness = Harness(data_dir)
+        try:
+            results = []
+            for name in scenarios:
+                for count in sizes:
+                    result = measure(harness, name, count, repeat)
+                    results.append(result)
+                    print(
+                        f"{name:<22} {count:>6}  "
+                        f"op {result['op_ms']['median']:>9.2f} мс  "
+                        f"кадр {result['frame_ms']['median']:>8.2f} мс  "
+                        f"alloc {result['alloc_peak_bytes'] / 1024:>9.1f} КіБ",
+                        file=sys.__stderr__,  # sys.stderr Kivy забирає в лог
+                    )
+        finally:
+            harness.close()
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "kivy": kivy.__version__,
+            "platform": platform.platform(),
+            "sizes": list(sizes),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+# ==== ХОЛОДНИЙ СТАРТ ====
+
+
+def _startup_report(output: str):
+    """Рядок {"startup": ...}, який main.py друкує з COORDS_STARTUP_EXIT=1."""
+    for line in reversed(output.splitlines()):
+        if line.startswith('{"startup"'):
+            return json.loads(line)
+    return None
+
+
+def cold_start(repeat: int) -> dict:
+    server, _feed, _stats = local_server.serve(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    phases: dict[str, list] = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="coords-cold-") as home:
+            env = dict(
+                os.environ,
+                COORDS_STARTUP_EXIT="1",
+                COORDS_SERVER_URL=f"http://127.0.0.1:{server.server_address[1]}",
+                # user_data_dir і конфіг Kivy — у тимчасовій теці
+                XDG_CONFIG_HOME=home,
+                KIVY_HOME=os.path.join(home, "kivy"),
+            )
+            # перший прогін — прогрів: .pyc, конфіг Kivy, кеш розмірів фону
+            for attempt in range(repeat + 1):
+                spawned_at = time.time()
+                completed = subprocess.run(
+                    [sys.executable, script],
+                    cwd=os.path.dirname(script),
+                    env=env,
+                    capture_output=True,
+                    text=True,
+                    timeout=COLD_START_TIMEOUT_S,
+                )
+                report = _startup_report(completed.stdout)
+                if report is None:
+                    raise RuntimeError(
+                        f"main.py не повідомив час старту (код {completed.returncode}):\n"
+                        + completed.stderr[-2000:],
+                    )
+                if not attempt:
+                    continue
+                process_ms = (report["started_at"] - spawned_at) * 1000.0
+                phases.setdefault("process", []).append(process_ms)
+                for name, value in report["startup"].items():
+                    phases.setdefault(name, []).append(value)
+                phases.setdefault("spawn_to_frame", []).append(
+                    process_ms + report["startup"][STARTUP_FIRST_FRAME],
+                )
+    finally:
+        server.shutdown()
+
+    summary = {name: _summary(values) for name, values in phases.items()}
+    first_frame = summary[STARTUP_FIRST_FRAME]["median"]
+    for name, stats in summary.items():
+        print(
+            f"cold_start {name:<16} "
+            f"min {stats['min']:>8.1f}  median {stats['median']:>8.1f}  "
+            f"max {stats['max']:>8.1f} мс",
+            file=sys.__stderr__,
+        )
+    print(
+        f"cold_start: перший кадр {first_frame:.0f} мс, бюджет {STARTUP_BUDGET_MS:.0f} мс",
+        file=sys.__stderr__,
+    )
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "kivy": kivy.__version__,
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "cold_start_ms": summary,
+        "budget_ms": STARTUP_BUDGET_MS,
+        "within_budget": first_frame <= STARTUP_BUDGET_MS,
+    }
+
+
+def main_cli(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Безголові бенчмарки застосунку")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=sorted(SCENARIOS),
+        default=list(SCENARIOS),
+    )
+    parser.add_argument("--output", help="куди писати JSON (типово stdout)")
+    parser.add_argument(
+        "--cold-start",
+        action="store_true",
+        help="лише холодний старт main.py окремими процесами",
+    )
+    args = parser.parse_args(argv)
+
+    if args.cold_start:
+        report = cold_start(max(args.repeat, 1))
+    else:
+        report = run(args.sizes, args.scenarios, max(args.repeat, 1))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    if not report.get("within_budget", True):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,137 @@
+import math
+from array import array
+
+from lazy import numpy
+from shots import SHOTS_APPENDED
+
+# CEP50 за двома SD (наближення для не надто витягнутих груп)
+CEP_SD_FACTOR = 0.5887
+
+
+def _cross(o, a, b) -> float:
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def _convex_hull(points: list) -> list:
+    """Опукла оболонка (monotone chain), проти годинникової стрілки."""
+    points = sorted(set(points))
+    if len(points) <= 2:
+        return points
+    lower: list = []
+    for point in points:
+        while len(lower) >= 2 and _cross(lower[-2], lower[-1], point) <= 0:
+            lower.pop()
+        lower.append(point)
+    upper: list = []
+    for point in reversed(points):
+        while len(upper) >= 2 and _cross(upper[-2], upper[-1], point) <= 0:
+            upper.pop()
+        upper.append(point)
+    return lower[:-1] + upper[:-1]
+
+
+class GroupStats:
+    """Статистика групи, що оновлюється за кожен постріл без проходу по всіх.
+
+    Центр і SD — бігучі моменти Велфорда; розмах (extreme spread, центр-центр) —
+    через опуклу оболонку: точка всередині оболонки розмах не змінює, точка
+    зовні порівнюється лише з вершинами оболонки. Середній радіус — справжня
+    середня відстань до центру: центр зсувається з кожним пострілом, тож її
+    перераховуємо по точках, але лише коли група змінилась і її читають.
+    CEP50 — оцінка за SD (модель кругового нормального розподілу).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self._m2_x = 0.0
+        self._m2_y = 0.0
+        self.extreme_spread = 0.0
+        self._hull: list = []
+        self._xs = array("d")
+        self._ys = array("d")
+        self._mean_radius = 0.0
+
+    # ---- оновлення ----
+
+    def add(self, x: float, y: float) -> None:
+        self.count += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.count
+        self.mean_y += dy / self.count
+        self._m2_x += dx * (x - self.mean_x)
+        self._m2_y += dy * (y - self.mean_y)
+        self._add_to_hull((x, y))
+        self._xs.append(x)
+        self._ys.append(y)
+        self._mean_radius = None
+
+    def extend(self, xs, ys) -> None:
+        for x, y in zip(xs, ys):
+            self.add(x, y)
+
+    def rebuild(self, xs, ys) -> None:
+        self.reset()
+        self.extend(xs, ys)
+
+    def on_shots_changed(self, event, shots) -> None:
+        """Підлаштовується під подію ShotStore: дописане — по одному, решта — з нуля."""
+        if event.kind == SHOTS_APPENDED:
+            end = event.start + event.count
+            self.extend(shots.xs[event.start:end], shots.ys[event.start:end])
+        else:
+            self.rebuild(shots.xs, shots.ys)
+
+    def _add_to_hull(self, point: tuple) -> None:
+        hull = self._hull
+        if len(hull) >= 3 and self._inside_hull(point):
+            return
+        for vertex in hull:
+            distance = math.hypot(point[0] - vertex[0], point[1] - vertex[1])
+            if distance > self.extreme_spread:
+                self.extreme_spread = distance
+        self._hull = _convex_hull(hull + [point])
+
+    def _inside_hull(self, point: tuple) -> bool:
+        hull = self._hull
+        previous = hull[-1]
+        for vertex in hull:
+            if _cross(previous, vertex, point) < 0:
+                return False
+            previous = vertex
+        return True
+
+    # ---- результати (мм) ----
+
+    @property
+    def sd_x(self) -> float:
+        return math.sqrt(self._m2_x / (self.count - 1)) if self.count > 1 else 0.0
+
+    @property
+    def sd_y(self) -> float:
+        return math.sqrt(self._m2_y / (self.count - 1)) if self.count > 1 else 0.0
+
+    @property
+    def mean_radius(self) -> float:
+        if self._mean_radius is None:
+            self._mean_radius = self._distance_to_center_mean()
+        return self._mean_radius
+
+    @property
+    def cep50(self) -> float:
+        return CEP_SD_FACTOR * (self.sd_x + self.sd_y)
+
+    def _distance_to_center_mean(self) -> float:
+        np = numpy()
+        if np is not None:
+            xs = np.frombuffer(self._xs, dtype=float) - self.mean_x
+            ys = np.frombuffer(self._ys, dtype=float) - self.mean_y
+            return float(np.hypot(xs, ys).mean())
+        mean_x, mean_y = self.mean_x, self.mean_y
+        total = sum(math.hypot(x - mean_x, y - mean_y) for x, y in zip(self._xs, self._ys))
+        return total / self.count
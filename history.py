@@ -0,0 +1,206 @@
+from kivy.app import App
+from kivy.properties import BooleanProperty, NumericProperty, ObjectProperty, StringProperty
+from kivy.uix.button import Button
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.screenmanager import Screen
+
+from archive import WindowedPager, format_session_row
+from render import render_scheduler
+from shots import SHOTS_APPENDED
+
+# що треба зробити з рядками історії до наступного кадру
+HISTORY_SYNC_APPEND = "append"  # дописати рядки для нових пострілів
+HISTORY_SYNC_FULL = "full"      # перебудувати все
+
+HISTORY_TITLE = "Історія поправок"
+
+
+class HistoryScreen(Screen):
+    controller = ObjectProperty(allownone=True, rebind=True)
+    # список під мішенню: поточна сесія чи архів (сесії або постріли однієї)
+    archive_open = BooleanProperty(False)
+    archive_session = ObjectProperty(None, allownone=True)
+    list_title = StringProperty(HISTORY_TITLE)
+
+    def on_kv_post(self, base_widget):
+        super().on_kv_post(base_widget)
+        self._history_rv = self.ids.history_rv
+        self._archive_pager = WindowedPager(self.ids.archive_rv)
+        self._bind_to_controller()
+
+    def on_controller(self, *_):
+        self._bind_to_controller()
+
+    def _bind_to_controller(self):
+        if (
+            not hasattr(self, "_history_rv")
+            or not self.controller
+            or getattr(self, "_controller_bound", False)
+        ):
+            return
+
+        # рядки оновлюємо на місці: нові — зверху, вибір — лише два рядки;
+        # зміни накопичуються й застосовуються раз на кадр, коли екран видно
+        self._pending_rows = HISTORY_SYNC_FULL
+        self.controller.subscribe_shots(self._on_shots_changed)
+        self.controller.bind(
+            selected_point_id=self._schedule_sync,
+            selected_distance_m=self._update_history_later,
+            selected_click=self._update_history_later,
+            archive_revision=self._on_archive_changed,
+            lane_label=self._on_lane_changed,
+        )
+        self._controller_bound = True
+        self._schedule_sync()
+
+    # ---- архів ----
+
+    def show_current(self) -> None:
+        self.archive_open = False
+        self.archive_session = None
+        self.list_title = HISTORY_TITLE
+        # сторінки архіву не тримаємо, поки його не видно
+        self._archive_pager.clear()
+
+    def show_archive(self) -> None:
+        """Список завершених сесій, від найновішої."""
+        if not self.controller:
+            return
+        self.archive_open = True
+        self.archive_session = None
+        self.list_title = "Архів сесій"
+        self._archive_pager.reset(self.controller.read_archive_sessions, self._session_rows)
+
+    def open_archive_session(self, session: dict) -> None:
+        if not self.controller:
+            return
+        self.archive_session = session
+        self.list_title = format_session_row(session)["text"]
+        session_id = session["session_id"]
+        self._archive_pager.reset(
+            lambda offset, limit, callback: self.controller.read_archive_shots(
+                session_id,
+                offset,
+                limit,
+                callback,
+            ),
+            lambda snapshot: self.controller.build_archive_rows(session, snapshot),
+        )
+
+    def _session_rows(self, sessions: list) -> list[dict]:
+        return [format_session_row(session) for session in sessions]
+
+    def _on_archive_changed(self, *_args) -> None:
+        if self.archive_open and self.archive_session is None:
+            self.show_archive()
+
+    def _on_lane_changed(self, *_args) -> None:
+        # архів — у базі показаної доріжки
+        if self.archive_open:
+            self.show_archive()
+
+    def _update_history(self, *args):
+        """Повна перебудова — лише коли міняються всі поправки (дистанція, клік)."""
+        if not self.controller or not hasattr(self, "_history_rv"):
+            return
+        self._history_rv.data = self.controller.get_history_entries()
+        self._selected_row_id = self.controller.selected_point_id
+        self._pending_rows = None
+
+    def _update_history_later(self, *_args) -> None:
+        self._pending_rows = HISTORY_SYNC_FULL
+        self._schedule_sync()
+
+    def _schedule_sync(self, *_args) -> None:
+        render_scheduler.mark(self, self._sync_history)
+
+    def _on_shots_changed(self, event) -> None:
+        # кілька дописувань зводяться до одного кроку; решта — до перебудови
+        kind = HISTORY_SYNC_APPEND if event.kind == SHOTS_APPENDED else HISTORY_SYNC_FULL
+        if self._pending_rows is None:
+            self._pending_rows = kind
+        elif self._pending_rows != kind:
+            self._pending_rows = HISTORY_SYNC_FULL
+        self._schedule_sync()
+
+    def _sync_history(self) -> None:
+        if not self.controller or not hasattr(self, "_history_rv"):
+            return
+        data = self._history_rv.data
+        shots = self.controller.shots
+        pending = self._pending_rows
+        self._pending_rows = None
+
+        if pending == HISTORY_SYNC_APPEND and len(data) <= len(shots):
+            rows = self.controller.build_history_rows(len(data), len(shots))
+            # rows — від найновішого; нові — на верх списку
+            if len(rows) == 1:
+                data.insert(0, rows[0])
+            elif rows:
+                # RecycleView не розуміє вставки зрізом — пачку даємо одним списком
+                self._history_rv.data = rows + list(data)
+        elif pending is not None:
+            self._update_history()
+            return
+
+        if len(self._history_rv.data) != len(shots):
+            self._update_history()
+            return
+        self._sync_selection()
+
+    def _sync_selection(self) -> None:
+        selected_id = self.controller.selected_point_id
+        previous_id = getattr(self, "_selected_row_id", -1)
+        if previous_id == selected_id:
+            return
+        self._set_row_selected(previous_id, False)
+        self._set_row_selected(selected_id, True)
+        self._selected_row_id = selected_id
+
+    def _set_row_selected(self, point_id: int, selected: bool) -> None:
+        data = self._history_rv.data
+        index = self.controller.shots.index_of(point_id)
+        if index < 0:
+            return
+        row_index = len(data) - 1 - index
+        if 0 <= row_index < len(data) and data[row_index]["point_id"] == point_id:
+            if data[row_index]["selected"] != selected:
+                data[row_index] = dict(data[row_index], selected=selected)
+
+
+class ArchiveButton(RecycleDataViewBehavior, Button):
+    """Рядок архіву: сесія (відкривається дотиком) або постріл архівної сесії."""
+
+    session_id = NumericProperty(-1)
+    session = ObjectProperty(None, allownone=True)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.session_id = data.get("session_id", -1)
+        self.session = data.get("session")
+        self.text = data.get("text", "")
+        return super().refresh_view_attrs(rv, index, data)
+
+    def on_release(self):
+        if self.session is None:
+            return
+        screen = self.parent
+        while screen is not None and not isinstance(screen, HistoryScreen):
+            screen = screen.parent
+        if screen is not None:
+            screen.open_archive_session(self.session)
+
+
+class HistoryButton(RecycleDataViewBehavior, Button):
+    point_id = NumericProperty(-1)
+    selected = BooleanProperty(False)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.point_id = data.get("point_id", -1)
+        self.selected = data.get("selected", False)
+        self.text = data.get("text", "")
+        return super().refresh_view_attrs(rv, index, data)
+
+    def on_release(self):
+        app = App.get_running_app()
+        if app and app.root:
+            app.root.select_point(self.point_id)
@@ -0,0 +1,379 @@
+import re
+import time
+from array import array
+
+from network import CoordStream, HttpClient, PollScheduler
+from shots import SHOTS_APPENDED, ShotStore
+from storage import SESSION_DB_NAME, STARTED_AT_KEY, SessionStore
+from wire import COORDS_ACCEPT, decode_coords, decode_event, session_of
+
+# ==== ДОРІЖКИ ====
+# COORDS_LANES="1=http://10.0.0.11:8000,2=http://10.0.0.12:8000" — по серверу
+# мішені на доріжку (назву можна пропустити); без нього — одна доріжка
+LANES_ENV = "COORDS_LANES"
+
+
+def parse_lanes(spec, default_url: str) -> list[tuple[str, str]]:
+    """'назва=url,...' -> [(назва, url)]; порожньо — [("1", default_url)]."""
+    lanes: list[tuple[str, str]] = []
+    names = set()
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, separator, url = item.partition("=")
+        if not separator or "://" in name:
+            name, url = "", item
+        name = name.strip() or str(len(lanes) + 1)
+        if name in names:
+            print("Доріжка з такою назвою вже є, пропускаю:", item)
+            continue
+        names.add(name)
+        lanes.append((name, url.strip().rstrip("/")))
+    return lanes or [("1", default_url)]
+
+
+def lane_db_name(index: int, name: str) -> str:
+    """Файл локальної сесії доріжки; перша лишається в старому session.sqlite3."""
+    if index == 0:
+        return SESSION_DB_NAME
+    return f"session-{re.sub(r'[^0-9A-Za-z_-]', '_', name)}.sqlite3"
+
+
+class Lane:
+    """Одна доріжка: свій сервер мішені, сховище пострілів, курсор і сесія.
+
+    HttpClient (потік і keep-alive зʼєднання), CoordStream і PollScheduler —
+    окремі на кожну доріжку, тож повільний чи недоступний сервер не затримує
+    інших. Тиха доріжка майже нічого не коштує: стрім чекає у своєму потоці,
+    опитування в тиші рідшає, а в Kivy-потік приходять лише готові пачки.
+    Локальна копія (SessionStore) — теж своя, з власним архівом.
+
+    owner (RootWidget) отримує виклики в Kivy-потоці:
+    handle_lane_restored(lane, meta) — збережену сесію прочитано;
+    handle_lane_appended(lane) — дописано нові постріли;
+    handle_lane_reset(lane) — доріжка зараз спорожніє (архів, скидання UI).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        owner,
+        perf,
+        radius_mm,
+        db_path=None,
+        poll_interval: float = 0.1,
+        request_timeout: float = 5.0,
+        stream_enabled: bool = True,
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.owner = owner
+        self.perf = perf
+        self._radius_mm = radius_mm
+        self.stream_enabled = stream_enabled
+
+        self.shots = ShotStore()
+        self.last_id = -1
+        self.session = None      # токен сесії сервера, якщо він його віддає
+        self.resyncing = False   # чекаємо повний /coords/all після зміни сесії
+        self.unread = False      # нові постріли, поки доріжку не показано
+
+        # один потік і одне keep-alive зʼєднання на всі запити цієї доріжки
+        self.http = HttpClient(base_url, timeout=request_timeout)
+        self.poller = PollScheduler(self.poll, min_interval=poll_interval)
+        self.stream = None
+        self._poll_in_progress = False  # захист від паралельних запитів
+
+        self.store = self._open_store(db_path)
+        self.restoring = False
+        self.shots.subscribe(self._persist_shots)
+
+    def __repr__(self) -> str:
+        return f"Lane({self.name!r}, {self.base_url!r}, {len(self.shots)} shots)"
+
+    # ---- старт ----
+
+    def start(self) -> None:
+        """Спершу збережена сесія, далі сервер (лише новіше за last_id)."""
+        if self.store is None:
+            self.load_initial()
+            return
+        self.store.load(self._on_local_session_loaded)
+
+    def _on_local_session_loaded(self, snapshot) -> None:
+        meta = snapshot.meta
+        self.owner.handle_lane_restored(self, meta)
+        if not len(snapshot):
+            self.load_initial()
+            return
+
+        self.restoring = True
+        try:
+            self.shots.append_columns(
+                snapshot.ids,
+                snapshot.xs,
+                snapshot.ys,
+                snapshot.radii,
+            )
+        finally:
+            self.restoring = False
+        try:
+            self.last_id = int(meta.get("last_id", max(snapshot.ids)))
+        except ValueError:
+            self.last_id = max(snapshot.ids)
+        self.session = meta.get("session")
+        self.owner.handle_lane_appended(self)
+        # звіряємося з сервером: лише те, що зʼявилось після last_id
+        self.start_live_updates()
+
+    # ---- локальна копія ----
+
+    def _open_store(self, db_path):
+        if not db_path:
+            return None
+        try:
+            return SessionStore(db_path)
+        except Exception as error:
+            print("Локальне збереження сесії недоступне:", self.name, error)
+            return None
+
+    def _persist_shots(self, event) -> None:
+        store = self.store
+        if store is None or self.restoring:
+            return
+        shots = self.shots
+        if event.kind == SHOTS_APPENDED:
+            end = event.start + event.count
+            if not event.start:
+                store.set_meta(STARTED_AT_KEY, time.time())
+            store.append_shots(
+                shots.ids[event.start:end],
+                shots.xs[event.start:end],
+                shots.ys[event.start:end],
+                shots.radii[event.start:end],
+            )
+            return
+        # інших змін, крім очищення, сховище доріжки не знає
+        store.clear()
+
+    def persist_meta(self, key: str, value) -> None:
+        if self.store is not None and not self.restoring:
+            self.store.set_meta(key, value)
+
+    def set_last_id(self, value: int) -> None:
+        if value != self.last_id:
+            self.last_id = value
+            self.persist_meta("last_id", value)
+
+    def set_session(self, token) -> None:
+        if token is not None and token != self.session:
+            self.session = token
+            self.persist_meta("session", token)
+
+    def reset_local(self) -> None:
+        """Локально прибираємо всі постріли (власник встигає їх заархівувати)."""
+        self.owner.handle_lane_reset(self)
+        self.shots.clear()
+        self.set_last_id(-1)
+
+    # ---- сервер ----
+
+    def load_initial(self) -> None:
+        """Разове завантаження повного списку координат з сервера."""
+
+        def ok(req, batch):
+            self.resyncing = False
+            self.set_session(batch.session)
+            self.shots.clear()
+            self._append_batch(batch)
+            self.perf.record_batch(
+                len(batch),
+                req.sent_at,
+                req.received_at,
+                req.decoded_at,
+                batch.server_time,
+                self.shots,
+            )
+            self.set_last_id(batch.max_id)
+            self.owner.handle_lane_appended(self)
+            self.start_live_updates()
+
+        def err(_req, error):
+            self.resyncing = False
+            print(f"Доріжка {self.name}: помилка отримання всіх координат із сервера:", error)
+            self.start_live_updates()
+
+        # розбір і перевірка JSON / бінарної відповіді — у потоці HttpClient
+        self.http.get(
+            "/coords/all",
+            on_success=ok,
+            on_error=err,
+            headers={"Accept": COORDS_ACCEPT},
+            decoder=decode_coords,
+        )
+
+    def poll(self) -> None:
+        """Питаємо про нові точки; інтервал до наступного разу задає poller."""
+        if self._poll_in_progress:
+            return
+        self._poll_in_progress = True
+        self.perf.record_poll()
+
+        def ok(req, batch):
+            self._poll_in_progress = False
+            if self.apply_batch(batch, req.received_at, req.decoded_at, req.sent_at):
+                self.poller.report_data()
+            else:
+                self.poller.report_empty()
+
+        def err(_req, error):
+            self._poll_in_progress = False
+            if self.poller.consecutive_errors == 0:
+                print(f"Доріжка {self.name}: помилка опитування coords/diff:", error)
+            self.poller.report_error()
+
+        self.http.get(
+            f"/coords/diff?last_id={self.last_id}",
+            on_success=ok,
+            on_error=err,
+            headers={"Accept": COORDS_ACCEPT},
+            decoder=decode_coords,
+        )
+
+    def apply_batch(self, batch, received_at=None, decoded_at=None, sent_at=None) -> int:
+        """Дописує нові точки з відповіді coords/diff або події стріму.
+
+        batch — уже розібраний у фоновому потоці CoordBatch; позначки часу
+        (perf_counter) — для PerfMonitor. Повертає кількість доданих точок.
+        """
+        if self.resyncing or not self._same_server_session(batch.session):
+            return 0
+        # вже отримане відкидаємо (стрім і опитування можуть перетнутись)
+        batch = batch.after(self.last_id)
+        if not len(batch):
+            return 0
+
+        self._append_batch(batch)
+        self.perf.record_batch(
+            len(batch),
+            sent_at,
+            received_at,
+            decoded_at,
+            batch.server_time,
+            self.shots,
+        )
+        self.set_last_id(batch.max_id)
+        self.owner.handle_lane_appended(self)
+        return len(batch)
+
+    def _append_batch(self, batch) -> None:
+        """Одна пачка — один append у сховище й одна подія для підписників."""
+        if not len(batch):
+            return
+        radii = array("d", [self._radius_mm()]) * len(batch)
+        self.shots.append_columns(batch.ids, batch.xs, batch.ys, radii)
+
+    def _same_server_session(self, token) -> bool:
+        """False, якщо сервер почав нову сесію, — тоді перезавантажуємось."""
+        if token is None or token == self.session:
+            return True
+        if self.session is None:
+            # сервер віддав токен уперше — просто запамʼятовуємо
+            self.set_session(token)
+            return True
+        print(f"Доріжка {self.name}: сервер почав нову сесію — повне перезавантаження")
+        self.reload()
+        return False
+
+    def reload(self) -> None:
+        """Скидаємо локальну копію й беремо все заново з /coords/all."""
+        self.resyncing = True
+        self.reset_local()
+        self.load_initial()
+
+    def clear_server(self, on_done=None) -> None:
+        """Очищення списку на сервері; локально скидаємось у будь-якому разі.
+
+        on_done(ok) — у Kivy-потоці, щойно сервер відповів.
+        """
+
+        def ok(_req, result):
+            if on_done:
+                on_done(True)
+            print(f"Доріжка {self.name}: сервер очистив список координат:", result)
+            self.reset_local()
+            # нашу ж очистку не сприймаємо як чужу нову сесію
+            self.set_session(session_of(result))
+
+        def err(_req, error):
+            if on_done:
+                on_done(False)
+            print(f"Доріжка {self.name}: помилка очистки списку на сервері:", error)
+            self.reset_local()
+
+        self.http.post("/coords/clear", body=b"", on_success=ok, on_error=err)
+
+    # ---- живі оновлення ----
+
+    def start_live_updates(self) -> None:
+        """Запускає стрім нових координат; опитування diff — запасний шлях."""
+        if self.stream_enabled and self.stream is None:
+            self.stream = CoordStream(
+                self.base_url,
+                get_last_id=lambda: self.last_id,
+                on_coords=self.apply_batch,
+                on_state=self._on_stream_state,
+                on_unsupported=self._on_stream_unsupported,
+                decoder=decode_event,
+            )
+            self.stream.start()
+        # поки стрім не підключився — опитуємо як раніше
+        if not (self.stream and self.stream.connected):
+            self.poller.start()
+
+    def _on_stream_state(self, connected: bool) -> None:
+        if connected:
+            self.poller.stop()
+        else:
+            self.poller.start()
+
+    def _on_stream_unsupported(self) -> None:
+        print(f"Доріжка {self.name}: сервер не підтримує стрім — лишаємось на опитуванні diff")
+        self.stream = None
+        self.poller.start()
+
+    def pause(self) -> None:
+        self.poller.pause()
+        if self.stream:
+            self.stream.stop()
+
+    def resume(self) -> None:
+        self.poller.resume()
+        if self.stream:
+            self.stream.start()
+        # stop() стріму мовчки скинув connected, а опитування він сам і зупинив;
+        # поки стрім не підключиться знову — опитуємо, інакше невдале
+        # перепідключення лишило б доріжку без жодного живого шляху
+        if not (self.stream and self.stream.connected):
+            self.poller.start()
+
+    def stop(self) -> None:
+        self.poller.stop()
+        if self.stream:
+            self.stream.stop()
+            self.stream = None
+        self.http.close()
+
+    def close_store(self) -> None:
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def stats(self) -> dict:
+        stats = self.poller.stats()
+        stats["stream_connected"] = bool(self.stream and self.stream.connected)
+        stats["http"] = self.http.latency_stats()
+        stats["http_connects"] = self.http.connects
+        return stats
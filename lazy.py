@@ -0,0 +1,19 @@
+"""Необовʼязкові важкі залежності, що імпортуються при першому використанні.
+
+NumPy додає до холодного старту ~100 мс, а до першого кадру він не потрібен.
+"""
+
+_UNSET = object()
+_numpy = _UNSET
+
+
+def numpy():
+    """Модуль numpy або None, якщо його немає в збірці."""
+    global _numpy
+    if _numpy is _UNSET:
+        try:
+            import numpy as module
+        except ImportError:  # pragma: no cover - залежить від збірки
+            module = None
+        _numpy = module
+    return _numpy
@@ -0,0 +1,387 @@
+"""Локальна заміна сервера координат для розробки й навантажувальних тестів.
+
+Реалізує ті самі ендпоінти, що й бойовий сервер:
+  GET  /coords/all              — усі постріли поточної сесії;
+  GET  /coords/diff?last_id=N   — лише новіші за N;
+  GET  /coords/stream?last_id=N — нові постріли як Server-Sent Events;
+  POST /coords/clear            — нова сесія (новий токен session);
+  GET  /stats                   — лічильники запитів і генератора.
+JSON або, якщо клієнт просить application/x-coords, бінарний формат із wire.py.
+
+Генератор шле постріли з частотою --rate Гц, час від часу — серією (--burst-*),
+частину «губить» (--drop): id пропускається, як при пропущеному влучанні.
+Кожен постріл у JSON має поле t (time.time() на сервері) — для виміру затримки
+від пострілу до пікселя на тій самій машині.
+
+    python local_server.py --rate 5 --burst-every 10 --burst-size 20 --drop 0.05
+    COORDS_SERVER_URL=http://127.0.0.1:8000 python main.py
+"""
+
+import argparse
+import bisect
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from wire import COORDS_BINARY_TYPE, encode_binary
+
+# аркуш A4 з центром у (0, 0), як у застосунку
+SHEET_WIDTH_MM = 210.0
+SHEET_HEIGHT_MM = 297.0
+# розкид групи навколо точки прицілювання
+GROUP_SIGMA_MM = 25.0
+# як часто шлемо пінг у стрім, щоб клієнт бачив живе зʼєднання
+STREAM_PING_INTERVAL_S = 5.0
+# вікно для підрахунку запитів за секунду
+RATE_WINDOW_S = 10.0
+
+
+class ShotFeed:
+    """Постріли поточної сесії; потокобезпечно, з очікуванням нових."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self.session = uuid.uuid4().hex[:12]
+        self._ids: list[int] = []
+        self._shots: list[tuple] = []  # (id, x, y, t)
+        self._next_id = 1
+        self.generated = 0
+        self.dropped = 0
+
+    def add(self, x: float, y: float) -> int:
+        with self._changed:
+            point_id = self._next_id
+            self._next_id += 1
+            self.generated += 1
+            self._ids.append(point_id)
+            self._shots.append((point_id, round(x, 1), round(y, 1), time.time()))
+            self._changed.notify_all()
+            return point_id
+
+    def drop(self) -> None:
+        """Пропущений постріл: id витрачено, точки немає."""
+        with self._lock:
+            self._next_id += 1
+            self.dropped += 1
+
+    def clear(self) -> str:
+        with self._changed:
+            self.session = uuid.uuid4().hex[:12]
+            self._ids.clear()
+            self._shots.clear()
+            self._next_id = 1
+            self._changed.notify_all()
+            return self.session
+
+    def since(self, last_id: int) -> tuple[str, list[tuple]]:
+        with self._lock:
+            start = bisect.bisect_right(self._ids, last_id)
+            return self.session, self._shots[start:]
+
+    def wait_since(self, last_id: int, session: str, timeout: float):
+        """Чекає пострілів новіших за last_id; None — сесію скинуто."""
+        with self._changed:
+            while True:
+                if self.session != session:
+                    return None
+                start = bisect.bisect_right(self._ids, last_id)
+                if start < len(self._ids):
+                    return self._shots[start:]
+                if not self._changed.wait(timeout):
+                    return []
+
+
+class ShotGenerator(threading.Thread):
+    """Постріли з частотою rate Гц, серії по burst_size кожні burst_every с."""
+
+    def __init__(
+        self,
+        feed: ShotFeed,
+        rate: float,
+        burst_every: float = 0.0,
+        burst_size: int = 0,
+        burst_rate: float = 50.0,
+        drop: float = 0.0,
+        seed=None,
+    ):
+        super().__init__(name="shot-generator", daemon=True)
+        self.feed = feed
+        self.rate = rate
+        self.burst_every = burst_every
+        self.burst_size = burst_size
+        self.burst_rate = burst_rate
+        self.drop_rate = drop
+        self._random = random.Random(seed)
+        self._stop_event = threading.Event()
+        # точка прицілювання зсувається між серіями — як після поправки
+        self._aim = (0.0, 0.0)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        next_burst = (
+            time.monotonic() + self.burst_every if self.burst_every > 0 else None
+        )
+        interval = 1.0 / self.rate if self.rate > 0 else None
+        while not self._stop_event.is_set():
+            if next_burst is not None and time.monotonic() >= next_burst:
+                self._burst()
+                next_burst = time.monotonic() + self.burst_every
+            if interval is None:
+                wait = next_burst - time.monotonic() if next_burst else 1.0
+                self._stop_event.wait(max(wait, 0.0))
+                continue
+            self.shoot()
+            self._stop_event.wait(interval)
+
+    def _burst(self) -> None:
+        self._aim = (
+            self._random.uniform(-SHEET_WIDTH_MM / 4.0, SHEET_WIDTH_MM / 4.0),
+            self._random.uniform(-SHEET_HEIGHT_MM / 4.0, SHEET_HEIGHT_MM / 4.0),
+        )
+        pause = 1.0 / self.burst_rate if self.burst_rate > 0 else 0.0
+        for _ in range(self.burst_size):
+            if self._stop_event.is_set():
+                return
+            self.shoot()
+            if pause:
+                self._stop_event.wait(pause)
+
+    def shoot(self) -> None:
+        if self._random.random() < self.drop_rate:
+            self.feed.drop()
+            return
+        aim_x, aim_y = self._aim
+        x = self._random.gauss(aim_x, GROUP_SIGMA_MM)
+        y = self._random.gauss(aim_y, GROUP_SIGMA_MM)
+        self.feed.add(
+            min(max(x, -SHEET_WIDTH_MM / 2.0), SHEET_WIDTH_MM / 2.0),
+            min(max(y, -SHEET_HEIGHT_MM / 2.0), SHEET_HEIGHT_MM / 2.0),
+        )
+
+
+class RequestStats:
+    """Скільки запитів на кожен ендпоінт: усього й за останні RATE_WINDOW_S."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.totals: Counter = Counter()
+        self._recent: deque = deque()  # (monotonic, endpoint)
+        self.stream_clients = 0
+
+    def hit(self, endpoint: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.totals[endpoint] += 1
+            self._recent.append((now, endpoint))
+            self._trim(now)
+
+    def stream_opened(self) -> None:
+        with self._lock:
+            self.stream_clients += 1
+
+    def stream_closed(self) -> None:
+        with self._lock:
+            self.stream_clients -= 1
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            recent = Counter(endpoint for _t, endpoint in self._recent)
+            return {
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "requests": dict(self.totals),
+                "requests_per_s": {
+                    endpoint: round(count / RATE_WINDOW_S, 2)
+                    for endpoint, count in recent.items()
+                },
+                "stream_clients": self.stream_clients,
+            }
+
+    def _trim(self, now: float) -> None:
+        while self._recent and now - self._recent[0][0] > RATE_WINDOW_S:
+            self._recent.popleft()
+
+
+class CoordsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, як очікує HttpClient
+    server_version = "LocalCoords/1.0"
+    feed: ShotFeed = None
+    stats: RequestStats = None
+    stream_enabled = True
+    quiet = True
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    # ---- маршрути ----
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        self.stats.hit(url.path)
+        if url.path == "/coords/all":
+            self._send_coords(*self.feed.since(-1))
+        elif url.path == "/coords/diff":
+            self._send_coords(*self.feed.since(self._last_id(query)))
+        elif url.path == "/coords/stream" and self.stream_enabled:
+            self._stream(self._last_id(query))
+        elif url.path == "/stats":
+            body = self.stats.snapshot()
+            body.update(
+                session=self.feed.session,
+                generated=self.feed.generated,
+                dropped=self.feed.dropped,
+            )
+            self._send_json(body)
+        else:
+            self._send_json({"detail": "Not Found"}, status=404)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.stats.hit(url.path)
+        if url.path == "/coords/clear":
+            self._send_json({"status": "cleared", "session": self.feed.clear()})
+        else:
+            self._send_json({"detail": "Not Found"}, status=404)
+
+    # ---- відповіді ----
+
+    def _last_id(self, query) -> int:
+        try:
+            return int(query.get("last_id", ["-1"])[0])
+        except ValueError:
+            return -1
+
+    def _send_coords(self, session: str, shots: list[tuple]) -> None:
+        if COORDS_BINARY_TYPE in (self.headers.get("Accept") or ""):
+            ids, xs, ys = [], [], []
+            for point_id, x, y, _t in shots:
+                ids.append(point_id)
+                xs.append(x)
+                ys.append(y)
+            self._send(encode_binary(ids, xs, ys, session), COORDS_BINARY_TYPE)
+            return
+        self._send_json({"session": session, "coords": _coords_json(shots)})
+
+    def _send_json(self, body: dict, status: int = 200) -> None:
+        self._send(json.dumps(body).encode("utf-8"), "application/json", status)
+
+    def _send(self, data: bytes, content_type: str, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, last_id: int) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        session, shots = self.feed.since(last_id)
+        self.stats.stream_opened()
+        try:
+            while True:
+                if shots:
+                    last_id = shots[-1][0]
+                    event = {"session": session, "coords": _coords_json(shots)}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                else:
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+                shots = self.feed.wait_since(last_id, session, STREAM_PING_INTERVAL_S)
+                if shots is None:
+                    # сесію скинуто — клієнт перепідключиться й побачить новий токен
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.stats.stream_closed()
+
+
+def _coords_json(shots: list[tuple]) -> list[dict]:
+    return [{"id": point_id, "x": x, "y": y, "t": t} for point_id, x, y, t in shots]
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    stream: bool = True,
+    quiet: bool = True,
+):
+    """Створює сервер (ще не запущений); повертає (server, feed, stats)."""
+    feed = ShotFeed()
+    stats = RequestStats()
+    handler = type(
+        "BoundCoordsHandler",
+        (CoordsHandler,),
+        {"feed": feed, "stats": stats, "stream_enabled": stream, "quiet": quiet},
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, feed, stats
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--rate", type=float, default=1.0, help="пострілів за секунду (0 — лише серії)")
+    parser.add_argument("--burst-every", type=float, default=0.0, help="секунд між серіями (0 — без серій)")
+    parser.add_argument("--burst-size", type=int, default=10)
+    parser.add_argument("--burst-rate", type=float, default=50.0, help="пострілів за секунду всередині серії")
+    parser.add_argument("--drop", type=float, default=0.0, help="частка пропущених пострілів, 0..1")
+    parser.add_argument("--preload", type=int, default=0, help="скільки пострілів створити до старту")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--no-stream", action="store_true", help="без /coords/stream (лише diff)")
+    parser.add_argument("--verbose", action="store_true", help="писати кожен запит")
+    args = parser.parse_args(argv)
+
+    server, feed, _stats = serve(
+        args.host,
+        args.port,
+        stream=not args.no_stream,
+        quiet=not args.verbose,
+    )
+    generator = ShotGenerator(
+        feed,
+        rate=args.rate,
+        burst_every=args.burst_every,
+        burst_size=args.burst_size,
+        burst_rate=args.burst_rate,
+        drop=args.drop,
+        seed=args.seed,
+    )
+    for _ in range(args.preload):
+        generator.shoot()
+    generator.start()
+
+    print(f"Сервер координат: http://{args.host}:{args.port} (сесія {feed.session})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        generator.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,23 @@
 import math
 import os
+from array import array
+from collections import OrderedDict
 import random  # лишаю, якщо захочеш дебажити локальну генерацію
 import json
 import time
 
+# відлік холодного старту — до важких імпортів Kivy
+STARTED_AT = time.time()
+
 from kivy.app import App
 from kivy.clock import Clock
+from kivy.factory import Factory
 from kivy.lang import Builder
-from kivy.core.image import Image as CoreImage
 from kivy.core.text import Label as CoreLabel
 from kivy.core.window import Window
 from kivy.metrics import dp
-from kivy.network.urlrequest import UrlRequest
 from kivy.properties import (
+    AliasProperty,
     BooleanProperty,
     ListProperty,
     NumericProperty,
@@ -22,13 +27,47 @@ from kivy.properties import (
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.dropdown import DropDown
-from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from kivy.uix.screenmanager import Screen
 from kivy.uix.spinner import Spinner
 from kivy.uix.widget import Widget
-from kivy.graphics import Color, Ellipse, Rectangle
+from kivy.graphics import (
+    Color,
+    Ellipse,
+    InstructionGroup,
+    Mesh,
+    Rectangle,
+    StencilPop,
+    StencilPush,
+    StencilUnUse,
+    StencilUse,
+)
 from kivy.utils import platform
 
+from backgrounds import BACKGROUND_META_NAME, background_textures
+from ballistics import CLICK_VALUES, DEFAULT_CLICK, AdjustmentEngine
+from groups import GroupStats
+from lazy import numpy
+from lanes import LANES_ENV, Lane, lane_db_name, parse_lanes
+from perf import (
+    STAGE_RESET,
+    STARTUP_BUDGET_MS,
+    STARTUP_BUILD,
+    STARTUP_FIRST_FRAME,
+    STARTUP_IMPORTS,
+    PerfMonitor,
+    StartupTimer,
+)
+from render import render_scheduler
+from shots import (
+    DEFAULT_RADIUS_MM,
+    SHOTS_REPLACED,
+    Shot,
+    ShotEvent,
+    ShotStore,
+)
+from spatial import GRID_MIN_CELL_MM, BoardTransform, ShotGrid
+from storage import SessionSnapshot
+
 
 def rgba_color(r: float, g: float, b: float, a: float = 1.0) -> tuple[float, float, float, float]:
     """Перевод RGBA 0–255 у формат 0–1 для Kivy."""
@@ -40,20 +79,49 @@ A4_HEIGHT_MM = 297.0
 
 POINT_LABEL_FONT_SIZE = dp(10)
 POINT_LABEL_OUTLINE_WIDTH = dp(0.5)
+# скільки памʼяті (RGBA-байтів) можуть займати закешовані текстури підписів
+LABEL_TEXTURE_CACHE_BYTES = 4 * 1024 * 1024
+
+# пакетний режим PointBoard: кружечки одним Mesh замість Ellipse на постріл
+MESH_CIRCLE_SEGMENTS = 16
+# індекси Mesh 16-бітні, тож на один Mesh не більше 65535 вершин
+MESH_CIRCLES_PER_CHUNK = 2048
+# наскільки далеко від краю отвору ще зараховуємо дотик (палець неточний)
+TAP_TOLERANCE = dp(12)
+# масштаб PointBoard: щипок двома пальцями чи колесо миші, зсув одним пальцем
+ZOOM_MAX = 40.0
+ZOOM_WHEEL_STEP = 1.2
+# рух пальця, після якого дотик — уже зсув, а не вибір пострілу
+TAP_SLOP = dp(8)
+# більше пострілів у видимій частині — дешевша деталізація:
+# без номерів, по кластеру на клітинку сітки замість окремих кружечків
+LOD_DETAIL_MAX = 300
+# найменший радіус кластера, щоб його було видно при дрібному масштабі
+LOD_CLUSTER_MIN_RADIUS = dp(2)
+VIEWPORT_DETAIL = "detail"
+VIEWPORT_CLUSTERS = "clusters"
 
 SELECTED_POINT_COLOR = rgba_color(204, 0, 0)
 DEFAULT_POINT_COLOR = rgba_color(0, 0, 0)
 POINT_TEXT_COLOR = rgba_color(255, 255, 255)
 
-MM_IN_METER = 1000.0
-MOA_IN_RADIANS = math.radians(1 / 60.0)
-MOA_MIN_STEP = 0.25
-
 # ==== НАЛАШТУВАННЯ СЕРВЕРА ====
 # IP/порт твого FastAPI (ПК). ВАЖЛИВО: без "/" в кінці!
-SERVER_URL = "http://192.168.178.100:8000"
-# інтервал опитування (300 мс)
+# COORDS_SERVER_URL перекриває адресу (наприклад, для local_server.py);
+# COORDS_LANES задає кілька серверів, по одному на доріжку (див. lanes.py)
+SERVER_URL = os.environ.get("COORDS_SERVER_URL", "http://192.168.178.100:8000")
+# мінімальний інтервал опитування (одразу після пострілу); у тиші він росте
 POLL_INTERVAL_S = 0.1
+# таймаут одного запиту до сервера
+REQUEST_TIMEOUT_S = 5
+# нові координати через SSE (/coords/stream); без нього — лише опитування diff
+STREAM_ENABLED = True
+
+# ==== ДІАГНОСТИКА ====
+# COORDS_PERF=1 — показати кнопку екрана «Perf» (затримки, FPS, опитування)
+PERF_SCREEN_ENABLED = bool(os.environ.get("COORDS_PERF"))
+# як часто оновлюємо цифри на екрані «Perf»
+PERF_REFRESH_INTERVAL_S = 0.5
 
 TRAINING_CALIBERS = [
     ".22 LR",
@@ -83,69 +151,324 @@ CALIBER_RADIUS_MM = {
 
 
 KV_FILE = "main.kv"
+# мішень за замовчуванням; користувач може підставити власне зображення
+DEFAULT_TARGET_IMAGE = "Image.jpg"
+# екрани, що будуються при першому переході: імʼя -> клас у Factory
+LAZY_SCREENS = {"history": "HistoryScreen", "perf": "PerfScreen"}
+# модуль history (з RecycleView) імпортується, лише коли екран знадобиться
+Factory.register("HistoryScreen", module="history")
+Factory.register("HistoryButton", module="history")
+Factory.register("ArchiveButton", module="history")
+# бенчмарк холодного старту: надрукувати відмітки й вийти після першого кадру
+STARTUP_REPORT_AND_EXIT = bool(os.environ.get("COORDS_STARTUP_EXIT"))
+
+startup = StartupTimer(STARTED_AT)
+startup.mark(STARTUP_IMPORTS)
 
 if platform in ("win", "linux", "macosx"):
     Window.size = (400, 900)
 
 
+class LabelTextureCache:
+    """Спільний на весь процес LRU-кеш текстур для номерів пострілів."""
+
+    def __init__(self, max_bytes: int = LABEL_TEXTURE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._textures: OrderedDict = OrderedDict()
+        self._used_bytes = 0
+
+    def get(
+        self,
+        text: str,
+        font_size: float = POINT_LABEL_FONT_SIZE,
+        color: tuple = POINT_TEXT_COLOR,
+        outline_width: float = POINT_LABEL_OUTLINE_WIDTH,
+    ):
+        key = (text, font_size, tuple(color), outline_width)
+        texture = self._textures.get(key)
+        if texture is not None:
+            self._textures.move_to_end(key)
+            return texture
+
+        label = CoreLabel(
+            text=text,
+            font_size=font_size,
+            bold=True,
+            color=color,
+            outline_color=color,
+            outline_width=outline_width,
+        )
+        label.refresh()
+        texture = label.texture
+        if not texture:
+            return None
+
+        self._textures[key] = texture
+        self._used_bytes += self._texture_bytes(texture)
+        self._evict()
+        return texture
+
+    def clear(self) -> None:
+        self._textures.clear()
+        self._used_bytes = 0
+
+    def _evict(self) -> None:
+        # найстаріші текстури лишаються живими, поки їх тримає якийсь Rectangle
+        while self._used_bytes > self.max_bytes and len(self._textures) > 1:
+            _key, texture = self._textures.popitem(last=False)
+            self._used_bytes -= self._texture_bytes(texture)
+
+    @staticmethod
+    def _texture_bytes(texture) -> int:
+        width, height = texture.size
+        return int(width * height * 4)
+
+
+label_textures = LabelTextureCache()
+
+
+class _PointGraphics:
+    """Інструкції одного пострілу на PointBoard (тримаємо між перемальовками)."""
+
+    __slots__ = (
+        "point_id",
+        "x_mm",
+        "y_mm",
+        "radius_mm",
+        "group",
+        "color",
+        "ellipse",
+        "label",
+    )
+
+    def __init__(self, point_id: int, x_mm: float, y_mm: float, radius_mm: float):
+        self.point_id = point_id
+        self.x_mm = x_mm
+        self.y_mm = y_mm
+        self.radius_mm = radius_mm
+        self.group = InstructionGroup()
+        self.color = None
+        self.ellipse = None
+        self.label = None
+
+
+_MESH_VERTICES_PER_CIRCLE = MESH_CIRCLE_SEGMENTS + 1
+_MESH_FLOATS_PER_CIRCLE = _MESH_VERTICES_PER_CIRCLE * 4  # x, y, u, v
+_MESH_UNIT_CIRCLE = tuple(
+    (
+        math.cos(2 * math.pi * step / MESH_CIRCLE_SEGMENTS),
+        math.sin(2 * math.pi * step / MESH_CIRCLE_SEGMENTS),
+    )
+    for step in range(MESH_CIRCLE_SEGMENTS)
+)
+# трикутники віялом: центр (0) + два сусідні вершини на колі
+_MESH_CIRCLE_INDICES = tuple(
+    index
+    for step in range(MESH_CIRCLE_SEGMENTS)
+    for index in (0, step + 1, (step + 1) % MESH_CIRCLE_SEGMENTS + 1)
+)
+# індекси повного Mesh: кожен новий кружечок бере наступний зріз
+_MESH_CHUNK_INDICES = array(
+    "H",
+    (
+        slot * _MESH_VERTICES_PER_CIRCLE + index
+        for slot in range(MESH_CIRCLES_PER_CHUNK)
+        for index in _MESH_CIRCLE_INDICES
+    ),
+)
+
+
+def _mesh_circle_vertices(transform: BoardTransform, xs, ys, radii) -> array:
+    """Вершини (x, y, u, v) віял для цілих колонок мм — одним проходом."""
+    count = len(xs)
+    np = numpy()
+    if np is not None and count:
+        px, py = transform.to_widget_arrays(xs, ys)
+        radius_px = np.asarray(radii, dtype=float) * transform.length_scale
+        unit = np.asarray(_MESH_UNIT_CIRCLE, dtype=float)
+        block = np.zeros((count, _MESH_VERTICES_PER_CIRCLE, 4), dtype=np.float32)
+        block[:, 0, 0] = px
+        block[:, 0, 1] = py
+        block[:, 1:, 0] = px[:, None] + radius_px[:, None] * unit[:, 0]
+        block[:, 1:, 1] = py[:, None] + radius_px[:, None] * unit[:, 1]
+        vertices = array("f")
+        vertices.frombytes(block.tobytes())
+        return vertices
+
+    vertices = array("f", bytes(count * _MESH_FLOATS_PER_CIRCLE * 4))
+    to_widget = transform.to_widget
+    length_scale = transform.length_scale
+    offset = 0
+    for x_mm, y_mm, radius_mm in zip(xs, ys, radii):
+        px, py = to_widget(x_mm, y_mm)
+        radius_px = radius_mm * length_scale
+        vertices[offset] = px
+        vertices[offset + 1] = py
+        for cos_a, sin_a in _MESH_UNIT_CIRCLE:
+            offset += 4
+            vertices[offset] = px + radius_px * cos_a
+            vertices[offset + 1] = py + radius_px * sin_a
+        offset += 4
+    return vertices
+
+
+def _shot_columns(source, start: int, end: int):
+    """Колонки id/x/y/радіус для source[start:end] — з ShotStore без обʼєктів Shot."""
+    if isinstance(source, ShotStore):
+        return (
+            source.ids[start:end],
+            source.xs[start:end],
+            source.ys[start:end],
+            source.radii[start:end],
+        )
+    ids, xs, ys, radii = [], [], [], []
+    for point in source[start:end]:
+        ids.append(point.get("id"))
+        xs.append(point["x"])
+        ys.append(point["y"])
+        radii.append(point.get("radius_mm", DEFAULT_RADIUS_MM))
+    return ids, xs, ys, radii
+
+
+class _MeshChunk:
+    """Один Mesh із буферами вершин/індексів, які дописуються на місці."""
+
+    __slots__ = ("mesh", "vertices", "indices", "count")
+
+    def __init__(self):
+        self.mesh = Mesh(mode="triangles")
+        self.vertices = array("f")
+        self.indices = array("H")
+        self.count = 0
+
+    def flush(self) -> None:
+        self.mesh.vertices = self.vertices
+        self.mesh.indices = self.indices
+
+
 class PointBoard(Widget):
     """Фон мішені + кружечки пострілів."""
 
-    image_source = StringProperty("Image.jpg")
+    image_source = StringProperty(DEFAULT_TARGET_IMAGE)
     points = ListProperty([])
     selected_point_id = NumericProperty(-1)
     display_all = BooleanProperty(True)
     show_until_selection = BooleanProperty(False)
+    # усі кружечки одним Mesh (без номерів) — для великих груп
+    batched = BooleanProperty(False)
     controller = ObjectProperty(allownone=True)
+    # збільшення аркуша (1 — увесь аркуш) і центр огляду в мм
+    zoom = NumericProperty(1.0)
+    view_x_mm = NumericProperty(0.0)
+    view_y_mm = NumericProperty(0.0)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         with self.canvas.before:
+            # збільшений аркуш обрізаємо по межах віджета
+            StencilPush()
+            self._stencil_mask = Rectangle(pos=self.pos, size=self.size)
+            StencilUse()
             self._bg_color = Color(1, 1, 1, 1)
-            self._background = Rectangle(
-                source=self._resolve_image_path(),
-                pos=self.pos,
-                size=self.size,
-            )
+            # текстуру підставить background_textures, коли декодує файл
+            self._background = Rectangle(pos=self.pos, size=self.size)
+
+        # id пострілу -> його інструкції; порядок малювання — у _drawn_ids
+        self._point_graphics: dict[int, _PointGraphics] = {}
+        self._drawn_ids: list[int] = []
+        self._colored_selection_id = None
+
+        # стан пакетного режиму
+        self._mesh_chunks: list[_MeshChunk] = []
+        self._mesh_coords = array("d")  # x, y, radius_mm для кожного пострілу
+        self._mesh_index: dict[int, int] = {}
+        self._mesh_group = InstructionGroup()
+        self._mesh_group.add(Color(*DEFAULT_POINT_COLOR))
+        self._mesh_selection = Ellipse(size=(0, 0))
+        # усі постріли — всередині трафарету
+        self._points_layer = InstructionGroup()
+        self._points_layer.add(self._mesh_group)
+        self._points_layer.add(Color(*SELECTED_POINT_COLOR))
+        self._points_layer.add(self._mesh_selection)
+
+        # збільшений огляд: лише видимі постріли або кластери, щоразу наново
+        self._viewport_mode = False
+        self._viewport_shapes = InstructionGroup()
+        self._viewport_selection = InstructionGroup()
+        self._viewport_labels = InstructionGroup()
+        for group in (self._viewport_shapes, self._viewport_selection, self._viewport_labels):
+            self._points_layer.add(group)
+        self._model_start = 0
+        # для чого намальовано огляд: поки це не змінилось, постріли лише домальовуються
+        self._viewport_lod = None
+        self._viewport_transform = None
+        self._viewport_rect = (0.0, 0.0, 0.0, 0.0)
+        self._viewport_cell_mm = 0.0
+        self._viewport_max_radius = 0.0
+        self._viewport_count = 0
+        # режим кластерів: клітинка сітки -> номер кружечка в Mesh
+        self._cluster_slots: dict[tuple[int, int], int] = {}
+        self._cluster_chunks: list[_MeshChunk] = []
+        self.canvas.after.add(self._points_layer)
+        with self.canvas.after:
+            StencilUnUse()
+            self._stencil_unmask = Rectangle(pos=self.pos, size=self.size)
+            StencilPop()
+
+        # намальовані постріли в сітці (мм) — для вибору дотиком;
+        # у режимі огляду — усі постріли видимого діапазону
+        self._hit_grid = ShotGrid()
+        self._hit_grid_dirty = False
+        # захоплені дотики й їхні останні позиції (для щипка двома пальцями)
+        self._touches: dict = {}
+        self._touch_positions: dict = {}
 
-        self._point_instructions: list = []
         self._bound_controller = None
         self._image_ratio = 1.0
-        self._draw_area = (self.x, self.y, self.width, self.height)
-        self._load_image_meta()
+        # мм -> пікселі; перераховується лише при зміні розкладки
+        self._transform = BoardTransform()
+        self._load_background()
 
         self.bind(
             pos=self._update_background,
             size=self._update_background,
-            image_source=self._update_background,
+            image_source=self._on_image_source,
+            zoom=self._update_background,
+            view_x_mm=self._update_background,
+            view_y_mm=self._update_background,
+        )
+        self.bind(
+            points=self._schedule_refresh,
+            selected_point_id=self._schedule_refresh,
+            display_all=self._rebuild_points,
+            show_until_selection=self._rebuild_points,
+            batched=self._rebuild_points,
         )
-        self.bind(points=self._refresh_points, selected_point_id=self._refresh_points)
         self.bind(controller=self._on_controller_changed)
-        self.bind(image_source=lambda *_: self._load_image_meta())
         self._update_background()
+        if self.controller:
+            self._on_controller_changed()
 
     # ---- звʼязок з контролером ----
 
     def _on_controller_changed(self, *_):
         if self._bound_controller:
+            self._bound_controller.unsubscribe_shots(self._on_shots_changed)
             self._bound_controller.unbind(
-                points=self._on_controller_points,
                 selected_point_id=self._on_controller_selection,
             )
         self._bound_controller = self.controller
         if self.controller:
+            # з контролером працюємо з дельтами сховища, а не з копіями списку
+            self.controller.subscribe_shots(self._on_shots_changed)
             self.controller.bind(
-                points=self._on_controller_points,
                 selected_point_id=self._on_controller_selection,
             )
-            self._on_controller_points(self.controller, self.controller.points)
             self._on_controller_selection(
                 self.controller,
                 self.controller.selected_point_id,
             )
-
-    def _on_controller_points(self, _instance, value):
-        self.points = value or []
+        self._schedule_refresh()
 
     def _on_controller_selection(self, _instance, value):
         self.selected_point_id = value
@@ -157,26 +480,57 @@ class PointBoard(Widget):
             return self.image_source
         return ""
 
-    def _load_image_meta(self) -> None:
+    def _load_background(self) -> None:
+        """Пропорція — одразу (з кешу розмірів), текстура — коли декодується."""
         path = self._resolve_image_path()
         if not path:
             self._image_ratio = 1.0
+            self._background.texture = None
             return
-        try:
-            texture = CoreImage(path).texture
-            width, height = texture.size
-            if width > 0 and height > 0:
-                self._image_ratio = width / float(height)
-        except Exception:
-            self._image_ratio = 1.0
+        # поки розмір невідомий, розкладаємо під аркуш A4
+        self._image_ratio = background_textures.ratio(path) or A4_WIDTH_MM / A4_HEIGHT_MM
+        self._background.texture = background_textures.request(
+            path,
+            self._on_background_loaded,
+        )
+
+    def _on_background_loaded(self, path: str, texture, ratio) -> None:
+        current = self._resolve_image_path()
+        if not current or os.path.abspath(current) != path:
+            return  # фон уже замінили, поки цей декодувався
+        self._background.texture = texture
+        if ratio and ratio != self._image_ratio:
+            self._image_ratio = ratio
+            self._update_background()
+
+    def _on_image_source(self, *_args) -> None:
+        self._load_background()
+        self._update_background()
 
     def _update_background(self, *_args) -> None:
-        self._background.source = self._resolve_image_path()
+        self._stencil_mask.pos = self._stencil_unmask.pos = self.pos
+        self._stencil_mask.size = self._stencil_unmask.size = self.size
         draw_x, draw_y, draw_w, draw_h = self._calculate_draw_area()
-        self._draw_area = (draw_x, draw_y, draw_w, draw_h)
-        self._background.pos = (draw_x, draw_y)
-        self._background.size = (draw_w, draw_h)
-        self._refresh_points()
+        has_area = draw_w != 0 and draw_h != 0
+        if not has_area:
+            self._background.pos = (draw_x, draw_y)
+            self._background.size = (draw_w, draw_h)
+            draw_x, draw_y, draw_w, draw_h = self.x, self.y, self.width, self.height
+        transform = BoardTransform(
+            draw_x, draw_y, draw_w, draw_h, A4_WIDTH_MM, A4_HEIGHT_MM,
+            self.zoom, self.view_x_mm, self.view_y_mm,
+        )
+        if has_area:
+            # фон масштабується й зсувається разом з аркушем
+            self._background.pos = transform.to_widget(-A4_WIDTH_MM / 2.0, -A4_HEIGHT_MM / 2.0)
+            self._background.size = (
+                A4_WIDTH_MM * transform.scale_x,
+                A4_HEIGHT_MM * transform.scale_y,
+            )
+        if transform == self._transform and (self._drawn_ids or self._viewport_mode):
+            return  # та сама розкладка (наприклад, змінилось лише джерело фону)
+        self._transform = transform
+        self._reposition_points()
 
     def _calculate_draw_area(self) -> tuple[float, float, float, float]:
         width = max(self.width, 0)
@@ -200,108 +554,676 @@ class PointBoard(Widget):
 
     # ---- малювання точок ----
 
+    def _points_source(self):
+        """Звідки малюємо: сховище контролера або власний список points."""
+        if self._bound_controller is not None:
+            return self._bound_controller.shots
+        return self.points
+
+    def _visible_range(self, source) -> tuple[int, int]:
+        total = len(source)
+        if not total:
+            return 0, 0
+        if not self.display_all:
+            return total - 1, total
+        if self.show_until_selection and self.selected_point_id != -1:
+            index = self._index_of(source, self.selected_point_id)
+            if index >= 0:
+                return 0, index + 1
+        return 0, total
+
+    @staticmethod
+    def _index_of(source, point_id: int) -> int:
+        if hasattr(source, "index_of"):
+            return source.index_of(point_id)
+        for index, item in enumerate(source):
+            if item.get("id") == point_id:
+                return index
+        return -1
+
     def _refresh_points(self, *_args) -> None:
-        # прибираємо старі інструкції
-        if self._point_instructions:
-            for instr in self._point_instructions:
-                try:
-                    self.canvas.after.remove(instr)
-                except ValueError:
-                    pass
-            self._point_instructions.clear()
+        """Синхронізує намальовані постріли зі списком, не перебудовуючи все."""
+        if self.width == 0 or self.height == 0:
+            self._clear_drawn_points()
+            return
+
+        source = self._points_source()
+        start, end = self._visible_range(source)
+        count = end - start
+        if count <= 0:
+            self._clear_drawn_points()
+            return
+
+        viewport = self._wants_viewport(count)
+        if viewport != self._viewport_mode:
+            # у режимів спільна лише сітка — перемикаємось із чистого аркуша
+            self._clear_drawn_points()
+            self._viewport_mode = viewport
+        if viewport:
+            self._update_viewport(self._sync_model(source, start, end))
+            self._draw_viewport_selection()
+            return
+
+        drawn = len(self._drawn_ids)
+        if self._drawn_matches(source, start, min(drawn, count)):
+            if count >= drawn:
+                # звичайний випадок: прийшли нові постріли — домальовуємо тільки їх
+                self._append_drawn_points(source, start + drawn, end)
+            else:
+                # show_until_selection: вибрали раніший постріл — прибираємо хвіст
+                self._truncate_drawn_points(count)
+        else:
+            self._clear_drawn_points()
+            self._append_drawn_points(source, start, end)
+
+        self._apply_selection()
 
-        if not self.points or self.width == 0 or self.height == 0:
+    def _schedule_refresh(self, *_args) -> None:
+        """Зміни пострілів і вибору зводяться в один _refresh_points на кадр.
+
+        Він же застосовує вибір, а з show_until_selection ще й обрізає чи
+        домальовує хвіст; на прихованому екрані чекає переходу на нього.
+        """
+        render_scheduler.mark(self, self._render_points)
+
+    def _render_points(self) -> None:
+        self._refresh_points()
+        if self._bound_controller is not None:
+            # нові постріли вже на дошці — PerfMonitor закриє їх найближчим кадром
+            self._bound_controller.perf.mark_rendered(self._points_source())
+
+    def _on_shots_changed(self, event) -> None:
+        if event.kind == SHOTS_REPLACED:
+            # інша доріжка: збіг перших/останніх id ще не означає ті самі постріли
+            self._rebuild_points()
             return
+        self._schedule_refresh()
+
+    def _rebuild_points(self, *_args) -> None:
+        self._clear_drawn_points()
+        self._schedule_refresh()
+
+    def _drawn_matches(self, source, start: int, count: int) -> bool:
+        """Чи перші count намальованих — ті самі постріли, що й у source."""
+        drawn = self._drawn_ids
+        if count == 0:
+            return True
+        return self._same_point(source[start], drawn[0]) and self._same_point(
+            source[start + count - 1],
+            drawn[count - 1],
+        )
 
-        points_to_draw = self.points if self.display_all else self.points[-1:]
+    def _same_point(self, point: dict, point_id: int) -> bool:
+        if point.get("id") != point_id:
+            return False
+        return self._drawn_point_mm(point_id) == (
+            point["x"],
+            point["y"],
+            point.get("radius_mm", DEFAULT_RADIUS_MM),
+        )
 
+    def _drawn_point_mm(self, point_id: int):
+        if self.batched:
+            index = self._mesh_index.get(point_id)
+            if index is None:
+                return None
+            return tuple(self._mesh_coords[index * 3:index * 3 + 3])
+        graphics = self._point_graphics.get(point_id)
+        if graphics is None:
+            return None
+        return graphics.x_mm, graphics.y_mm, graphics.radius_mm
+
+    def _append_drawn_points(self, source, start: int, end: int) -> None:
+        if self.batched:
+            self._append_mesh_points(source, start, end)
+        else:
+            for point in source[start:end]:
+                self._add_point_graphics(point)
+        if not self._hit_grid_dirty:
+            self._index_drawn_points(len(self._hit_grid))
+
+    def _truncate_drawn_points(self, count: int) -> None:
+        if not self._hit_grid_dirty:
+            self._hit_grid.truncate(count)
+        if self.batched:
+            self._truncate_mesh_points(count)
+            return
+        for point_id in self._drawn_ids[count:]:
+            self._remove_point_graphics(point_id)
+        del self._drawn_ids[count:]
+
+    def _clear_drawn_points(self) -> None:
+        self._clear_point_graphics()
+        self._clear_mesh_points()
+        self._clear_viewport()
+        self._hit_grid.clear()
+        self._hit_grid_dirty = False
+
+    def _apply_selection(self) -> None:
+        if self.batched:
+            self._apply_mesh_selection()
+        else:
+            self._apply_selection_color()
+
+    # ---- окремі інструкції на постріл ----
+
+    def _add_point_graphics(self, point: dict) -> None:
+        point_id = point.get("id")
+        if point_id in self._point_graphics:
+            # дубль id — старий запис поступається новому
+            self._remove_point_graphics(point_id)
+            self._drawn_ids.remove(point_id)
+            self._hit_grid_dirty = True  # порядок зсунувся — сітку перебудуємо при дотику
+
+        graphics = _PointGraphics(
+            point_id,
+            point["x"],
+            point["y"],
+            point.get("radius_mm", DEFAULT_RADIUS_MM),
+        )
+        group = graphics.group
+        graphics.color = Color(*DEFAULT_POINT_COLOR)
+        graphics.ellipse = Ellipse()
+        group.add(graphics.color)
+        group.add(graphics.ellipse)
+
+        # підпис (номер пострілу)
+        label_text = str(point_id if point_id is not None else "")
+        if label_text:
+            texture = label_textures.get(label_text)
+            if texture:
+                graphics.label = Rectangle(texture=texture, size=texture.size)
+                group.add(Color(*POINT_TEXT_COLOR))
+                group.add(graphics.label)
+
+        self._place_point_graphics(graphics)
+        self._points_layer.add(group)
+        self._point_graphics[point_id] = graphics
+        self._drawn_ids.append(point_id)
+
+    def _remove_point_graphics(self, point_id: int) -> None:
+        graphics = self._point_graphics.pop(point_id, None)
+        if graphics is None:
+            return
+        self._points_layer.remove(graphics.group)
+        if self._colored_selection_id == point_id:
+            self._colored_selection_id = None
+
+    def _clear_point_graphics(self) -> None:
+        for graphics in self._point_graphics.values():
+            self._points_layer.remove(graphics.group)
+        self._point_graphics.clear()
+        self._drawn_ids.clear()
+        self._colored_selection_id = None
+
+    def _place_point_graphics(self, graphics: "_PointGraphics") -> None:
+        transform = self._transform
+        px, py = transform.to_widget(graphics.x_mm, graphics.y_mm)
+        radius_px = transform.length(graphics.radius_mm)
+        graphics.ellipse.pos = (px - radius_px, py - radius_px)
+        graphics.ellipse.size = (radius_px * 2, radius_px * 2)
+        if graphics.label is not None:
+            label_w, label_h = graphics.label.size
+            graphics.label.pos = (px - label_w / 2, py - label_h / 2)
+
+    def _reposition_points(self) -> None:
+        """Після зміни розміру лише зсуваємо наявні інструкції."""
+        if self.width == 0 or self.height == 0:
+            self._clear_drawn_points()
+            return
+        if not self._drawn_ids or self._viewport_mode or self._zoomed():
+            # огляд перемальовується з сітки: ціна — видимі постріли, а не вся сесія
+            self._schedule_refresh()
+            return
+        if self.batched:
+            self._reposition_mesh_points()
+            return
+        for graphics in self._point_graphics.values():
+            self._place_point_graphics(graphics)
+
+    def _apply_selection_color(self) -> None:
+        """Перефарбовує лише попередній та новий вибраний постріл."""
+        selected_id = self.selected_point_id
+        previous_id = self._colored_selection_id
+        if previous_id == selected_id and selected_id in self._point_graphics:
+            return
+
+        previous = self._point_graphics.get(previous_id)
+        if previous is not None:
+            previous.color.rgba = DEFAULT_POINT_COLOR
+
+        current = self._point_graphics.get(selected_id)
+        if current is not None:
+            current.color.rgba = SELECTED_POINT_COLOR
+            self._colored_selection_id = selected_id
+        else:
+            self._colored_selection_id = None
+
+    # ---- пакетний режим (Mesh) ----
+
+    def _append_mesh_points(self, source, start: int, end: int) -> None:
+        ids, xs, ys, radii = _shot_columns(source, start, end)
+        vertices = _mesh_circle_vertices(self._transform, xs, ys, radii)
+        for offset in range(end - start):
+            self._mesh_index[ids[offset]] = len(self._drawn_ids)
+            self._mesh_coords.extend((xs[offset], ys[offset], radii[offset]))
+            self._drawn_ids.append(ids[offset])
+
+        # дописуємо лише в останній Mesh (і нові за ним) — їх і оновлюємо
+        taken = 0
+        while taken < end - start:
+            chunk = self._mesh_chunks[-1] if self._mesh_chunks else None
+            if chunk is None or chunk.count >= MESH_CIRCLES_PER_CHUNK:
+                chunk = _MeshChunk()
+                self._mesh_chunks.append(chunk)
+                self._mesh_group.add(chunk.mesh)
+            take = min(end - start - taken, MESH_CIRCLES_PER_CHUNK - chunk.count)
+            floats = _MESH_FLOATS_PER_CIRCLE
+            chunk.vertices.extend(vertices[taken * floats:(taken + take) * floats])
+            per_circle = len(_MESH_CIRCLE_INDICES)
+            chunk.indices.extend(
+                _MESH_CHUNK_INDICES[chunk.count * per_circle:(chunk.count + take) * per_circle],
+            )
+            chunk.count += take
+            taken += take
+            chunk.flush()
+
+    def _truncate_mesh_points(self, count: int) -> None:
+        for point_id in self._drawn_ids[count:]:
+            self._mesh_index.pop(point_id, None)
+        del self._drawn_ids[count:]
+        del self._mesh_coords[count * 3:]
+
+        chunks_needed = -(-count // MESH_CIRCLES_PER_CHUNK)
+        for chunk in self._mesh_chunks[chunks_needed:]:
+            self._mesh_group.remove(chunk.mesh)
+        del self._mesh_chunks[chunks_needed:]
+
+        if self._mesh_chunks:
+            chunk = self._mesh_chunks[-1]
+            chunk.count = count - (chunks_needed - 1) * MESH_CIRCLES_PER_CHUNK
+            del chunk.vertices[chunk.count * _MESH_FLOATS_PER_CIRCLE:]
+            del chunk.indices[chunk.count * len(_MESH_CIRCLE_INDICES):]
+            chunk.flush()
+
+    def _clear_mesh_points(self) -> None:
+        for chunk in self._mesh_chunks:
+            self._mesh_group.remove(chunk.mesh)
+        self._mesh_chunks.clear()
+        self._mesh_index.clear()
+        del self._mesh_coords[:]
+        self._mesh_selection.size = (0, 0)
+        if self.batched:
+            self._drawn_ids.clear()
+
+    def _reposition_mesh_points(self) -> None:
+        """Нове перетворення -> по одному перезапису буфера вершин на Mesh."""
+        coords = self._mesh_coords
+        for number, chunk in enumerate(self._mesh_chunks):
+            first = number * MESH_CIRCLES_PER_CHUNK * 3
+            last = first + chunk.count * 3
+            chunk.vertices = _mesh_circle_vertices(
+                self._transform,
+                coords[first:last:3],
+                coords[first + 1:last:3],
+                coords[first + 2:last:3],
+            )
+            chunk.flush()
+        self._apply_mesh_selection()
+
+    def _apply_mesh_selection(self) -> None:
+        """Вибраний постріл малюємо окремим кружечком поверх Mesh."""
+        index = self._mesh_index.get(self.selected_point_id)
+        if index is None:
+            self._mesh_selection.size = (0, 0)
+            return
+        coords = self._mesh_coords
+        px, py = self._transform.to_widget(coords[index * 3], coords[index * 3 + 1])
+        radius_px = self._transform.length(coords[index * 3 + 2])
+        self._mesh_selection.pos = (px - radius_px, py - radius_px)
+        self._mesh_selection.size = (radius_px * 2, radius_px * 2)
+
+    # ---- огляд: відсікання і рівень деталізації ----
+
+    def _wants_viewport(self, count: int) -> bool:
+        """Збільшено або пострілів забагато для окремих кружечків з номерами."""
+        return self._zoomed() or (not self.batched and count > LOD_DETAIL_MAX)
+
+    def _sync_model(self, source, start: int, end: int) -> int:
+        """Сітка = усі постріли видимого діапазону; дописуємо лише нові.
+
+        Повертає індекс сітки, з якого дописано нове, або -1, якщо сітку
+        перебудовано чи обрізано (тоді огляд малюється наново).
+        """
+        grid = self._hit_grid
+        count = end - start
+        indexed = min(len(grid), count)
+        reset = self._model_start != start or not self._grid_matches(source, start, indexed)
+        if reset:
+            grid.clear()
+            indexed = 0
+        self._model_start = start
+        if len(grid) > count:
+            grid.truncate(count)
+            return -1
+        first_new = len(grid)
+        if count > indexed:
+            ids, xs, ys, radii = _shot_columns(source, start + indexed, end)
+            for entry in zip(ids, xs, ys, radii):
+                grid.add(*entry)
+        return -1 if reset else first_new
+
+    def _grid_matches(self, source, start: int, count: int) -> bool:
+        """Чи перші count записів сітки — ті самі постріли, що й у source."""
+        if count == 0:
+            return True
+        grid = self._hit_grid
+        for offset in (0, count - 1):
+            point = source[start + offset]
+            if (
+                point.get("id"),
+                point["x"],
+                point["y"],
+                point.get("radius_mm", DEFAULT_RADIUS_MM),
+            ) != (grid.ids[offset], grid.xs[offset], grid.ys[offset], grid.radii[offset]):
+                return False
+        return True
+
+    def _update_viewport(self, first_new: int) -> None:
+        """Поки огляд не змінився, нові постріли лише домальовуються."""
+        grid = self._hit_grid
         if (
-            self.show_until_selection
-            and self.selected_point_id != -1
-            and self.points
+            first_new < 0
+            or self._viewport_lod is None
+            or self._viewport_transform != self._transform
+            or self._viewport_cell_mm != grid.cell_mm
+            or self._viewport_max_radius != grid.max_radius
         ):
-            partial = []
-            for item in self.points:
-                partial.append(item)
-                if item.get("id") == self.selected_point_id:
-                    break
-            points_to_draw = partial
-
-        for point in points_to_draw:
-            if not point:
-                continue
-
-            px, py = self._mm_to_widget_position(point["x"], point["y"])
-            radius_mm = point.get("radius_mm", 3.0)
-            radius_px = self._mm_to_pixels(radius_mm)
-            is_selected = point.get("id") == self.selected_point_id
-            circle_color = SELECTED_POINT_COLOR if is_selected else DEFAULT_POINT_COLOR
-            text_color = POINT_TEXT_COLOR
-
-            color_instr = Color(*circle_color)
-            ellipse_instr = Ellipse(
-                pos=(px - radius_px, py - radius_px),
-                size=(radius_px * 2, radius_px * 2),
+            self._draw_viewport()
+            return
+        x0, y0, x1, y1 = self._viewport_rect
+        if self._viewport_lod == VIEWPORT_DETAIL:
+            for index in range(first_new, len(grid)):
+                if grid.touches(index, x0, y0, x1, y1):
+                    self._add_visible_point(index)
+            if self._viewport_count > LOD_DETAIL_MAX:
+                self._draw_viewport()  # стало тісно — переходимо на кластери
+            return
+        (cell_x0, cell_y0), (cell_x1, cell_y1) = grid.cell_at(x0, y0), grid.cell_at(x1, y1)
+        touched = set()
+        for index in range(first_new, len(grid)):
+            cell = grid.cell_of(index)
+            if cell_x0 <= cell[0] <= cell_x1 and cell_y0 <= cell[1] <= cell_y1:
+                touched.add(cell)
+        chunks = {id(chunk): chunk for chunk in map(self._place_cluster, touched)}
+        for chunk in chunks.values():
+            chunk.flush()
+
+    def _draw_viewport(self) -> None:
+        """Перемальовує лише видиму частину аркуша — з сітки, без проходу по сесії."""
+        self._clear_viewport()
+        transform = self._transform
+        if not transform.valid:
+            return
+        grid = self._hit_grid
+        self._ensure_hit_grid(self._grid_cell_mm())
+        x0, y0 = transform.to_mm(self.x, self.y)
+        x1, y1 = transform.to_mm(self.right, self.top)
+        self._viewport_rect = (x0, y0, x1, y1)
+        self._viewport_transform = transform
+        self._viewport_cell_mm = grid.cell_mm
+        self._viewport_max_radius = grid.max_radius
+        if grid.count_in(x0, y0, x1, y1) > LOD_DETAIL_MAX:
+            self._viewport_lod = VIEWPORT_CLUSTERS
+            self._draw_clusters(grid.clusters_in(x0, y0, x1, y1))
+            return
+        self._viewport_lod = VIEWPORT_DETAIL
+        for index in grid.indices_in(x0, y0, x1, y1):
+            self._add_visible_point(index)
+
+    def _clear_viewport(self) -> None:
+        self._viewport_lod = None
+        self._viewport_count = 0
+        self._cluster_slots.clear()
+        self._cluster_chunks.clear()
+        self._viewport_shapes.clear()
+        self._viewport_shapes.add(Color(*DEFAULT_POINT_COLOR))
+        self._viewport_labels.clear()
+        self._viewport_labels.add(Color(*POINT_TEXT_COLOR))
+        self._viewport_selection.clear()
+
+    def _add_visible_point(self, index: int) -> None:
+        """Окремий кружечок видимого пострілу; номер — у шарі поверх усіх."""
+        grid = self._hit_grid
+        transform = self._transform
+        px, py = transform.to_widget(grid.xs[index], grid.ys[index])
+        radius_px = transform.length(grid.radii[index])
+        self._viewport_shapes.add(
+            Ellipse(pos=(px - radius_px, py - radius_px), size=(radius_px * 2, radius_px * 2)),
+        )
+        self._viewport_count += 1
+        if self.batched:
+            return
+        texture = label_textures.get(str(grid.ids[index]))
+        if texture:
+            label_w, label_h = texture.size
+            self._viewport_labels.add(
+                Rectangle(texture=texture, size=texture.size, pos=(px - label_w / 2, py - label_h / 2)),
             )
 
-            self.canvas.after.add(color_instr)
-            self.canvas.after.add(ellipse_instr)
-            self._point_instructions.extend([color_instr, ellipse_instr])
-
-            # підпис (номер пострілу)
-            label_text = str(point.get("id", ""))
-            if label_text:
-                label = CoreLabel(
-                    text=label_text,
-                    font_size=POINT_LABEL_FONT_SIZE,
-                    bold=True,
-                    color=text_color,
-                    outline_color=text_color,
-                    outline_width=POINT_LABEL_OUTLINE_WIDTH,
-                )
-                label.refresh()
-                texture = label.texture
-                if texture:
-                    label_instr_color = Color(*text_color)
-                    label_instr = Rectangle(
-                        texture=texture,
-                        size=texture.size,
-                        pos=(
-                            px - texture.size[0] / 2,
-                            py - texture.size[1] / 2,
-                        ),
-                    )
-                    self.canvas.after.add(label_instr_color)
-                    self.canvas.after.add(label_instr)
-                    self._point_instructions.extend(
-                        [label_instr_color, label_instr],
-                    )
-
-    def _mm_to_widget_position(self, x_mm: float, y_mm: float) -> tuple[float, float]:
-        draw_x, draw_y, draw_w, draw_h = self._draw_area
-        if draw_w == 0 or draw_h == 0:
-            draw_x, draw_y, draw_w, draw_h = (
-                self.x,
-                self.y,
-                self.width,
-                self.height,
-            )
+    def _cluster_radius_mm(self, count: int, index: int) -> float:
+        grid = self._hit_grid
+        min_radius_mm = LOD_CLUSTER_MIN_RADIUS / self._transform.length_scale
+        if index >= 0:
+            return max(grid.radii[index], min_radius_mm)
+        # більший кластер — трохи більший кружечок, але не ширший за клітинку
+        base_mm = max(grid.max_radius, min_radius_mm)
+        grown = base_mm * (1.0 + math.log2(count) / 4.0)
+        return max(base_mm, min(grown, grid.cell_mm / 2.0))
+
+    def _draw_clusters(self, clusters: list[tuple]) -> None:
+        """По кружечку на зайняту клітинку сітки, без номерів — одним Mesh."""
+        xs, ys, radii = array("d"), array("d"), array("d")
+        for slot, (cell, (x_mm, y_mm, count, index)) in enumerate(clusters):
+            self._cluster_slots[cell] = slot
+            xs.append(x_mm)
+            ys.append(y_mm)
+            radii.append(self._cluster_radius_mm(count, index))
+
+        vertices = _mesh_circle_vertices(self._transform, xs, ys, radii)
+        floats = _MESH_FLOATS_PER_CIRCLE
+        per_circle = len(_MESH_CIRCLE_INDICES)
+        for first in range(0, len(xs), MESH_CIRCLES_PER_CHUNK):
+            chunk = _MeshChunk()
+            chunk.count = min(len(xs) - first, MESH_CIRCLES_PER_CHUNK)
+            chunk.vertices = vertices[first * floats:(first + chunk.count) * floats]
+            chunk.indices = _MESH_CHUNK_INDICES[:chunk.count * per_circle]
+            chunk.flush()
+            self._cluster_chunks.append(chunk)
+            self._viewport_shapes.add(chunk.mesh)
+
+    def _place_cluster(self, cell: tuple[int, int]) -> "_MeshChunk":
+        """Перезаписує (чи дописує) кружечок однієї клітинки; flush — за викликачем."""
+        x_mm, y_mm, count, index = self._hit_grid.cluster(cell)
+        vertices = _mesh_circle_vertices(
+            self._transform,
+            (x_mm,),
+            (y_mm,),
+            (self._cluster_radius_mm(count, index),),
+        )
+        floats = _MESH_FLOATS_PER_CIRCLE
+        slot = self._cluster_slots.get(cell)
+        if slot is not None:
+            chunk = self._cluster_chunks[slot // MESH_CIRCLES_PER_CHUNK]
+            offset = (slot % MESH_CIRCLES_PER_CHUNK) * floats
+            chunk.vertices[offset:offset + floats] = vertices
+            return chunk
+
+        self._cluster_slots[cell] = len(self._cluster_slots)
+        chunk = self._cluster_chunks[-1] if self._cluster_chunks else None
+        if chunk is None or chunk.count >= MESH_CIRCLES_PER_CHUNK:
+            chunk = _MeshChunk()
+            self._cluster_chunks.append(chunk)
+            self._viewport_shapes.add(chunk.mesh)
+        per_circle = len(_MESH_CIRCLE_INDICES)
+        chunk.vertices.extend(vertices)
+        chunk.indices.extend(
+            _MESH_CHUNK_INDICES[chunk.count * per_circle:(chunk.count + 1) * per_circle],
+        )
+        chunk.count += 1
+        return chunk
+
+    def _draw_viewport_selection(self) -> None:
+        """Вибраний постріл — поверх решти, навіть усередині кластера."""
+        group = self._viewport_selection
+        group.clear()
+        if self.selected_point_id == -1 or self._viewport_lod is None:
+            return
+        grid = self._hit_grid
+        index = self._index_of(self._points_source(), self.selected_point_id) - self._model_start
+        if not 0 <= index < len(grid) or grid.ids[index] != self.selected_point_id:
+            return
+        transform = self._transform
+        px, py = transform.to_widget(grid.xs[index], grid.ys[index])
+        radius_px = max(transform.length(grid.radii[index]), LOD_CLUSTER_MIN_RADIUS)
+        group.add(Color(*SELECTED_POINT_COLOR))
+        group.add(Ellipse(pos=(px - radius_px, py - radius_px), size=(radius_px * 2, radius_px * 2)))
+
+    # ---- масштаб і зсув ----
+
+    def _zoomed(self) -> bool:
+        return self.zoom > 1.0
+
+    def set_view(self, zoom: float, x_mm: float, y_mm: float) -> None:
+        """Масштаб і центр огляду (мм); за край аркуша огляд не виходить."""
+        zoom = min(max(zoom, 1.0), ZOOM_MAX)
+        limit_x = A4_WIDTH_MM / 2.0 * (1.0 - 1.0 / zoom)
+        limit_y = A4_HEIGHT_MM / 2.0 * (1.0 - 1.0 / zoom)
+        self.zoom = zoom
+        self.view_x_mm = min(max(x_mm, -limit_x), limit_x)
+        self.view_y_mm = min(max(y_mm, -limit_y), limit_y)
+
+    def reset_view(self) -> None:
+        self.set_view(1.0, 0.0, 0.0)
+
+    def zoom_at(self, factor: float, x: float, y: float) -> None:
+        """Збільшує в factor разів; точка віджета (x, y) лишається на місці."""
+        transform = self._transform
+        zoom = min(max(self.zoom * factor, 1.0), ZOOM_MAX)
+        if not transform.valid or zoom == self.zoom:
+            return
+        focus_x, focus_y = transform.to_mm(x, y)
+        ratio = self.zoom / zoom
+        self.set_view(
+            zoom,
+            focus_x + (self.view_x_mm - focus_x) * ratio,
+            focus_y + (self.view_y_mm - focus_y) * ratio,
+        )
 
-        x_ratio = (x_mm + (A4_WIDTH_MM / 2.0)) / A4_WIDTH_MM
-        y_ratio = (y_mm + (A4_HEIGHT_MM / 2.0)) / A4_HEIGHT_MM
+    def pan_by(self, dx: float, dy: float) -> None:
+        """Зсуває огляд на (dx, dy) пікселів: аркуш їде за пальцем."""
+        transform = self._transform
+        if not transform.valid or not self._zoomed():
+            return
+        self.set_view(
+            self.zoom,
+            self.view_x_mm - dx / transform.scale_x,
+            self.view_y_mm - dy / transform.scale_y,
+        )
 
-        px = draw_x + x_ratio * draw_w
-        py = draw_y + y_ratio * draw_h
-        return px, py
+    # ---- дотики: вибір, щипок, зсув ----
 
-    def _mm_to_pixels(self, value_mm: float) -> float:
-        if value_mm == 0:
-            return 0.0
-        draw_w = self._draw_area[2] or self.width
-        draw_h = self._draw_area[3] or self.height
-        scale_x = draw_w / A4_WIDTH_MM if A4_WIDTH_MM else 0.0
-        scale_y = draw_h / A4_HEIGHT_MM if A4_HEIGHT_MM else 0.0
-        return value_mm * min(scale_x, scale_y)
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return super().on_touch_down(touch)
+        if touch.is_mouse_scrolling:
+            if touch.button not in ("scrolldown", "scrollup"):
+                return super().on_touch_down(touch)
+            factor = ZOOM_WHEEL_STEP if touch.button == "scrolldown" else 1.0 / ZOOM_WHEEL_STEP
+            self.zoom_at(factor, *touch.pos)
+            return True
+        if getattr(touch, "button", "left") != "left":
+            return super().on_touch_down(touch)
+        if touch.is_double_tap and self._zoomed():
+            self.reset_view()
+            return True
+        touch.grab(self)
+        self._touches[touch.uid] = touch
+        self._touch_positions[touch.uid] = touch.pos
+        # вибір — на відпусканні, якщо палець не рушив і другого не було
+        for grabbed in self._touches.values():
+            grabbed.ud["point_board_tap"] = len(self._touches) == 1
+        return True
+
+    def on_touch_move(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_move(touch)
+        previous_x, previous_y = self._touch_positions.get(touch.uid, touch.pos)
+        self._touch_positions[touch.uid] = touch.pos
+        others = [pos for uid, pos in self._touch_positions.items() if uid != touch.uid]
+        if others:
+            other_x, other_y = others[0]
+            before = math.hypot(previous_x - other_x, previous_y - other_y)
+            after = math.hypot(touch.x - other_x, touch.y - other_y)
+            if before > 0:
+                self.zoom_at(after / before, (previous_x + other_x) / 2.0, (previous_y + other_y) / 2.0)
+            # середина між пальцями зсунулась на половину руху цього пальця
+            self.pan_by((touch.x - previous_x) / 2.0, (touch.y - previous_y) / 2.0)
+            return True
+        if math.hypot(touch.x - touch.ox, touch.y - touch.oy) > TAP_SLOP:
+            touch.ud["point_board_tap"] = False
+        if not touch.ud.get("point_board_tap"):
+            self.pan_by(touch.x - previous_x, touch.y - previous_y)
+        return True
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_up(touch)
+        touch.ungrab(self)
+        self._touches.pop(touch.uid, None)
+        self._touch_positions.pop(touch.uid, None)
+        if touch.ud.get("point_board_tap"):
+            self.select_at(*touch.pos)
+        return True
+
+    def select_at(self, x: float, y: float) -> None:
+        point_id = self.point_at(x, y)
+        if point_id is None:
+            return
+        if self._bound_controller is not None:
+            self._bound_controller.select_point(point_id)
+        else:
+            self.selected_point_id = point_id
+
+    def point_at(self, x: float, y: float):
+        """id пострілу під точкою віджета (x, y) або None."""
+        transform = self._transform
+        if not transform.valid or not (self._drawn_ids or self._viewport_mode):
+            return None
+        self._ensure_hit_grid(self._grid_cell_mm())
+        tolerance_mm = TAP_TOLERANCE / transform.length_scale
+        x_mm, y_mm = transform.to_mm(x, y)
+        return self._hit_grid.hit(x_mm, y_mm, tolerance_mm)
+
+    def _grid_cell_mm(self) -> float:
+        """Крок сітки — два допуски дотику, тобто сталий у пікселях."""
+        return TAP_TOLERANCE * 2.0 / self._transform.length_scale
+
+    def _index_drawn_points(self, start: int) -> None:
+        grid = self._hit_grid
+        for point_id in self._drawn_ids[start:]:
+            x_mm, y_mm, radius_mm = self._drawn_point_mm(point_id)
+            grid.add(point_id, x_mm, y_mm, radius_mm)
+
+    def _ensure_hit_grid(self, cell_mm: float) -> None:
+        """Лінива перебудова: після зсуву порядку або сильної зміни масштабу."""
+        grid = self._hit_grid
+        if self._hit_grid_dirty:
+            grid.clear()
+            self._index_drawn_points(0)
+            self._hit_grid_dirty = False
+        if not 0.5 <= grid.cell_mm / max(cell_mm, GRID_MIN_CELL_MM) <= 2.0:
+            grid.rebuild(cell_mm)
 
 
 class PrimaryButton(Button):
@@ -351,61 +1273,64 @@ class LockableSpinner(LimitedSpinner):
         return super().on_touch_up(touch)
 
 
-class HistoryButton(RecycleDataViewBehavior, Button):
-    point_id = NumericProperty(-1)
-    selected = BooleanProperty(False)
-
-    def refresh_view_attrs(self, rv, index, data):
-        self.point_id = data.get("point_id", -1)
-        self.selected = data.get("selected", False)
-        self.text = data.get("text", "")
-        return super().refresh_view_attrs(rv, index, data)
-
-    def on_release(self):
-        app = App.get_running_app()
-        if app and app.root:
-            app.root.select_point(self.point_id)
-
-
 class MainScreen(Screen):
     controller = ObjectProperty(allownone=True, rebind=True)
 
 
-class HistoryScreen(Screen):
+class PerfScreen(Screen):
+    """Діагностика: перцентилі затримок постріл -> екран, FPS, частота опитувань."""
+
     controller = ObjectProperty(allownone=True, rebind=True)
+    stats_text = StringProperty("")
 
-    def on_kv_post(self, base_widget):
-        super().on_kv_post(base_widget)
-        self._history_rv = self.ids.history_rv
-        self._bind_to_controller()
+    def on_enter(self, *_):
+        self._refresh()
+        self._refresh_event = Clock.schedule_interval(
+            self._refresh,
+            PERF_REFRESH_INTERVAL_S,
+        )
 
-    def on_controller(self, *_):
-        self._bind_to_controller()
+    def on_leave(self, *_):
+        event = getattr(self, "_refresh_event", None)
+        if event is not None:
+            event.cancel()
+            self._refresh_event = None
 
-    def _bind_to_controller(self):
-        if (
-            not hasattr(self, "_history_rv")
-            or not self.controller
-            or getattr(self, "_controller_bound", False)
-        ):
+    def _refresh(self, *_):
+        if not self.controller:
             return
+        snapshot = self.controller.perf.snapshot()
+        lines = [
+            f"FPS {snapshot['fps']:5.1f}   опитувань/с {snapshot['poll_rate']:4.1f}",
+            f"пострілів {snapshot['shots']}",
+            "",
+            f"{'етап, мс':<14}{'p50':>8}{'p95':>8}{'p99':>8}{'n':>7}",
+            _perf_row("кадр", snapshot["frame_ms"]),
+        ]
+        for stage, stats in snapshot["stages"].items():
+            lines.append(_perf_row(stage, stats))
+        if snapshot["startup_ms"]:
+            lines.append("")
+            lines.append(
+                "старт, мс  "
+                + "  ".join(f"{name} {value:.0f}" for name, value in snapshot["startup_ms"].items())
+                + f"  (бюджет {STARTUP_BUDGET_MS:.0f})",
+            )
+        self.stats_text = "\n".join(lines)
 
-        self.controller.bind(
-            points=self._update_history,
-            selected_point_id=self._update_history,
-            selected_distance_m=self._update_history,
-        )
-        self._controller_bound = True
-        Clock.schedule_once(lambda *_: self._update_history(), 0)
 
-    def _update_history(self, *args):
-        if not self.controller or not hasattr(self, "_history_rv"):
-            return
-        self._history_rv.data = self.controller.get_history_entries()
+def _perf_row(name: str, stats: dict) -> str:
+    if not stats["count"]:
+        return f"{name:<14}{'—':>8}{'—':>8}{'—':>8}{0:>7}"
+    return (
+        f"{name:<14}{stats['p50']:>8.1f}{stats['p95']:>8.1f}"
+        f"{stats['p99']:>8.1f}{stats['count']:>7}"
+    )
 
 
 class RootWidget(BoxLayout):
-    points = ListProperty([])
+    # лічильник змін сховища пострілів; на нього звʼязано points
+    shots_revision = NumericProperty(0)
     latest_point = ObjectProperty(allownone=True)
     selected_point_id = NumericProperty(-1)
 
@@ -418,14 +1343,46 @@ class RootWidget(BoxLayout):
     selected_caliber = StringProperty("")
     controls_locked = BooleanProperty(False)
 
+    # ціна кліку прицілу (ключ ballistics.CLICK_VALUES)
+    click_options = ListProperty(list(CLICK_VALUES))
+    selected_click = StringProperty(DEFAULT_CLICK)
+
     calibration_text = StringProperty("—")
     calibration_distance_text = StringProperty("25 м")
     caliber_display_text = StringProperty("—")
+    # зображення мішені для обох PointBoard; міняється під час роботи
+    target_image = StringProperty(DEFAULT_TARGET_IMAGE)
+    perf_enabled = BooleanProperty(PERF_SCREEN_ENABLED)
+    group_text = StringProperty("—")
+    group_adjustment_text = StringProperty("—")
+    # зростає з кожною сесією, що пішла в архів
+    archive_revision = NumericProperty(0)
+    # перемикач доріжок (видно, коли їх більше однієї)
+    lane_labels = ListProperty([])
+    lane_label = StringProperty("")
+
+    def _get_points(self):
+        return self.shots
+
+    # сумісний з KV вигляд сховища (лише читання); дельти — через shots.subscribe
+    points = AliasProperty(_get_points, None, bind=["shots_revision"])
 
     def __init__(self, **kwargs):
+        self.group = GroupStats()  # центр, розмах, SD — наживо, без проходу по всіх
+        # затримки постріл -> екран; кадри рахуємо по Window.on_flip
+        self.perf = PerfMonitor()
+        self.perf.startup = startup
+        # кожна доріжка — свій сервер, сховище й курсор; shots — показаної
+        self._shot_listeners: list = []
+        self.lanes = self._create_lanes()
+        self.lane = self.lanes[0]
+        self.shots = self.lane.shots
+        self.shots.subscribe(self._on_shots_changed)
         super().__init__(**kwargs)
+        self._update_lane_labels()
         self._next_point_id = 1
         self._screen_manager = None
+        self._adjustments = AdjustmentEngine(self.selected_click)
 
         self.distance_labels = [
             self._format_distance(value) for value in self.distance_options
@@ -442,14 +1399,11 @@ class RootWidget(BoxLayout):
         self._initialize_lock_state()
         self._refresh_calibration_texts()
 
-        # ---- стан для роботи з сервером ----
-        self._last_server_id = -1
-        self._poll_event = None
-        self._poll_in_progress = False  # захист від паралельних запитів
+        Window.bind(on_flip=self.perf.on_frame)
         self._reset_started_at = None   # час початку скидання
 
-        # після побудови інтерфейсу тягнемо повний список з сервера
-        Clock.schedule_once(self._load_initial_points_from_server, 0)
+        # після побудови інтерфейсу кожна доріжка підхоплює збережену сесію, далі — сервер
+        Clock.schedule_once(self._start_lanes, 0)
 
     # ---- звʼязок з ScreenManager ----
 
@@ -467,11 +1421,40 @@ class RootWidget(BoxLayout):
 
     def switch_to(self, screen_name: str) -> None:
         manager = self._screen_manager or self.ids.get("screen_manager")
-        if manager and screen_name in manager.screen_names:
-            manager.current = screen_name
+        if not manager:
+            return
+        if screen_name not in manager.screen_names and not self._build_screen(
+            manager,
+            screen_name,
+        ):
+            return
+        manager.current = screen_name
+
+    def _build_screen(self, manager, screen_name: str) -> bool:
+        """Екран з LAZY_SCREENS будується (і імпортується) лише при першому переході."""
+        class_name = LAZY_SCREENS.get(screen_name)
+        if class_name is None:
+            return False
+        manager.add_widget(Factory.get(class_name)(name=screen_name, controller=self))
+        return True
 
     # ---- реакція на зміну точок ----
 
+    def subscribe_shots(self, callback) -> None:
+        """Дельти показаної доріжки; при перемиканні — одна подія SHOTS_REPLACED."""
+        if callback not in self._shot_listeners:
+            self._shot_listeners.append(callback)
+
+    def unsubscribe_shots(self, callback) -> None:
+        if callback in self._shot_listeners:
+            self._shot_listeners.remove(callback)
+
+    def _on_shots_changed(self, event) -> None:
+        self.group.on_shots_changed(event, self.shots)
+        self.shots_revision += 1
+        for callback in list(self._shot_listeners):
+            callback(event)
+
     def on_points(self, *_):
         self._update_controls_lock_state()
         self._refresh_calibration_texts()
@@ -483,57 +1466,82 @@ class RootWidget(BoxLayout):
 
     def generate_point(self) -> None:
         """Локальна генерація точки (не використовується в проді)."""
-        point = {
-            "id": self._next_point_id,
-            "x": round(
-                random.uniform(-A4_WIDTH_MM / 2.0, A4_WIDTH_MM / 2.0),
-                1,
-            ),
-            "y": round(
-                random.uniform(-A4_HEIGHT_MM / 2.0, A4_HEIGHT_MM / 2.0),
-                1,
-            ),
-            "radius_mm": self._current_radius_mm(),
-        }
+        point = Shot(
+            self._next_point_id,
+            round(random.uniform(-A4_WIDTH_MM / 2.0, A4_WIDTH_MM / 2.0), 1),
+            round(random.uniform(-A4_HEIGHT_MM / 2.0, A4_HEIGHT_MM / 2.0), 1),
+            self._current_radius_mm(),
+        )
         self._next_point_id += 1
 
-        self.points = self.points + [point]
+        self.shots.append([point])
         self.latest_point = point
-        self.selected_point_id = point["id"]
+        self.selected_point_id = point.id
         self._refresh_calibration_texts()
         self._update_controls_lock_state()
 
     # ---- вибір точки / історія ----
 
     def select_point(self, point_id: int) -> None:
-        for item in self.points:
-            if item.get("id") == point_id:
-                self.selected_point_id = point_id
-                self.latest_point = item
-                self._refresh_calibration_texts()
-                break
+        item = self.shots.get_by_id(point_id)
+        if item is not None:
+            self.selected_point_id = point_id
+            self.latest_point = item
+            self._refresh_calibration_texts()
 
     def get_history_entries(self) -> list[dict]:
+        return self.build_history_rows(0, len(self.shots))
+
+    def build_history_rows(self, start: int, end: int) -> list[dict]:
+        """Рядки історії для shots[start:end], від найновішого до найстарішого."""
+        shots = self.shots
+        distance_m = self.selected_distance_m
+        distance_label = f"{self._format_distance(distance_m)}"
+        selected_id = self.selected_point_id
+        # поправки для всієї пачки — одним пакетним розрахунком
+        adjustments = self._adjustments.format_batch(
+            shots.xs[start:end],
+            shots.ys[start:end],
+            distance_m,
+        )
+
         entries: list[dict] = []
-        for point in reversed(self.points):
-            adjustment = self._format_adjustment_text(
-                point,
-                self.selected_distance_m,
-            )
-            distance_label = f"{self._format_distance(self.selected_distance_m)}"
+        for index in range(end - 1, start - 1, -1):
+            point_id = shots.ids[index]
             label = (
-                f"#{point['id']:03d}  {adjustment}  {distance_label}  "
-                f"X: {point['x']} мм | Y: {point['y']} мм"
+                f"#{point_id:03d}  {adjustments[index - start]}  {distance_label}  "
+                f"X: {shots.xs[index]} мм | Y: {shots.ys[index]} мм"
             )
             entries.append(
                 {
                     "text": label,
-                    "point_id": point["id"],
-                    "selected": point["id"] == self.selected_point_id,
+                    "point_id": point_id,
+                    "selected": point_id == selected_id,
                 },
             )
         return entries
 
+    def build_archive_rows(self, session: dict, snapshot) -> list[dict]:
+        """Рядки сторінки архівної сесії — у порядку пострілів."""
+        distance_m = session.get("distance_m") or self.selected_distance_m
+        distance_label = self._format_distance(distance_m)
+        adjustments = self._adjustments.format_batch(snapshot.xs, snapshot.ys, distance_m)
+        return [
+            {
+                "text": (
+                    f"#{point_id:03d}  {adjustment}  {distance_label}  "
+                    f"X: {x} мм | Y: {y} мм"
+                ),
+                "session_id": -1,
+            }
+            for point_id, adjustment, x, y in zip(
+                snapshot.ids,
+                adjustments,
+                snapshot.xs,
+                snapshot.ys,
+            )
+        ]
+
     # ---- дистанція / калібр ----
 
     def set_distance(self, distance_m: float) -> None:
@@ -550,6 +1558,7 @@ class RootWidget(BoxLayout):
             self.selected_distance_m,
         )
         self._refresh_calibration_texts()
+        self._persist_meta("distance_m", self.selected_distance_m)
 
     def get_calibration_label(self) -> str:
         if not self.latest_point:
@@ -597,190 +1606,200 @@ class RootWidget(BoxLayout):
                 self.set_distance(float(value))
                 return
 
+    def set_click_value(self, click: str) -> None:
+        if click not in CLICK_VALUES or click == self.selected_click:
+            return
+        self.selected_click = click
+
+    def on_selected_click(self, *_):
+        self._adjustments.configure(self.selected_click)
+        self._refresh_calibration_texts()
+        self._persist_meta("click", self.selected_click)
+
+    def set_target_image(self, path: str) -> bool:
+        """Власне зображення мішені (шлях до файлу); порожній шлях — стандартне."""
+        path = path or DEFAULT_TARGET_IMAGE
+        if not os.path.isfile(path):
+            print("Зображення мішені не знайдено:", path)
+            return False
+        if path != self.target_image:
+            self.target_image = path
+            self._persist_meta("target_image", path)
+        return True
+
     def set_caliber(self, caliber: str) -> None:
         if self.controls_locked:
             return
         if caliber and caliber in self.caliber_options:
+            if caliber == self.selected_caliber:
+                return
             self.selected_caliber = caliber
             self._update_caliber_display()
+            self._persist_meta("caliber", caliber)
 
     # ---- завершення сесії ----
 
     def finish_session(self) -> None:
         """Кнопка 'Завершити' — заміряємо затримку до відповіді сервера."""
         self._reset_started_at = time.perf_counter()
-        self._clear_server_points()
+        self.lane.clear_server(on_done=self._report_reset_time)
 
-    # ---------- РОБОТА З СЕРВЕРОМ ----------
+    def _report_reset_time(self, ok: bool) -> None:
+        started = self._reset_started_at
+        if started is None:
+            return
+        self._reset_started_at = None
+        dt_ms = (time.perf_counter() - started) * 1000.0
+        print(f"{'OK' if ok else 'ПОМИЛКА'}: скидання завершилось за {dt_ms:.0f} мс")
+        self.perf.record(STAGE_RESET, dt_ms)
 
-    def _load_initial_points_from_server(self, *_):
-        """Разове завантаження повного списку координат з сервера."""
-        url = f"{SERVER_URL}/coords/all"
+    # ---------- ДОРІЖКИ ----------
 
-        def ok(_req, result):
-            if isinstance(result, dict):
-                coords = result.get("coords") or []
-            elif isinstance(result, list):
-                coords = result
-            else:
-                coords = []
-
-            points: list[dict] = []
-            last_id = -1
-
-            for item in coords:
-                try:
-                    pid = int(item.get("id", 0))
-                except Exception:
-                    pid = 0
-                try:
-                    x = float(item.get("x", 0.0))
-                    y = float(item.get("y", 0.0))
-                except Exception:
-                    x, y = 0.0, 0.0
-
-                points.append(
-                    {
-                        "id": pid,
-                        "x": x,
-                        "y": y,
-                        "radius_mm": self._current_radius_mm(),
-                    },
-                )
-                if pid > last_id:
-                    last_id = pid
-
-            self.points = points
-            if points:
-                self.latest_point = points[-1]
-                self.selected_point_id = points[-1]["id"]
-            else:
-                self.latest_point = None
-                self.selected_point_id = -1
+    def _create_lanes(self) -> list:
+        app = App.get_running_app()
+        lanes = []
+        for index, (name, url) in enumerate(parse_lanes(os.environ.get(LANES_ENV), SERVER_URL)):
+            lanes.append(
+                Lane(
+                    name,
+                    url,
+                    owner=self,
+                    perf=self.perf,
+                    radius_mm=self._current_radius_mm,
+                    db_path=(
+                        os.path.join(app.user_data_dir, lane_db_name(index, name))
+                        if app
+                        else None
+                    ),
+                    poll_interval=POLL_INTERVAL_S,
+                    request_timeout=REQUEST_TIMEOUT_S,
+                    stream_enabled=STREAM_ENABLED,
+                ),
+            )
+        return lanes
 
-            self._last_server_id = last_id
-            self._initialize_lock_state()
-            self._refresh_calibration_texts()
+    def _start_lanes(self, *_args) -> None:
+        for lane in self.lanes:
+            lane.start()
 
-            # запускаємо періодичне опитування coords/diff
-            if not self._poll_event:
-                self._poll_event = Clock.schedule_interval(
-                    self._poll_server_for_new_points,
-                    POLL_INTERVAL_S,
-                )
+    def select_lane(self, label: str) -> None:
+        """Перемикач доріжок: показуємо іншу, решта приймають постріли далі."""
+        if label not in self.lane_labels:
+            return
+        lane = self.lanes[self.lane_labels.index(label)]
+        if lane is self.lane:
+            return
+        self.shots.unsubscribe(self._on_shots_changed)
+        self.lane = lane
+        self.shots = lane.shots
+        self.shots.subscribe(self._on_shots_changed)
+        lane.unread = False
+        self._update_lane_labels()
+        # підписникам — одна подія: вміст замінено повністю
+        self._on_shots_changed(ShotEvent(SHOTS_REPLACED, 0, len(self.shots)))
+        self.latest_point = self.shots.last
+        self.selected_point_id = self.latest_point.id if self.latest_point else -1
+        self._update_controls_lock_state()
 
-        def err(_req, error):
-            print("Помилка отримання всіх координат із сервера:", error)
-            if not self._poll_event:
-                self._poll_event = Clock.schedule_interval(
-                    self._poll_server_for_new_points,
-                    POLL_INTERVAL_S,
-                )
+    def _update_lane_labels(self) -> None:
+        # • — на доріжці є постріли, яких ще не бачили
+        self.lane_labels = [
+            f"Доріжка {lane.name}{' •' if lane.unread else ''}" for lane in self.lanes
+        ]
+        self.lane_label = self.lane_labels[self.lanes.index(self.lane)]
 
-        UrlRequest(url, on_success=ok, on_error=err, on_failure=err)
+    def handle_lane_restored(self, lane, meta: dict) -> None:
+        """Налаштування (дистанція, калібр, ціна кліку, мішень) живуть у сесії першої доріжки."""
+        if lane is not self.lanes[0]:
+            return
+        try:
+            distance_m = float(meta.get("distance_m", self.selected_distance_m))
+        except ValueError:
+            distance_m = self.selected_distance_m
+        if distance_m > 0:
+            self.selected_distance_m = distance_m
+        if meta.get("caliber") in self.caliber_options:
+            self.selected_caliber = meta["caliber"]
+            self._update_caliber_display()
+        if meta.get("click") in CLICK_VALUES:
+            self.selected_click = meta["click"]
+        if os.path.isfile(meta.get("target_image", "")):
+            self.target_image = meta["target_image"]
+
+    def handle_lane_appended(self, lane) -> None:
+        if lane is not self.lane:
+            # прихована доріжка: лише позначка в перемикачі, раз до перегляду
+            if len(lane.shots) and not lane.unread:
+                lane.unread = True
+                self._update_lane_labels()
+            return
+        self.latest_point = self.shots.last
+        self.selected_point_id = self.latest_point.id if self.latest_point else -1
+        self._update_controls_lock_state()
 
-    def _poll_server_for_new_points(self, _dt):
-        """Кожні POLL_INTERVAL_S секунд питаємо про нові точки."""
-        if self._poll_in_progress:
+    def handle_lane_reset(self, lane) -> None:
+        """Доріжка спорожніє: непорожня сесія йде в архів її бази."""
+        if len(lane.shots) and lane.store is not None:
+            lane.store.archive(time.time(), self.selected_distance_m, self.selected_caliber)
+            if lane is self.lane:
+                self.archive_revision += 1
+        if lane is not self.lane:
             return
-        self._poll_in_progress = True
+        self.latest_point = None
+        self.selected_point_id = -1
+        self._next_point_id = 1
+        self.controls_locked = False
+        self._refresh_calibration_texts()
 
-        url = f"{SERVER_URL}/coords/diff?last_id={self._last_server_id}"
+    def _local_clear_state(self) -> None:
+        """Локально прибираємо всі точки показаної доріжки."""
+        self.lane.reset_local()
 
-        def ok(_req, result):
-            self._poll_in_progress = False
+    # ---------- ЛОКАЛЬНА КОПІЯ СЕСІЇ ----------
 
-            if isinstance(result, dict):
-                coords = result.get("coords") or []
-            elif isinstance(result, list):
-                coords = result
-            else:
-                coords = []
+    def read_archive_sessions(self, offset: int, limit: int, callback) -> None:
+        if self.lane.store is None:
+            callback(0, [])
+            return
+        self.lane.store.read_archive_sessions(offset, limit, callback)
 
-            if not coords:
-                return
+    def read_archive_shots(self, session_id: int, offset: int, limit: int, callback) -> None:
+        if self.lane.store is None:
+            callback(0, SessionSnapshot())
+            return
+        self.lane.store.read_archive_shots(session_id, offset, limit, callback)
 
-            new_points: list[dict] = []
-            last_id = self._last_server_id
-
-            for item in coords:
-                try:
-                    pid = int(item.get("id", 0))
-                except Exception:
-                    continue
-                try:
-                    x = float(item.get("x", 0.0))
-                    y = float(item.get("y", 0.0))
-                except Exception:
-                    x, y = 0.0, 0.0
-
-                new_points.append(
-                    {
-                        "id": pid,
-                        "x": x,
-                        "y": y,
-                        "radius_mm": self._current_radius_mm(),
-                    },
-                )
-                if pid > last_id:
-                    last_id = pid
-
-            if not new_points:
-                return
+    def _persist_meta(self, key: str, value) -> None:
+        self.lanes[0].persist_meta(key, value)
 
-            self.points = self.points + new_points
-            self.latest_point = self.points[-1]
-            self.selected_point_id = self.latest_point["id"]
-            self._last_server_id = last_id
-            self._update_controls_lock_state()
+    def flush_session(self) -> None:
+        for lane in self.lanes:
+            if lane.store is not None:
+                lane.store.flush()
 
-        def err(_req, error):
-            self._poll_in_progress = False
-            print("Помилка опитування coords/diff:", error)
+    def close_session_store(self) -> None:
+        for lane in self.lanes:
+            lane.close_store()
 
-        UrlRequest(url, on_success=ok, on_error=err, on_failure=err)
+    # ---------- РОБОТА З СЕРВЕРОМ ----------
 
-    def _clear_server_points(self) -> None:
-        """Запит на очищення списку на сервері + вимір затримки скидання."""
-        url = f"{SERVER_URL}/coords/clear"
+    def pause_network(self) -> None:
+        """Застосунок пішов у фон — не тримаємо радіо зайнятим."""
+        for lane in self.lanes:
+            lane.pause()
 
-        def _report_reset_time(prefix: str) -> None:
-            started = getattr(self, "_reset_started_at", None)
-            if started is None:
-                return
-            dt_ms = (time.perf_counter() - started) * 1000.0
-            print(f"{prefix}: скидання завершилось за {dt_ms:.0f} мс")
-            # покажемо час скидання у полі калібрування (для дебагу)
-            self.calibration_text = f"Скидання: {dt_ms:.0f} мс"
-
-        def ok(_req, result):
-            _report_reset_time("OK")
-            print("Сервер очистив список координат:", result)
-            self._local_clear_state()
-
-        def err(_req, error):
-            _report_reset_time("ПОМИЛКА")
-            print("Помилка очистки списку координат на сервері:", error)
-            self._local_clear_state()
-
-        UrlRequest(
-            url,
-            method="POST",
-            req_body=b"",
-            on_success=ok,
-            on_error=err,
-            on_failure=err,
-        )
+    def resume_network(self) -> None:
+        for lane in self.lanes:
+            lane.resume()
 
-    def _local_clear_state(self) -> None:
-        """Локально прибираємо всі точки."""
-        self.points = []
-        self.latest_point = None
-        self.selected_point_id = -1
-        self._next_point_id = 1
-        self.controls_locked = False
-        self._last_server_id = -1
-        self._refresh_calibration_texts()
+    def get_network_stats(self) -> dict:
+        stats = self.lane.stats()
+        stats["lanes"] = {lane.name: lane.stats() for lane in self.lanes}
+        return stats
+
+    def stop_network(self) -> None:
+        for lane in self.lanes:
+            lane.stop()
 
     # ---- математика / форматування ----
 
@@ -791,28 +1810,12 @@ class RootWidget(BoxLayout):
     def _format_adjustment_text(self, point: dict, distance_m: float) -> str:
         if not point:
             return "—"
-        vertical = self._mm_to_moa(point.get("y", 0.0), distance_m)
-        horizontal = self._mm_to_moa(point.get("x", 0.0), distance_m)
-        vert_dir = "U" if vertical >= 0 else "D"
-        horiz_dir = "R" if horizontal >= 0 else "L"
-        v_value = self._format_moa_value(vertical)
-        h_value = self._format_moa_value(horizontal)
-        return f"{vert_dir} {v_value}     {horiz_dir} {h_value}"
-
-    def _mm_to_moa(self, mm_value: float, distance_m: float) -> float:
-        mm_per_moa = math.tan(MOA_IN_RADIANS) * distance_m * MM_IN_METER
-        if mm_per_moa == 0:
-            return 0.0
-        return mm_value / mm_per_moa
-
-    def _format_moa_value(self, value: float) -> str:
-        magnitude = abs(value)
-        if magnitude < 1e-6:
-            return "0"
-        step_count = math.ceil(magnitude / MOA_MIN_STEP)
-        quantized = step_count * MOA_MIN_STEP
-        text = f"{quantized:.2f}".rstrip("0").rstrip(".")
-        return text or "0"
+        return self._adjustments.format_adjustment(
+            point.get("x", 0.0),
+            point.get("y", 0.0),
+            distance_m,
+            shot_id=point.get("id"),
+        )
 
     def _current_radius_mm(self) -> float:
         return CALIBER_RADIUS_MM.get(self.selected_caliber, 3.0)
@@ -833,24 +1836,52 @@ class RootWidget(BoxLayout):
         positive_label: str,
         negative_label: str,
     ) -> tuple[str, str]:
-        moa_value = self._mm_to_moa(value_mm, distance_m)
-        direction = positive_label if moa_value >= 0 else negative_label
-        formatted = self._format_moa_value(moa_value)
-        return direction, formatted
+        return self._adjustments.format_axis(
+            value_mm,
+            distance_m,
+            positive_label,
+            negative_label,
+        )
 
     def _refresh_calibration_texts(self) -> None:
+        """Тексти поправок і групи перераховуються раз на кадр, скільки б змін не було."""
+        render_scheduler.mark(self, self._update_calibration_texts)
+
+    def _update_calibration_texts(self) -> None:
         distance_label = f"{self._format_distance(self.selected_distance_m)}"
         self.calibration_distance_text = distance_label
+        self._refresh_group_texts()
         if not self.latest_point:
-            # якщо не в режимі "показати час скидання" — повертаємось до дефолту
-            if not self.calibration_text.startswith("Скидання:"):
-                self.calibration_text = "—"
+            self.calibration_text = "—"
             return
         self.calibration_text = self._format_adjustment_text(
             self.latest_point,
             self.selected_distance_m,
         )
 
+    def _refresh_group_texts(self) -> None:
+        """Підсумок групи й поправка до її центру (а не до одного пострілу)."""
+        group = self.group
+        if not group.count:
+            self.group_text = "—"
+            self.group_adjustment_text = "—"
+            return
+        distance_m = self.selected_distance_m
+        engine = self._adjustments
+        spread_units = engine.to_units(group.extreme_spread, distance_m)
+        self.group_text = (
+            f"{group.count} пострілів   розмах {group.extreme_spread:.1f} мм "
+            f"({spread_units:.2f} {engine.unit})\n"
+            f"сер. радіус {group.mean_radius:.1f}   ≈CEP50 {group.cep50:.1f}   "
+            f"SD ↕ {group.sd_y:.1f} ↔ {group.sd_x:.1f} мм"
+        )
+        v_direction, v_value = engine.format_axis(group.mean_y, distance_m, "U", "D")
+        h_direction, h_value = engine.format_axis(group.mean_x, distance_m, "R", "L")
+        self.group_adjustment_text = (
+            f"Центр X: {group.mean_x:.1f} | Y: {group.mean_y:.1f} мм   "
+            f"{v_direction} {v_value}     {h_direction} {h_value}"
+        )
+
     def _update_caliber_display(self) -> None:
         self.caliber_display_text = self.selected_caliber or "—"
 
@@ -858,7 +1889,42 @@ class RootWidget(BoxLayout):
 class CoordinateApp(App):
     def build(self):
         self.title = "Координати A4"
-        return Builder.load_file(KV_FILE)
+        # фон декодується один раз і не більший за екран
+        background_textures.configure(
+            os.path.join(self.user_data_dir, BACKGROUND_META_NAME),
+            max(Window.size),
+        )
+        root = Builder.load_file(KV_FILE)
+        startup.mark(STARTUP_BUILD)
+        Window.bind(on_flip=self._on_first_frame)
+        return root
+
+    def _on_first_frame(self, *_args) -> None:
+        Window.unbind(on_flip=self._on_first_frame)
+        startup.mark(STARTUP_FIRST_FRAME)
+        if not startup.within_budget():
+            print(f"Холодний старт {startup.total_ms:.0f} мс — понад бюджет {STARTUP_BUDGET_MS:.0f} мс")
+        if STARTUP_REPORT_AND_EXIT:
+            print(
+                json.dumps({"startup": startup.durations(), "started_at": STARTED_AT}),
+                flush=True,
+            )
+            Clock.schedule_once(lambda _dt: self.stop(), 0)
+
+    def on_pause(self):
+        if self.root:
+            self.root.pause_network()
+            self.root.flush_session()
+        return True
+
+    def on_resume(self):
+        if self.root:
+            self.root.resume_network()
+
+    def on_stop(self):
+        if self.root:
+            self.root.stop_network()
+            self.root.close_session_store()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,565 @@
+import http.client
+import json
+import queue
+import socket
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from kivy.clock import Clock
+
+# ==== HTTP-КЛІЄНТ ====
+HTTP_TIMEOUT_S = 5.0
+# скільки останніх затримок запитів тримаємо для статистики
+HTTP_LATENCY_HISTORY = 200
+# помилки, після яких keep-alive зʼєднання вважаємо протухлим і пробуємо ще раз
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+def _connection_for(base_url: str, timeout: float):
+    parts = urlsplit(base_url)
+    connection_cls = (
+        http.client.HTTPSConnection
+        if parts.scheme == "https"
+        else http.client.HTTPConnection
+    )
+    return connection_cls(parts.hostname or "localhost", parts.port, timeout=timeout)
+
+
+class HttpRequest:
+    """Один запит у черзі HttpClient; після виконання містить статус і затримку."""
+
+    __slots__ = (
+        "method",
+        "path",
+        "body",
+        "headers",
+        "on_success",
+        "on_error",
+        "decoder",
+        "status",
+        "latency_ms",
+        "sent_at",
+        "received_at",
+        "decoded_at",
+    )
+
+    def __init__(self, method, path, body, headers, on_success, on_error, decoder=None):
+        self.method = method
+        self.path = path
+        self.body = body
+        self.headers = headers
+        self.on_success = on_success
+        self.on_error = on_error
+        self.decoder = decoder
+        self.status = None
+        self.latency_ms = None
+        # позначки perf_counter(): запит пішов / тіло прочитано / розібрано
+        self.sent_at = None
+        self.received_at = None
+        self.decoded_at = None
+
+
+class HttpClient:
+    """Один фоновий потік і одне keep-alive зʼєднання на всі запити до сервера.
+
+    Запити йдуть по черзі одним TCP-зʼєднанням (без нового потоку й рукостискання
+    на кожен); колбеки on_success(request, result) / on_error(request, error)
+    викликаються в Kivy-потоці, як у UrlRequest. decoder(content_type, data),
+    якщо заданий, розбирає тіло ще у фоновому потоці — у Kivy-потік приходить
+    уже готовий результат.
+    """
+
+    def __init__(self, base_url: str, timeout: float = HTTP_TIMEOUT_S):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.latencies: deque = deque(maxlen=HTTP_LATENCY_HISTORY)
+        self.requests = 0
+        self.connects = 0
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = None
+        self._connection = None
+
+    def get(self, path: str, on_success=None, on_error=None, headers=None, decoder=None):
+        return self.request("GET", path, None, headers, on_success, on_error, decoder)
+
+    def post(
+        self,
+        path: str,
+        body=b"",
+        on_success=None,
+        on_error=None,
+        headers=None,
+        decoder=None,
+    ):
+        return self.request("POST", path, body, headers, on_success, on_error, decoder)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body=None,
+        headers=None,
+        on_success=None,
+        on_error=None,
+        decoder=None,
+    ) -> HttpRequest:
+        request = HttpRequest(
+            method,
+            path,
+            body,
+            headers or {},
+            on_success,
+            on_error,
+            decoder,
+        )
+        self._ensure_worker()
+        self._queue.put(request)
+        return request
+
+    def close(self) -> None:
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+
+    def latency_stats(self) -> dict:
+        values = sorted(self.latencies)
+        if not values:
+            return {"count": 0, "last_ms": None, "p50_ms": None, "max_ms": None}
+        return {
+            "count": len(values),
+            "last_ms": self.latencies[-1],
+            "p50_ms": values[len(values) // 2],
+            "max_ms": values[-1],
+        }
+
+    # ---- фоновий потік ----
+
+    def _ensure_worker(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run,
+            name="http-client",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            request = self._queue.get()
+            if request is None:
+                break
+            try:
+                self._perform(request)
+            except Exception as error:
+                # один невдалий запит не має зупинити потік для всіх наступних
+                self._drop_connection()
+                self._deliver(request.on_error, request, error)
+        self._drop_connection()
+
+    def _perform(self, request: HttpRequest) -> None:
+        started = request.sent_at = time.perf_counter()
+        for attempt in range(2):
+            reused = self._connection is not None
+            try:
+                connection = self._get_connection()
+                connection.request(
+                    request.method,
+                    request.path,
+                    body=request.body,
+                    headers=request.headers,
+                )
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except _STALE_CONNECTION_ERRORS as error:
+                self._drop_connection()
+                if reused and attempt == 0:
+                    # сервер закрив keep-alive, поки ми мовчали — ще раз з новим
+                    continue
+                self._deliver(request.on_error, request, error)
+                return
+            except Exception as error:
+                self._drop_connection()
+                self._deliver(request.on_error, request, error)
+                return
+
+        request.status = response.status
+        request.received_at = time.perf_counter()
+        request.latency_ms = (request.received_at - started) * 1000.0
+        self.latencies.append(request.latency_ms)
+        self.requests += 1
+        if response.will_close:
+            self._drop_connection()
+
+        if response.status >= 400:
+            self._deliver(request.on_error, request, f"HTTP {response.status}")
+            return
+        try:
+            if request.decoder is not None:
+                result = request.decoder(response.getheader("Content-Type", ""), data)
+            else:
+                result = self._decode(response, data)
+        except Exception as error:
+            self._deliver(request.on_error, request, error)
+            return
+        request.decoded_at = time.perf_counter()
+        self._deliver(request.on_success, request, result)
+
+    def _decode(self, response, data: bytes):
+        content_type = response.getheader("Content-Type", "")
+        if "json" in content_type:
+            return json.loads(data) if data else None
+        return data.decode("utf-8", errors="replace")
+
+    def _get_connection(self):
+        if self._connection is None:
+            self._connection = _connection_for(self.base_url, self.timeout)
+            self.connects += 1
+        return self._connection
+
+    def _drop_connection(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    def _deliver(self, callback, request: HttpRequest, value) -> None:
+        if callback:
+            Clock.schedule_once(lambda _dt: callback(request, value), 0)
+
+
+# ==== ПОТОКОВИЙ КАНАЛ (Server-Sent Events) ====
+STREAM_PATH = "/coords/stream"
+# пауза між перепідключеннями росте від мінімальної до максимальної
+STREAM_RECONNECT_MIN_S = 0.5
+STREAM_RECONNECT_MAX_S = 10.0
+# сервер шле коментарі-пінги; якщо довго тиша — вважаємо зʼєднання мертвим
+STREAM_READ_TIMEOUT_S = 15.0
+# відповіді, з яких видно, що сервер не вміє стрімити
+STREAM_UNSUPPORTED_STATUSES = (404, 405, 501)
+
+
+class StreamUnsupported(Exception):
+    """Сервер не має ендпоінта /coords/stream."""
+
+
+class CoordStream:
+    """Фоновий SSE-клієнт: нові координати приходять у Kivy-потік через Clock.
+
+    on_coords(payload, received_at, decoded_at) — data однієї події, розібрані
+    decoder (типово json.loads) ще у фоновому потоці, + позначки perf_counter();
+    on_state(connected) — зʼєднання встановлено / втрачено;
+    on_unsupported() — сервер не підтримує стрім, потік завершується.
+    Курсор (last_id) читається через get_last_id при кожному підключенні.
+    Кожен запуск має власну подію зупинки: читач після stop() уже нічого
+    не доставляє, навіть якщо ще не встиг завершитись.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        get_last_id,
+        on_coords,
+        on_state=None,
+        on_unsupported=None,
+        path: str = STREAM_PATH,
+        decoder=json.loads,
+    ):
+        self._base_url = base_url
+        self._decoder = decoder
+        self._path = path
+        self._get_last_id = get_last_id
+        self._on_coords = on_coords
+        self._on_state = on_state
+        self._on_unsupported = on_unsupported
+
+        self._stop_event = threading.Event()
+        self._stop_event.set()
+        self._thread = None
+        self._socket = None  # сокет поточного читача — щоб розбудити readline()
+        self.connected = False
+        self.reconnects = 0
+
+    def start(self) -> None:
+        if self.running and not self._stop_event.is_set():
+            return
+        # попередній читач, якщо ще закривається, має свою (вже встановлену) подію
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(self._stop_event,),
+            name="coord-stream",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Без очікування потоку: shutdown сокета розблоковує читання одразу."""
+        self._stop_event.set()
+        self.connected = False
+        self._shutdown(self._socket)
+
+    @staticmethod
+    def _shutdown(sock) -> None:
+        if sock is None:
+            return
+        try:
+            # close() не перериває readline() (відповідь тримає свій файл) — shutdown так
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    # ---- фоновий потік ----
+
+    def _run(self, stop_event: threading.Event) -> None:
+        delay = STREAM_RECONNECT_MIN_S
+        while not stop_event.is_set():
+            try:
+                self._listen(stop_event)
+                # сервер закрив стрім штатно — перепідключаємось одразу
+                delay = STREAM_RECONNECT_MIN_S
+            except StreamUnsupported:
+                self._set_connected(stop_event, False)
+                self._dispatch(stop_event, self._on_unsupported)
+                return
+            except Exception as error:
+                if stop_event.is_set():
+                    break
+                if delay == STREAM_RECONNECT_MIN_S:
+                    # пишемо лише першу помилку серії, далі — тихий backoff
+                    print("Стрім coords обірвався:", error)
+            self._set_connected(stop_event, False)
+            if stop_event.wait(delay):
+                break
+            delay = min(delay * 2, STREAM_RECONNECT_MAX_S)
+            self.reconnects += 1
+        self._set_connected(stop_event, False)
+
+    def _listen(self, stop_event: threading.Event) -> None:
+        connection = _connection_for(self._base_url, STREAM_READ_TIMEOUT_S)
+        sock = None
+        try:
+            connection.connect()
+            sock = connection.sock
+            if stop_event is self._stop_event:
+                self._socket = sock
+            if stop_event.is_set():
+                return  # stop() міг не побачити цей сокет
+            connection.request(
+                "GET",
+                f"{self._path}?last_id={self._get_last_id()}",
+                headers={"Accept": "text/event-stream", "Cache-Control": "no-cache"},
+            )
+            response = connection.getresponse()
+            content_type = response.getheader("Content-Type", "")
+            if (
+                response.status in STREAM_UNSUPPORTED_STATUSES
+                or (response.status == 200 and "text/event-stream" not in content_type)
+            ):
+                raise StreamUnsupported(response.status)
+            if response.status != 200:
+                raise ConnectionError(f"HTTP {response.status}")
+
+            self._set_connected(stop_event, True)
+            self._read_events(stop_event, response)
+        finally:
+            if self._socket is sock:
+                self._socket = None
+            connection.close()
+
+    def _read_events(self, stop_event: threading.Event, response) -> None:
+        data_lines: list[str] = []
+        while not stop_event.is_set():
+            raw = response.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            if not line:
+                # порожній рядок завершує подію
+                if data_lines:
+                    self._emit(stop_event, "\n".join(data_lines))
+                    data_lines = []
+                continue
+            if line.startswith(":"):
+                continue  # пінг / коментар
+            field, _, value = line.partition(":")
+            if field == "data":
+                data_lines.append(value[1:] if value.startswith(" ") else value)
+
+    def _emit(self, stop_event: threading.Event, data: str) -> None:
+        received_at = time.perf_counter()
+        try:
+            payload = self._decoder(data)
+        except Exception:
+            print("Некоректна подія стріму:", data[:80])
+            return
+        decoded_at = time.perf_counter()
+        self._dispatch(stop_event, self._on_coords, payload, received_at, decoded_at)
+
+    def _set_connected(self, stop_event: threading.Event, value: bool) -> None:
+        if stop_event.is_set() or self.connected == value:
+            return
+        self.connected = value
+        self._dispatch(stop_event, self._on_state, value)
+
+    def _dispatch(self, stop_event: threading.Event, callback, *args) -> None:
+        """Колбек у Kivy-потоці, якщо до того часу цей читач не зупинили."""
+        if not callback:
+            return
+
+        def deliver(_dt):
+            if not stop_event.is_set():
+                callback(*args)
+
+        Clock.schedule_once(deliver, 0)
+
+
+# ==== АДАПТИВНЕ ОПИТУВАННЯ /coords/diff ====
+# одразу після пострілу питаємо часто, у тиші — рідше, при помилках — ще рідше
+POLL_MIN_INTERVAL_S = 0.1
+# у тиші інтервал росте лише до цієї межі: це й найбільша додаткова затримка
+# першого пострілу після паузи, коли опитування — живий шлях (немає стріму)
+POLL_IDLE_MAX_INTERVAL_S = 0.3
+POLL_ERROR_MAX_INTERVAL_S = 10.0
+POLL_IDLE_BACKOFF = 1.5
+POLL_ERROR_BACKOFF = 2.0
+# скільки секунд після пострілу тримаємо мінімальний інтервал
+POLL_BURST_WINDOW_S = 5.0
+
+
+class PollScheduler:
+    """Планувальник опитування: наступний запит — лише після відповіді на попередній.
+
+    poll() має запустити запит і потім викликати report_data / report_empty /
+    report_error; від цього залежить інтервал до наступного виклику.
+    """
+
+    def __init__(
+        self,
+        poll,
+        min_interval: float = POLL_MIN_INTERVAL_S,
+        idle_max_interval: float = POLL_IDLE_MAX_INTERVAL_S,
+        error_max_interval: float = POLL_ERROR_MAX_INTERVAL_S,
+        burst_window: float = POLL_BURST_WINDOW_S,
+    ):
+        self._poll = poll
+        self.min_interval = min_interval
+        self.idle_max_interval = idle_max_interval
+        self.error_max_interval = error_max_interval
+        self.burst_window = burst_window
+
+        self.interval = min_interval
+        self.polls = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.running = False
+        self.paused = False
+
+        self._event = None
+        self._waiting = False  # запит у польоті — таймер не заводимо
+        self._last_data_at = None
+
+    # ---- керування ----
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        self._schedule(0)
+
+    def stop(self) -> None:
+        self.running = False
+        self._cancel()
+
+    def pause(self) -> None:
+        self.paused = True
+        self._cancel()
+
+    def resume(self) -> None:
+        if not self.paused:
+            return
+        self.paused = False
+        # після повернення з фону одразу перевіряємо, що пропустили
+        self.interval = self.min_interval
+        if self.running and not self._waiting:
+            self._schedule(0)
+
+    # ---- звіти від poll() ----
+
+    def report_data(self) -> None:
+        self._last_data_at = Clock.get_time()
+        self.consecutive_errors = 0
+        self.interval = self.min_interval
+        self._finish()
+
+    def report_empty(self) -> None:
+        self.consecutive_errors = 0
+        if not self._in_burst():
+            self.interval = min(
+                max(self.interval, self.min_interval) * POLL_IDLE_BACKOFF,
+                self.idle_max_interval,
+            )
+        self._finish()
+
+    def report_error(self) -> None:
+        self.errors += 1
+        self.consecutive_errors += 1
+        self.interval = min(
+            max(self.interval, self.min_interval) * POLL_ERROR_BACKOFF,
+            self.error_max_interval,
+        )
+        self._finish()
+
+    def stats(self) -> dict:
+        return {
+            "interval_s": self.interval,
+            "polls": self.polls,
+            "errors": self.errors,
+            "consecutive_errors": self.consecutive_errors,
+            "paused": self.paused,
+        }
+
+    # ---- внутрішнє ----
+
+    def _in_burst(self) -> bool:
+        if self._last_data_at is None:
+            return False
+        return Clock.get_time() - self._last_data_at < self.burst_window
+
+    def _finish(self) -> None:
+        self._waiting = False
+        if self.running and not self.paused:
+            self._schedule(self.interval)
+
+    def _schedule(self, delay: float) -> None:
+        self._cancel()
+        self._event = Clock.schedule_once(self._fire, delay)
+
+    def _cancel(self) -> None:
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def _fire(self, _dt) -> None:
+        self._event = None
+        if not self.running or self.paused:
+            return
+        self._waiting = True
+        self.polls += 1
+        self._poll()
@@ -0,0 +1,219 @@
+import time
+from array import array
+from collections import deque
+
+# скільки останніх значень тримає кожен RollingStats
+PERF_HISTORY = 512
+# вікно для частоти кадрів і опитувань
+PERF_RATE_WINDOW_S = 5.0
+
+# етапи шляху пострілу до екрана (мс)
+STAGE_NETWORK = "network"    # запит пішов -> відповідь прийшла
+STAGE_DECODE = "decode"      # відповідь прийшла -> пачка розібрана (фоновий потік)
+STAGE_DISPATCH = "dispatch"  # розібрана -> додана у ShotStore (черга Kivy-потоку)
+STAGE_RENDER = "render"      # додана -> кадр, у якому дошка її намалювала
+STAGE_TOTAL = "total"        # запит пішов (для стріму — подія прийшла) -> кадр
+STAGE_SHOT_TO_PIXEL = "shot_to_pixel"  # час пострілу на сервері (t) -> кадр
+STAGE_RESET = "reset"        # кнопка 'Завершити' -> відповідь /coords/clear
+# холодний старт: від початку виконання main.py до першого кадру (мс)
+STARTUP_BUDGET_MS = 1500.0
+STARTUP_IMPORTS = "imports"          # модулі застосунку й Kivy імпортовано
+STARTUP_BUILD = "build"              # main.kv завантажено, головний екран збудовано
+STARTUP_FIRST_FRAME = "first_frame"  # перший намальований кадр
+
+STAGES = (
+    STAGE_NETWORK,
+    STAGE_DECODE,
+    STAGE_DISPATCH,
+    STAGE_RENDER,
+    STAGE_TOTAL,
+    STAGE_SHOT_TO_PIXEL,
+    STAGE_RESET,
+)
+
+
+class RollingStats:
+    """Кільцевий буфер останніх значень з перцентилями."""
+
+    __slots__ = ("_values", "_next", "count", "last")
+
+    def __init__(self, size: int = PERF_HISTORY):
+        self._values = array("d", bytes(8 * size))
+        self._next = 0
+        self.count = 0
+        self.last = None
+
+    def add(self, value: float) -> None:
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._values)
+        self.count += 1
+        self.last = value
+
+    def values(self) -> list[float]:
+        filled = min(self.count, len(self._values))
+        return list(self._values[:filled])
+
+    def percentiles(self) -> dict:
+        values = sorted(self.values())
+        if not values:
+            return {"count": 0, "last": None, "p50": None, "p95": None, "p99": None}
+        top = len(values) - 1
+        return {
+            "count": self.count,
+            "last": self.last,
+            "p50": values[round(top * 0.50)],
+            "p95": values[round(top * 0.95)],
+            "p99": values[round(top * 0.99)],
+        }
+
+
+class StartupTimer:
+    """Відмітки холодного старту.
+
+    Час — time.time(), а не perf_counter(): так бенчмарк може звести відмітки
+    з моментом, коли він сам запустив процес.
+    """
+
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.marks: dict[str, float] = {}
+
+    def mark(self, name: str) -> None:
+        self.marks.setdefault(name, time.time())
+
+    def durations(self) -> dict:
+        """Відмітка -> мс від started_at, у порядку відміток."""
+        return {
+            name: (moment - self.started_at) * 1000.0
+            for name, moment in self.marks.items()
+        }
+
+    @property
+    def total_ms(self):
+        return self.durations().get(STARTUP_FIRST_FRAME)
+
+    def within_budget(self, budget_ms: float = STARTUP_BUDGET_MS) -> bool:
+        total = self.total_ms
+        return total is not None and total <= budget_ms
+
+
+class _PendingBatch:
+    __slots__ = ("count", "started_at", "appended_at", "server_time", "source")
+
+    def __init__(self, count, started_at, appended_at, server_time, source):
+        self.count = count
+        self.started_at = started_at
+        self.appended_at = appended_at
+        self.server_time = server_time
+        self.source = source
+
+
+class PerfMonitor:
+    """Затримки шляху постріл -> екран, FPS і частота опитувань.
+
+    Позначки часу — time.perf_counter(); постріли однієї пачки мають спільні
+    позначки, тож рахуємо по пачках. Етап render закривається кадром
+    (on_frame викликається з Window.on_flip), перед яким дошка намалювала
+    пачку (mark_rendered). Пачки, яких кадр не показав (прихована доріжка
+    чи екран), у render і далі не потрапляють.
+    """
+
+    def __init__(self, size: int = PERF_HISTORY):
+        self.stages = {stage: RollingStats(size) for stage in STAGES}
+        self.frames = RollingStats(size)
+        self.shots = 0
+        self._pending: list[_PendingBatch] = []
+        self._drawn: list[_PendingBatch] = []
+        self._frame_times: deque = deque()
+        self._poll_times: deque = deque()
+        self._last_frame_at = None
+        self.startup = None  # StartupTimer, якщо застосунок його передав
+
+    # ---- позначки ----
+
+    def record(self, stage: str, value_ms: float) -> None:
+        self.stages[stage].add(value_ms)
+
+    def record_poll(self) -> None:
+        now = time.perf_counter()
+        self._poll_times.append(now)
+        self._trim(self._poll_times, now)
+
+    def record_batch(
+        self,
+        count: int,
+        sent_at=None,
+        received_at=None,
+        decoded_at=None,
+        server_time=None,
+        source=None,
+    ) -> None:
+        """Пачку щойно додано у сховище source; відмітки — perf_counter() або None."""
+        if not count:
+            return
+        now = time.perf_counter()
+        self.shots += count
+        if sent_at is not None and received_at is not None:
+            self.record(STAGE_NETWORK, (received_at - sent_at) * 1000.0)
+        if received_at is not None and decoded_at is not None:
+            self.record(STAGE_DECODE, (decoded_at - received_at) * 1000.0)
+        if decoded_at is not None:
+            self.record(STAGE_DISPATCH, (now - decoded_at) * 1000.0)
+        started_at = sent_at if sent_at is not None else received_at
+        self._pending.append(_PendingBatch(count, started_at, now, server_time, source))
+
+    def mark_rendered(self, source) -> None:
+        """Дошка щойно намалювала source — його пачки закриє найближчий кадр."""
+        if not self._pending:
+            return
+        waiting = []
+        for batch in self._pending:
+            (self._drawn if batch.source is source else waiting).append(batch)
+        self._pending = waiting
+
+    def on_frame(self, *_args) -> None:
+        now = time.perf_counter()
+        if self._last_frame_at is not None:
+            self.frames.add((now - self._last_frame_at) * 1000.0)
+        self._last_frame_at = now
+        self._frame_times.append(now)
+        self._trim(self._frame_times, now)
+
+        # не намальоване до цього кадру не показане — для нього render не рахуємо
+        self._pending.clear()
+        if not self._drawn:
+            return
+        wall_now = time.time()
+        for batch in self._drawn:
+            self.record(STAGE_RENDER, (now - batch.appended_at) * 1000.0)
+            if batch.started_at is not None:
+                self.record(STAGE_TOTAL, (now - batch.started_at) * 1000.0)
+            if batch.server_time is not None:
+                self.record(STAGE_SHOT_TO_PIXEL, (wall_now - batch.server_time) * 1000.0)
+        self._drawn.clear()
+
+    # ---- звіт ----
+
+    def fps(self) -> float:
+        self._trim(self._frame_times, time.perf_counter())
+        return len(self._frame_times) / PERF_RATE_WINDOW_S
+
+    def poll_rate(self) -> float:
+        self._trim(self._poll_times, time.perf_counter())
+        return len(self._poll_times) / PERF_RATE_WINDOW_S
+
+    def snapshot(self) -> dict:
+        return {
+            "fps": self.fps(),
+            "poll_rate": self.poll_rate(),
+            "shots": self.shots,
+            "frame_ms": self.frames.percentiles(),
+            "startup_ms": self.startup.durations() if self.startup else {},
+            "stages": {
+                stage: stats.percentiles() for stage, stats in self.stages.items()
+            },
+        }
+
+    def _trim(self, times: deque, now: float) -> None:
+        while times and now - times[0] > PERF_RATE_WINDOW_S:
+            times.popleft()
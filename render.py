@@ -0,0 +1,55 @@
+from kivy.clock import Clock
+from kivy.uix.screenmanager import Screen
+
+
+class RenderScheduler:
+    """Оновлення представлень не частіше разу на кадр і лише для видимих екранів.
+
+    Представлення позначають себе брудними (mark); Clock-тригер виконує кожне
+    оновлення один раз перед наступним кадром. Для прихованого екрана робота
+    чекає, доки ScreenManager на нього перейде.
+    """
+
+    def __init__(self):
+        # оновлення -> віджет, за яким визначаємо видимість; порядок — порядок позначок
+        self._dirty: dict = {}
+        self._managers: set = set()
+        self._trigger = Clock.create_trigger(self._flush, -1)
+
+    def mark(self, widget, update) -> None:
+        self._dirty[update] = widget
+        if self.is_visible(widget):
+            self._trigger()
+
+    def flush(self) -> None:
+        """Виконує видимі оновлення одразу (наприклад, перед вимірами)."""
+        self._trigger.cancel()
+        self._flush()
+
+    def pending(self, widget) -> bool:
+        return any(owner is widget for owner in self._dirty.values())
+
+    def is_visible(self, widget) -> bool:
+        screen = widget
+        while screen is not None and not isinstance(screen, Screen):
+            # у Window parent — він сам
+            screen = screen.parent if screen.parent is not screen else None
+        if screen is None or screen.manager is None:
+            return True
+        manager = screen.manager
+        if id(manager) not in self._managers:
+            self._managers.add(id(manager))
+            manager.fbind("current", self._on_screen_changed)
+        return manager.current == screen.name
+
+    def _on_screen_changed(self, *_args) -> None:
+        if self._dirty:
+            self._trigger()
+
+    def _flush(self, *_args) -> None:
+        for update, widget in list(self._dirty.items()):
+            if self.is_visible(widget) and self._dirty.pop(update, None) is not None:
+                update()
+
+
+render_scheduler = RenderScheduler()
@@ -0,0 +1,183 @@
+from array import array
+
+SHOTS_APPENDED = "append"
+SHOTS_CLEARED = "clear"
+# вміст замінено повністю (RootWidget перемкнув доріжку); читати все заново
+SHOTS_REPLACED = "replace"
+
+DEFAULT_RADIUS_MM = 3.0
+
+
+class Shot:
+    """Один постріл. Підтримує і shot.x, і shot["x"] / shot.get("x") для KV."""
+
+    __slots__ = ("id", "x", "y", "radius_mm")
+
+    def __init__(
+        self,
+        id: int,
+        x: float,
+        y: float,
+        radius_mm: float = DEFAULT_RADIUS_MM,
+    ):
+        self.id = id
+        self.x = x
+        self.y = y
+        self.radius_mm = radius_mm
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Shot):
+            return NotImplemented
+        return (
+            self.id == other.id
+            and self.x == other.x
+            and self.y == other.y
+            and self.radius_mm == other.radius_mm
+        )
+
+    def __repr__(self) -> str:
+        return f"Shot(id={self.id}, x={self.x}, y={self.y}, radius_mm={self.radius_mm})"
+
+
+class ShotEvent:
+    """Що саме змінилось у ShotStore.
+
+    append: count пострілів дописано з індексу start (читати зі сховища);
+    clear: сховище спорожніло (count — скільки було).
+    """
+
+    __slots__ = ("kind", "start", "count")
+
+    def __init__(self, kind: str, start: int, count: int):
+        self.kind = kind
+        self.start = start
+        self.count = count
+
+    def __repr__(self) -> str:
+        return f"ShotEvent({self.kind!r}, start={self.start}, count={self.count})"
+
+
+class ShotStore:
+    """Постріли в колонках array (id, x, y, радіус) + словник id -> індекс.
+
+    Лише доповнюється; підписники отримують дельти. Поводиться як незмінна
+    послідовність Shot (len, індекси, зрізи, ітерація), тож його можна
+    віддавати туди, де раніше був list з точками-словниками.
+    """
+
+    def __init__(self, shots=None):
+        self.ids = array("q")
+        self.xs = array("d")
+        self.ys = array("d")
+        self.radii = array("d")
+        self._index: dict[int, int] = {}
+        self._listeners: list = []
+        if shots:
+            self._extend(shots)
+
+    # ---- послідовність ----
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __bool__(self) -> bool:
+        return bool(self.ids)
+
+    def __iter__(self):
+        for index in range(len(self.ids)):
+            yield self._shot(index)
+
+    def __reversed__(self):
+        for index in range(len(self.ids) - 1, -1, -1):
+            yield self._shot(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._shot(i) for i in range(*index.indices(len(self.ids)))]
+        if index < 0:
+            index += len(self.ids)
+        if not 0 <= index < len(self.ids):
+            raise IndexError("shot index out of range")
+        return self._shot(index)
+
+    def _shot(self, index: int) -> Shot:
+        return Shot(
+            self.ids[index],
+            self.xs[index],
+            self.ys[index],
+            self.radii[index],
+        )
+
+    def index_of(self, point_id: int) -> int:
+        return self._index.get(point_id, -1)
+
+    def get_by_id(self, point_id: int):
+        index = self._index.get(point_id)
+        return self._shot(index) if index is not None else None
+
+    @property
+    def last(self):
+        return self._shot(len(self.ids) - 1) if self.ids else None
+
+    # ---- зміни ----
+
+    def append(self, shots) -> None:
+        """Дописує постріли (Shot або словники з id/x/y/radius_mm)."""
+        start = len(self.ids)
+        self._extend(shots)
+        if len(self.ids) > start:
+            self._notify(ShotEvent(SHOTS_APPENDED, start, len(self.ids) - start))
+
+    def append_columns(self, ids, xs, ys, radii) -> None:
+        """Дописує пачку одразу колонками — без проміжних обʼєктів."""
+        start = len(self.ids)
+        self.ids.extend(ids)
+        self.xs.extend(xs)
+        self.ys.extend(ys)
+        self.radii.extend(radii)
+        for offset, point_id in enumerate(ids):
+            self._index[point_id] = start + offset
+        if len(self.ids) > start:
+            self._notify(ShotEvent(SHOTS_APPENDED, start, len(self.ids) - start))
+
+    def clear(self) -> None:
+        count = len(self.ids)
+        if not count:
+            return
+        for column in (self.ids, self.xs, self.ys, self.radii):
+            del column[:]
+        self._index.clear()
+        self._notify(ShotEvent(SHOTS_CLEARED, 0, count))
+
+    def _extend(self, shots) -> None:
+        for shot in shots:
+            point_id = int(shot["id"])
+            self._index[point_id] = len(self.ids)
+            self.ids.append(point_id)
+            self.xs.append(shot["x"])
+            self.ys.append(shot["y"])
+            self.radii.append(shot.get("radius_mm", DEFAULT_RADIUS_MM))
+
+    # ---- підписка ----
+
+    def subscribe(self, callback) -> None:
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, event: ShotEvent) -> None:
+        for callback in list(self._listeners):
+            callback(event)
@@ -0,0 +1,259 @@
+import math
+from array import array
+
+# NumPy не обовʼязковий: без нього масиви перетворюються чистим Python
+from lazy import numpy
+
+# найменша клітинка сітки; менші лише збільшують кількість клітинок без користі
+# (крок сітки йде за масштабом дошки, тож при сильному збільшенні він малий)
+GRID_MIN_CELL_MM = 0.5
+
+
+class ShotGrid:
+    """Рівномірна сітка в мм для пошуку пострілу під пальцем.
+
+    Записи лише дописуються (і обрізаються з кінця), як і намальовані постріли;
+    порядок запису = порядок малювання, тож з кількох отворів під пальцем
+    перемагає верхній (пізніший). Суми x/y по клітинках дають центри
+    кластерів для дрібного масштабу без проходу по пострілах.
+    """
+
+    def __init__(self, cell_mm: float = GRID_MIN_CELL_MM):
+        self.cell_mm = max(cell_mm, GRID_MIN_CELL_MM)
+        self.ids = array("q")
+        self.xs = array("d")
+        self.ys = array("d")
+        self.radii = array("d")
+        self.max_radius = 0.0
+        self._cells: dict[tuple[int, int], array] = {}
+        self._sums: dict[tuple[int, int], list] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        return math.floor(x / self.cell_mm), math.floor(y / self.cell_mm)
+
+    def cell_at(self, x: float, y: float) -> tuple[int, int]:
+        """Клітинка точки (x, y) мм."""
+        return self._cell(x, y)
+
+    def cell_of(self, index: int) -> tuple[int, int]:
+        """Клітинка запису index."""
+        return self._cell(self.xs[index], self.ys[index])
+
+    # ---- зміни ----
+
+    def add(self, point_id: int, x: float, y: float, radius: float) -> None:
+        index = len(self.ids)
+        self.ids.append(point_id)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.radii.append(radius)
+        if radius > self.max_radius:
+            self.max_radius = radius
+        cell = self._cell(x, y)
+        bucket = self._cells.get(cell)
+        if bucket is None:
+            bucket = self._cells[cell] = array("l")
+            self._sums[cell] = [0.0, 0.0]
+        bucket.append(index)
+        sums = self._sums[cell]
+        sums[0] += x
+        sums[1] += y
+
+    def truncate(self, count: int) -> None:
+        """Прибирає записи з індексу count і далі."""
+        for index in range(len(self.ids) - 1, count - 1, -1):
+            cell = self._cell(self.xs[index], self.ys[index])
+            bucket = self._cells[cell]
+            bucket.pop()  # індекси в клітинці зростають — наш останній
+            if not bucket:
+                del self._cells[cell]
+                del self._sums[cell]
+                continue
+            sums = self._sums[cell]
+            sums[0] -= self.xs[index]
+            sums[1] -= self.ys[index]
+        for column in (self.ids, self.xs, self.ys, self.radii):
+            del column[count:]
+        # max_radius не зменшуємо: запас на пошук нічого не ламає
+
+    def clear(self) -> None:
+        for column in (self.ids, self.xs, self.ys, self.radii):
+            del column[:]
+        self._cells.clear()
+        self._sums.clear()
+        self.max_radius = 0.0
+
+    def rebuild(self, cell_mm: float) -> None:
+        """Перекладає ті самі записи в сітку з іншим кроком."""
+        entries = list(zip(self.ids, self.xs, self.ys, self.radii))
+        self.cell_mm = max(cell_mm, GRID_MIN_CELL_MM)
+        self.clear()
+        for entry in entries:
+            self.add(*entry)
+
+    # ---- пошук ----
+
+    def _cells_in(self, x0: float, y0: float, x1: float, y1: float):
+        """(клітинка, індекси) для непорожніх клітинок, що перетинають прямокутник."""
+        cell_x0, cell_y0 = self._cell(x0, y0)
+        cell_x1, cell_y1 = self._cell(x1, y1)
+        cells = self._cells
+        if (cell_x1 - cell_x0 + 1) * (cell_y1 - cell_y0 + 1) > len(cells):
+            # прямокутник більший за зайняте — дешевше пройти зайняті клітинки
+            for cell, bucket in cells.items():
+                if cell_x0 <= cell[0] <= cell_x1 and cell_y0 <= cell[1] <= cell_y1:
+                    yield cell, bucket
+            return
+        for cell_x in range(cell_x0, cell_x1 + 1):
+            for cell_y in range(cell_y0, cell_y1 + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if bucket is not None:
+                    yield (cell_x, cell_y), bucket
+
+    def count_in(self, x0: float, y0: float, x1: float, y1: float) -> int:
+        """Скільки записів у клітинках прямокутника (з запасом на крайні клітинки)."""
+        return sum(len(bucket) for _cell, bucket in self._cells_in(x0, y0, x1, y1))
+
+    def touches(self, index: int, x0: float, y0: float, x1: float, y1: float) -> bool:
+        """Чи зачіпає отвір запису index прямокутник (мм)."""
+        x, y, radius = self.xs[index], self.ys[index], self.radii[index]
+        return x + radius >= x0 and x - radius <= x1 and y + radius >= y0 and y - radius <= y1
+
+    def indices_in(self, x0: float, y0: float, x1: float, y1: float) -> list[int]:
+        """Індекси отворів, що зачіпають прямокутник (мм), у порядку малювання."""
+        reach = self.max_radius
+        found = []
+        for _cell, bucket in self._cells_in(x0 - reach, y0 - reach, x1 + reach, y1 + reach):
+            for index in bucket:
+                if self.touches(index, x0, y0, x1, y1):
+                    found.append(index)
+        found.sort()
+        return found
+
+    def cluster(self, cell: tuple[int, int]) -> tuple:
+        """(x, y, кількість, індекс або -1) для непорожньої клітинки.
+
+        Одиночний запис — як є (його індекс), кілька — центр мас клітинки.
+        """
+        bucket = self._cells[cell]
+        count = len(bucket)
+        if count == 1:
+            index = bucket[0]
+            return self.xs[index], self.ys[index], 1, index
+        sums = self._sums[cell]
+        return sums[0] / count, sums[1] / count, count, -1
+
+    def clusters_in(self, x0: float, y0: float, x1: float, y1: float) -> list[tuple]:
+        """(клітинка, кластер) для кожної зайнятої клітинки прямокутника."""
+        return [(cell, self.cluster(cell)) for cell, _bucket in self._cells_in(x0, y0, x1, y1)]
+
+    def hit(self, x: float, y: float, tolerance: float = 0.0):
+        """id пострілу під точкою (x, y) мм або None.
+
+        Спершу — верхній отвір, що містить точку; якщо такого немає —
+        найближчий край у межах tolerance.
+        """
+        reach = self.max_radius + tolerance
+        cell_x0, cell_y0 = self._cell(x - reach, y - reach)
+        cell_x1, cell_y1 = self._cell(x + reach, y + reach)
+        best_inside = -1
+        best_edge = -1
+        best_edge_distance = tolerance
+        cells = self._cells
+        for cell_x in range(cell_x0, cell_x1 + 1):
+            for cell_y in range(cell_y0, cell_y1 + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if bucket is None:
+                    continue
+                for index in bucket:
+                    edge = math.hypot(self.xs[index] - x, self.ys[index] - y) - self.radii[index]
+                    if edge <= 0:
+                        if index > best_inside:
+                            best_inside = index
+                    elif edge <= best_edge_distance:
+                        best_edge = index
+                        best_edge_distance = edge
+        if best_inside >= 0:
+            return self.ids[best_inside]
+        if best_edge >= 0:
+            return self.ids[best_edge]
+        return None
+
+
+class BoardTransform:
+    """Мм аркуша (центр у 0, 0) -> пікселі віджета: масштаб + зсув.
+
+    Рахується раз на зміну розкладки чи масштабу й спільний для малювання,
+    вибору дотиком і експорту. zoom і центр огляду (мм) задають збільшення:
+    точка (center_x_mm, center_y_mm) стоїть у центрі області малювання.
+    Довжини (радіуси) масштабуються за меншою віссю, щоб кружечки лишались
+    круглими.
+    """
+
+    __slots__ = ("scale_x", "scale_y", "offset_x", "offset_y", "length_scale")
+
+    def __init__(
+        self,
+        draw_x: float = 0.0,
+        draw_y: float = 0.0,
+        draw_w: float = 0.0,
+        draw_h: float = 0.0,
+        sheet_w: float = 1.0,
+        sheet_h: float = 1.0,
+        zoom: float = 1.0,
+        center_x_mm: float = 0.0,
+        center_y_mm: float = 0.0,
+    ):
+        self.scale_x = draw_w / sheet_w * zoom if sheet_w else 0.0
+        self.scale_y = draw_h / sheet_h * zoom if sheet_h else 0.0
+        # центр огляду (без збільшення — центр аркуша) — у центрі області малювання
+        self.offset_x = draw_x + draw_w / 2.0 - center_x_mm * self.scale_x
+        self.offset_y = draw_y + draw_h / 2.0 - center_y_mm * self.scale_y
+        self.length_scale = min(self.scale_x, self.scale_y)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BoardTransform):
+            return NotImplemented
+        return (
+            self.scale_x == other.scale_x
+            and self.scale_y == other.scale_y
+            and self.offset_x == other.offset_x
+            and self.offset_y == other.offset_y
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"BoardTransform(scale=({self.scale_x:.4f}, {self.scale_y:.4f}), "
+            f"offset=({self.offset_x:.1f}, {self.offset_y:.1f}))"
+        )
+
+    @property
+    def valid(self) -> bool:
+        return self.scale_x > 0 and self.scale_y > 0
+
+    def to_widget(self, x_mm: float, y_mm: float) -> tuple[float, float]:
+        return self.offset_x + x_mm * self.scale_x, self.offset_y + y_mm * self.scale_y
+
+    def to_mm(self, x: float, y: float) -> tuple[float, float]:
+        return (x - self.offset_x) / self.scale_x, (y - self.offset_y) / self.scale_y
+
+    def length(self, value_mm: float) -> float:
+        return value_mm * self.length_scale
+
+    def to_widget_arrays(self, xs, ys):
+        """Цілі колонки x/y (мм) -> колонки пікселів; з NumPy — ndarray."""
+        np = numpy()
+        if np is not None:
+            return (
+                np.asarray(xs, dtype=float) * self.scale_x + self.offset_x,
+                np.asarray(ys, dtype=float) * self.scale_y + self.offset_y,
+            )
+        scale_x, offset_x = self.scale_x, self.offset_x
+        scale_y, offset_y = self.scale_y, self.offset_y
+        return (
+            array("d", [offset_x + x * scale_x for x in xs]),
+            array("d", [offset_y + y * scale_y for y in ys]),
+        )
@@ -0,0 +1,299 @@
+import queue
+import sqlite3
+import threading
+import time
+from array import array
+
+from kivy.clock import Clock
+
+SESSION_DB_NAME = "session.sqlite3"
+# записи накопичуємо й комітимо пачкою не частіше, ніж раз на цей інтервал
+WRITE_BEHIND_INTERVAL_S = 0.5
+# meta-ключ: time.time() першого пострілу поточної сесії (іде в архів)
+STARTED_AT_KEY = "started_at"
+
+_SCHEMA = (
+    # rowid зберігає порядок надходження; id — номер пострілу із сервера
+    "CREATE TABLE IF NOT EXISTS shots ("
+    " seq INTEGER PRIMARY KEY,"
+    " id INTEGER NOT NULL,"
+    " x REAL NOT NULL,"
+    " y REAL NOT NULL,"
+    " radius_mm REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+    # завершені сесії; session_id зростає, тож новіші — з більшим id
+    "CREATE TABLE IF NOT EXISTS archive_sessions ("
+    " session_id INTEGER PRIMARY KEY,"
+    " started_at REAL,"
+    " finished_at REAL NOT NULL,"
+    " distance_m REAL,"
+    " caliber TEXT,"
+    " shot_count INTEGER NOT NULL)",
+    # pos — 0..n-1 у межах сесії: сторінка читається діапазоном ключа, без OFFSET
+    "CREATE TABLE IF NOT EXISTS archive_shots ("
+    " session_id INTEGER NOT NULL,"
+    " pos INTEGER NOT NULL,"
+    " id INTEGER NOT NULL,"
+    " x REAL NOT NULL,"
+    " y REAL NOT NULL,"
+    " radius_mm REAL NOT NULL,"
+    " PRIMARY KEY (session_id, pos)) WITHOUT ROWID",
+)
+
+
+class SessionSnapshot:
+    """Збережена сесія (чи сторінка архівної): колонки пострілів + метадані."""
+
+    __slots__ = ("ids", "xs", "ys", "radii", "meta")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.xs = array("d")
+        self.ys = array("d")
+        self.radii = array("d")
+        self.meta: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class SessionStore:
+    """Локальна копія поточної сесії та архів завершених у SQLite (WAL).
+
+    Усі звернення до диска — у власному потоці: UI лише ставить операції в
+    чергу, а потік комітить їх пачками раз на WRITE_BEHIND_INTERVAL_S.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="session-store",
+            daemon=True,
+        )
+        self._thread.start()
+
+    # ---- API для UI-потоку ----
+
+    def load(self, callback) -> None:
+        """Читає збережену сесію; callback(snapshot) — у Kivy-потоці."""
+        self._queue.put(("load", callback))
+
+    def append_shots(self, ids, xs, ys, radii) -> None:
+        rows = list(zip(ids, xs, ys, radii))
+        if rows:
+            self._queue.put(("append", rows))
+
+    def clear(self) -> None:
+        self._queue.put(("clear", None))
+
+    def set_meta(self, key: str, value) -> None:
+        self._queue.put(("meta", (key, str(value))))
+
+    def archive(self, finished_at: float, distance_m: float, caliber: str) -> None:
+        """Переносить поточні постріли в архів; викликати перед clear()."""
+        self._queue.put(("archive", (finished_at, distance_m, caliber)))
+
+    def read_archive_sessions(self, offset: int, limit: int, callback) -> None:
+        """Сторінка архіву від найновішої сесії; callback(total, rows) — у Kivy-потоці."""
+        self._queue.put(
+            ("read", (self._read_archive_sessions, (offset, limit), callback, (0, []))),
+        )
+
+    def read_archive_shots(self, session_id: int, offset: int, limit: int, callback) -> None:
+        """Постріли архівної сесії [offset, offset + limit); callback(total, snapshot)."""
+        self._queue.put(
+            (
+                "read",
+                (
+                    self._read_archive_shots,
+                    (session_id, offset, limit),
+                    callback,
+                    (0, SessionSnapshot()),
+                ),
+            ),
+        )
+
+    def flush(self) -> None:
+        """Просить потік закомітити накопичене, не чекаючи інтервалу."""
+        self._queue.put(("flush", None))
+
+    def close(self) -> None:
+        self._queue.put(("close", None))
+        self._thread.join(timeout=2.0)
+
+    # ---- фоновий потік ----
+
+    def _run(self) -> None:
+        try:
+            db = self._open()
+        except sqlite3.Error as error:
+            print("Не вдалося відкрити локальну сесію:", error)
+            self._drain_without_db()
+            return
+
+        pending = False
+        deadline = 0.0
+        while True:
+            timeout = max(deadline - time.monotonic(), 0.0) if pending else None
+            try:
+                op, value = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                pending = self._commit(db)
+                continue
+
+            if op == "close":
+                self._commit(db)
+                db.close()
+                return
+            if op == "flush":
+                pending = self._commit(db)
+            elif op == "load":
+                pending = self._commit(db)
+                snapshot = self._read_snapshot(db)
+                Clock.schedule_once(lambda _dt, cb=value, s=snapshot: cb(s), 0)
+            elif op == "read":
+                pending = self._commit(db)
+                reader, args, callback, _empty = value
+                result = reader(db, *args)
+                Clock.schedule_once(lambda _dt, cb=callback, r=result: cb(*r), 0)
+            else:
+                self._apply(db, op, value)
+                if not pending:
+                    deadline = time.monotonic() + WRITE_BEHIND_INTERVAL_S
+                    pending = True
+
+    def _open(self):
+        db = sqlite3.connect(self.path, isolation_level="DEFERRED")
+        db.execute("PRAGMA journal_mode=WAL")
+        # у WAL режимі NORMAL переживає падіння застосунку; fsync — на checkpoint
+        db.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            db.execute(statement)
+        db.commit()
+        return db
+
+    def _apply(self, db, op: str, value) -> None:
+        try:
+            if op == "append":
+                db.executemany(
+                    "INSERT INTO shots (id, x, y, radius_mm) VALUES (?, ?, ?, ?)",
+                    value,
+                )
+            elif op == "clear":
+                db.execute("DELETE FROM shots")
+            elif op == "archive":
+                self._archive(db, *value)
+            elif op == "meta":
+                db.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    value,
+                )
+        except sqlite3.Error as error:
+            print("Помилка запису локальної сесії:", error)
+
+    def _archive(self, db, finished_at: float, distance_m: float, caliber: str) -> None:
+        (count,) = db.execute("SELECT COUNT(*) FROM shots").fetchone()
+        if not count:
+            return
+        row = db.execute("SELECT value FROM meta WHERE key = ?", (STARTED_AT_KEY,)).fetchone()
+        try:
+            started_at = float(row[0]) if row else None
+        except ValueError:
+            started_at = None
+        cursor = db.execute(
+            "INSERT INTO archive_sessions"
+            " (started_at, finished_at, distance_m, caliber, shot_count)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (started_at, finished_at, distance_m, caliber, count),
+        )
+        db.execute(
+            "INSERT INTO archive_shots (session_id, pos, id, x, y, radius_mm)"
+            " SELECT ?, ROW_NUMBER() OVER (ORDER BY seq) - 1, id, x, y, radius_mm"
+            " FROM shots",
+            (cursor.lastrowid,),
+        )
+        db.execute("DELETE FROM meta WHERE key = ?", (STARTED_AT_KEY,))
+
+    def _commit(self, db) -> bool:
+        try:
+            db.commit()
+        except sqlite3.Error as error:
+            print("Помилка збереження локальної сесії:", error)
+        return False
+
+    def _read_snapshot(self, db) -> SessionSnapshot:
+        snapshot = SessionSnapshot()
+        try:
+            for point_id, x, y, radius_mm in db.execute(
+                "SELECT id, x, y, radius_mm FROM shots ORDER BY seq",
+            ):
+                snapshot.ids.append(point_id)
+                snapshot.xs.append(x)
+                snapshot.ys.append(y)
+                snapshot.radii.append(radius_mm)
+            snapshot.meta = dict(db.execute("SELECT key, value FROM meta"))
+        except sqlite3.Error as error:
+            print("Помилка читання локальної сесії:", error)
+        return snapshot
+
+    def _read_archive_sessions(self, db, offset: int, limit: int):
+        try:
+            (total,) = db.execute("SELECT COUNT(*) FROM archive_sessions").fetchone()
+            rows = [
+                {
+                    "session_id": session_id,
+                    "started_at": started_at,
+                    "finished_at": finished_at,
+                    "distance_m": distance_m,
+                    "caliber": caliber,
+                    "shot_count": shot_count,
+                }
+                for session_id, started_at, finished_at, distance_m, caliber, shot_count
+                in db.execute(
+                    "SELECT session_id, started_at, finished_at, distance_m, caliber,"
+                    " shot_count FROM archive_sessions"
+                    " ORDER BY session_id DESC LIMIT ? OFFSET ?",
+                    (limit, offset),
+                )
+            ]
+        except sqlite3.Error as error:
+            print("Помилка читання архіву:", error)
+            return 0, []
+        return total, rows
+
+    def _read_archive_shots(self, db, session_id: int, offset: int, limit: int):
+        snapshot = SessionSnapshot()
+        try:
+            row = db.execute(
+                "SELECT shot_count FROM archive_sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            for point_id, x, y, radius_mm in db.execute(
+                "SELECT id, x, y, radius_mm FROM archive_shots"
+                " WHERE session_id = ? AND pos >= ? AND pos < ? ORDER BY pos",
+                (session_id, offset, offset + limit),
+            ):
+                snapshot.ids.append(point_id)
+                snapshot.xs.append(x)
+                snapshot.ys.append(y)
+                snapshot.radii.append(radius_mm)
+        except sqlite3.Error as error:
+            print("Помилка читання архіву:", error)
+            return 0, snapshot
+        return (row[0] if row else 0), snapshot
+
+    def _drain_without_db(self) -> None:
+        # без бази все одно відповідаємо на load, щоб старт не завис
+        while True:
+            op, value = self._queue.get()
+            if op == "close":
+                return
+            if op == "load":
+                snapshot = SessionSnapshot()
+                Clock.schedule_once(lambda _dt, cb=value, s=snapshot: cb(s), 0)
+            elif op == "read":
+                # порожній архів: відповідаємо порожнім значенням тієї форми, яку чекає читач
+                _reader, _args, callback, empty = value
+                Clock.schedule_once(lambda _dt, cb=callback, r=empty: cb(*r), 0)
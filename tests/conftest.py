@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Kivy без вікна, аргументів і логів у консоль; модулі — з кореня репозиторію
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+os.environ.setdefault("KIVY_NO_FILELOG", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,117 @@
+from archive import WindowedPager
+
+ROW_HEIGHT = 10.0
+TOTAL = 100
+
+
+class _LayoutManager:
+    default_size = (None, ROW_HEIGHT)
+
+
+class _RecycleView:
+    """Те, що WindowedPager бере з RecycleView, без Kivy."""
+
+    def __init__(self, visible_rows: int):
+        self.data = []
+        self.scroll_y = 1.0
+        self.height = visible_rows * ROW_HEIGHT
+        self.layout_manager = _LayoutManager()
+        self._on_scroll = None
+
+    def bind(self, scroll_y, height):
+        self._on_scroll = scroll_y
+
+    def refresh_views(self):
+        pass
+
+    def scroll_to(self, scroll_y: float):
+        self.scroll_y = scroll_y
+        self._on_scroll()
+
+    def first_visible(self, pager) -> int:
+        """Номер верхнього видимого рядка в повному списку."""
+        overflow = len(self.data) * ROW_HEIGHT - self.height
+        top_px = (1.0 - self.scroll_y) * max(overflow, 0.0)
+        return pager.start + round(top_px / ROW_HEIGHT)
+
+
+def _pager(visible_rows=5):
+    rv = _RecycleView(visible_rows)
+    pager = WindowedPager(rv, page_size=10, window_pages=3, prefetch_rows=3)
+    requests = []
+
+    def fetch(offset, limit, callback):
+        requests.append((offset, limit))
+        callback(TOTAL, list(range(offset, min(offset + limit, TOTAL))))
+
+    pager.reset(fetch, lambda page: [{"n": n} for n in page])
+    return rv, pager, requests
+
+
+def _rows(rv):
+    return [row["n"] for row in rv.data]
+
+
+def test_first_page_and_the_next_one_near_its_end():
+    rv, pager, requests = _pager()
+    assert requests == [(0, 10)]
+    assert _rows(rv) == list(range(10))
+    assert (pager.start, pager.total) == (0, TOTAL)
+
+    rv.scroll_to(0.0)
+    assert requests == [(0, 10), (10, 10)]
+    assert _rows(rv) == list(range(20))
+    # дописане знизу не зсуває видиме
+    assert rv.first_visible(pager) == 5
+
+
+def test_window_slides_down_and_keeps_the_position():
+    rv, pager, requests = _pager()
+    for _ in range(3):
+        rv.scroll_to(0.0)
+    # вікно — не більше трьох сторінок, дальня сторінка зверху відкинута
+    assert requests[-1] == (30, 10)
+    assert _rows(rv) == list(range(10, 40))
+    assert pager.start == 10
+    # той самий рядок лишився нагорі після зсуву вікна
+    assert rv.first_visible(pager) == 25
+
+
+def test_window_slides_back_up():
+    rv, pager, requests = _pager()
+    for _ in range(3):
+        rv.scroll_to(0.0)
+    rv.scroll_to(1.0)
+    assert requests[-1] == (0, 10)
+    assert _rows(rv) == list(range(30))
+    assert pager.start == 0
+    assert rv.first_visible(pager) == 10
+
+
+def test_no_requests_past_either_end():
+    rv, pager, requests = _pager()
+    for _ in range(20):
+        rv.scroll_to(0.0)
+    assert _rows(rv) == list(range(70, 100))
+    assert pager.start + len(rv.data) == TOTAL
+    count = len(requests)
+    rv.scroll_to(0.0)
+    assert len(requests) == count
+
+    for _ in range(20):
+        rv.scroll_to(1.0)
+    assert _rows(rv) == list(range(30))
+    count = len(requests)
+    rv.scroll_to(1.0)
+    assert len(requests) == count
+
+
+def test_late_page_of_a_previous_list_is_ignored():
+    rv = _RecycleView(5)
+    pager = WindowedPager(rv, page_size=10, window_pages=3, prefetch_rows=3)
+    pending = []
+    pager.reset(lambda offset, limit, callback: pending.append(callback), lambda page: page)
+    pager.reset(lambda offset, limit, callback: callback(1, [{"n": "new"}]), lambda page: page)
+    pending[0](TOTAL, [{"n": "old"}])
+    assert _rows(rv) == ["new"]
+    assert pager.total == 1
@@ -0,0 +1,77 @@
+import math
+import random
+
+import pytest
+
+from ballistics import CLICK_VALUES, UNIT_MIL, UNIT_MOA, AdjustmentEngine, mm_per_unit
+
+
+def test_mm_per_unit_at_100_m():
+    assert mm_per_unit(UNIT_MOA, 100.0) == pytest.approx(29.0888, abs=1e-4)
+    assert mm_per_unit(UNIT_MIL, 100.0) == pytest.approx(100.0, abs=1e-3)
+
+
+@pytest.mark.parametrize(
+    "click, value_units, text",
+    [
+        ("1/4 MOA", 1.0, "1"),
+        ("1/4 MOA", 1.01, "1.25"),
+        ("1/8 MOA", 0.3, "0.375"),
+        ("1/2 MOA", 0.2, "0.5"),
+        ("0.1 MIL", 0.26, "0.3"),
+        ("0.1 MIL", 1.2, "1.2"),
+        ("1/4 MOA", 0.0, "0"),
+        ("1/4 MOA", -0.6, "0.75"),
+    ],
+)
+def test_clicks_round_up_to_the_click_value(click, value_units, text):
+    engine = AdjustmentEngine(click)
+    assert engine.format_value(value_units) == text
+
+
+def test_axis_direction_follows_the_sign():
+    engine = AdjustmentEngine("1/4 MOA")
+    one_moa = mm_per_unit(UNIT_MOA, 100.0)
+    assert engine.format_axis(one_moa, 100.0, "U", "D") == ("U", "1")
+    assert engine.format_axis(-one_moa, 100.0, "U", "D") == ("D", "1")
+    # нуль кліків — завжди U/R
+    assert engine.format_axis(0.0, 100.0, "U", "D") == ("U", "0")
+    assert engine.format_adjustment(-one_moa / 2, one_moa * 2, 100.0) == "U 2     L 0.5"
+
+
+def test_configure_switches_units_and_drops_cached_texts():
+    engine = AdjustmentEngine("1/4 MOA")
+    one_mil = mm_per_unit(UNIT_MIL, 50.0)
+    assert engine.format_adjustment(0.0, one_mil, 50.0, shot_id=1) == "U 3.5     R 0"
+    engine.configure("0.1 MIL")
+    assert engine.unit == UNIT_MIL
+    assert engine.format_adjustment(0.0, one_mil, 50.0, shot_id=1) == "U 1     R 0"
+
+
+def test_zero_distance_gives_zero_clicks():
+    engine = AdjustmentEngine()
+    assert engine.batch_clicks([5.0, -3.0], [1.0, 2.0], 0.0) == ([0, 0], [0, 0])
+    assert engine.format_adjustment(5.0, -3.0, 0.0) == "U 0     R 0"
+
+
+@pytest.mark.parametrize("click", list(CLICK_VALUES))
+@pytest.mark.parametrize("with_numpy", [True, False])
+def test_batch_matches_single_shots(monkeypatch, click, with_numpy):
+    import ballistics
+
+    if not with_numpy:
+        monkeypatch.setattr(ballistics, "numpy", lambda: None)
+    elif ballistics.numpy() is None:
+        pytest.skip("NumPy немає в збірці")
+    rng = random.Random(4)
+    xs = [rng.uniform(-150.0, 150.0) for _ in range(300)] + [0.0, -0.0]
+    ys = [rng.uniform(-150.0, 150.0) for _ in range(300)] + [0.0, 1e-9]
+    engine = AdjustmentEngine(click)
+    texts = engine.format_batch(xs, ys, 25.0)
+    assert texts == [engine.format_adjustment(x, y, 25.0) for x, y in zip(xs, ys)]
+    vertical, _horizontal = engine.batch_clicks(xs, ys, 25.0)
+    assert all(isinstance(value, int) for value in vertical)
+    assert vertical[:3] == [
+        int(math.copysign(math.ceil(abs(y) / mm_per_unit(engine.unit, 25.0) / engine.step), y))
+        for y in ys[:3]
+    ]
@@ -0,0 +1,91 @@
+import itertools
+import math
+import random
+import statistics
+
+import pytest
+
+from groups import CEP_SD_FACTOR, GroupStats
+from shots import Shot, ShotStore
+
+
+def _points(count, seed=1):
+    rng = random.Random(seed)
+    return [(rng.gauss(3.0, 8.0), rng.gauss(-2.0, 5.0)) for _ in range(count)]
+
+
+def _assert_matches_direct(group, points):
+    """Те саме, що дає прямий перерахунок по всіх точках."""
+    xs = [x for x, _y in points]
+    ys = [y for _x, y in points]
+    center_x, center_y = statistics.fmean(xs), statistics.fmean(ys)
+    assert group.count == len(points)
+    assert group.mean_x == pytest.approx(center_x)
+    assert group.mean_y == pytest.approx(center_y)
+    assert group.sd_x == pytest.approx(statistics.stdev(xs))
+    assert group.sd_y == pytest.approx(statistics.stdev(ys))
+    assert group.extreme_spread == pytest.approx(
+        max(math.dist(a, b) for a, b in itertools.combinations(points, 2)),
+    )
+    assert group.mean_radius == pytest.approx(
+        statistics.fmean(math.hypot(x - center_x, y - center_y) for x, y in points),
+    )
+    assert group.cep50 == pytest.approx(CEP_SD_FACTOR * (group.sd_x + group.sd_y))
+
+
+@pytest.mark.parametrize("count", [2, 3, 5, 10, 200])
+def test_incremental_stats_match_direct_recomputation(count):
+    points = _points(count)
+    group = GroupStats()
+    for x, y in points:
+        group.add(x, y)
+    _assert_matches_direct(group, points)
+
+
+def test_stats_stay_correct_after_every_shot():
+    points = _points(30, seed=7)
+    group = GroupStats()
+    for size, (x, y) in enumerate(points, start=1):
+        group.add(x, y)
+        if size >= 2:
+            # центр зсувається — середній радіус має перерахуватись
+            _assert_matches_direct(group, points[:size])
+
+
+def test_rebuild_forgets_previous_shots():
+    group = GroupStats()
+    group.extend(*zip(*_points(20, seed=2)))
+    points = _points(6, seed=3)
+    group.rebuild([x for x, _y in points], [y for _x, y in points])
+    _assert_matches_direct(group, points)
+
+
+def test_empty_and_single_shot_groups():
+    group = GroupStats()
+    assert (group.count, group.sd_x, group.extreme_spread, group.mean_radius) == (0, 0.0, 0.0, 0.0)
+    group.add(4.0, -1.0)
+    assert (group.mean_x, group.mean_y) == (4.0, -1.0)
+    assert (group.sd_x, group.sd_y, group.extreme_spread, group.mean_radius) == (0.0, 0.0, 0.0, 0.0)
+
+
+def test_follows_shot_store_events():
+    store = ShotStore()
+    group = GroupStats()
+    store.subscribe(lambda event: group.on_shots_changed(event, store))
+    points = _points(8, seed=5)
+    store.append([Shot(i, x, y) for i, (x, y) in enumerate(points[:5], start=1)])
+    store.append([Shot(i, x, y) for i, (x, y) in enumerate(points[5:], start=6)])
+    _assert_matches_direct(group, points)
+
+    store.clear()
+    assert group.count == 0
+
+
+def test_mean_radius_without_numpy(monkeypatch):
+    import groups
+
+    monkeypatch.setattr(groups, "numpy", lambda: None)
+    points = _points(12, seed=9)
+    group = GroupStats()
+    group.extend(*zip(*points))
+    _assert_matches_direct(group, points)
@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from kivy.clock import Clock
+
+from lanes import Lane
+from perf import PerfMonitor
+from wire import batch_from_json
+
+
+class _Owner:
+    def __init__(self):
+        self.appended = 0
+
+    def handle_lane_restored(self, lane, meta):
+        pass
+
+    def handle_lane_appended(self, lane):
+        self.appended += 1
+
+    def handle_lane_reset(self, lane):
+        pass
+
+
+def _serve(replies):
+    """Сервер, що віддає replies по черзі (останню — й далі) на будь-який GET."""
+    replies = list(replies)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps(replies.pop(0) if len(replies) > 1 else replies[0]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _tick_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError
+        Clock.tick()
+        time.sleep(0.005)
+
+
+@pytest.mark.parametrize("payload", [{"coords": 5}, {"coords": "12"}, {"coords": [1, 2]}])
+def test_batch_from_json_rejects_malformed_coords(payload):
+    with pytest.raises(ValueError):
+        batch_from_json(payload)
+
+
+def test_polling_survives_malformed_reply():
+    server = _serve([
+        {"coords": 5},
+        {"coords": [{"id": 1, "x": 1.0, "y": 2.0}]},
+    ])
+    owner = _Owner()
+    lane = Lane(
+        "1",
+        f"http://127.0.0.1:{server.server_address[1]}",
+        owner,
+        PerfMonitor(),
+        lambda: 2.8,
+        poll_interval=0.01,
+        stream_enabled=False,
+    )
+    try:
+        lane.poller.error_max_interval = 0.05
+        lane.poller.start()
+        # зіпсована відповідь — помилка, а не мертвий потік і вічне очікування
+        _tick_until(lambda: lane.poller.errors == 1)
+        assert lane.http._thread.is_alive()
+        # опитування триває й підхоплює наступну коректну відповідь
+        _tick_until(lambda: len(lane.shots) == 1)
+        assert owner.appended == 1
+        assert lane.last_id == 1
+    finally:
+        lane.stop()
+        server.shutdown()
+
+
+def _stream_threads():
+    return [t for t in threading.enumerate() if t.name == "coord-stream" and t.is_alive()]
+
+
+def test_stream_pause_resume_keeps_one_reader():
+    import local_server
+
+    server, feed, _stats = local_server.serve(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    lane = Lane(
+        "1",
+        f"http://127.0.0.1:{server.server_address[1]}",
+        _Owner(),
+        PerfMonitor(),
+        lambda: 2.8,
+    )
+    try:
+        lane.start_live_updates()
+        _tick_until(lambda: lane.stream.connected)
+        for _ in range(3):
+            lane.pause()
+            started = time.perf_counter()
+            lane.resume()
+            # resume не чекає старого потоку
+            assert time.perf_counter() - started < 0.2
+            _tick_until(lambda: lane.stream.connected)
+        # старі читачі розблоковані й завершились
+        _tick_until(lambda: len(_stream_threads()) == 1)
+
+        feed.add(1.0, 2.0)
+        _tick_until(lambda: len(lane.shots) == 1)
+        deadline = time.monotonic() + 0.3
+        while time.monotonic() < deadline:
+            Clock.tick()
+            time.sleep(0.01)
+        # кожна подія — рівно один раз
+        assert len(lane.shots) == 1
+    finally:
+        lane.stop()
+        server.shutdown()
+
+
+def test_resume_falls_back_to_polling_when_stream_cannot_reconnect():
+    import local_server
+
+    server, _feed, _stats = local_server.serve(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    lane = Lane(
+        "1",
+        f"http://127.0.0.1:{server.server_address[1]}",
+        _Owner(),
+        PerfMonitor(),
+        lambda: 2.8,
+    )
+    try:
+        lane.start_live_updates()
+        # підключений стрім зупиняє опитування
+        _tick_until(lambda: lane.stream.connected and not lane.poller.running)
+
+        lane.pause()
+        # сервер зник, поки доріжка була на паузі
+        server.shutdown()
+        server.server_close()
+        lane.resume()
+        _tick_until(lambda: lane.stream.reconnects > 0)
+        assert not lane.stream.connected
+        assert lane.poller.running
+    finally:
+        lane.stop()
@@ -0,0 +1,25 @@
+from perf import STAGE_RENDER, STAGE_TOTAL, PerfMonitor
+
+
+def test_render_is_timed_only_for_batches_drawn_before_the_frame():
+    perf = PerfMonitor()
+    shown, hidden = object(), object()
+    perf.record_batch(1, sent_at=0.0, received_at=0.0, source=shown)
+    perf.record_batch(1, sent_at=0.0, received_at=0.0, source=hidden)
+
+    # кадр до малювання дошки нічого не закриває, а непоказане відкидає
+    perf.on_frame()
+    assert perf.stages[STAGE_RENDER].count == 0
+
+    perf.record_batch(2, source=shown)
+    perf.record_batch(1, source=hidden)
+    perf.mark_rendered(shown)
+    perf.on_frame()
+    assert perf.stages[STAGE_RENDER].count == 1
+    # без позначки відправлення total не рахується
+    assert perf.stages[STAGE_TOTAL].count == 0
+
+    # прихована пачка не дочекалась свого кадру й пізніше не зарахується
+    perf.mark_rendered(hidden)
+    perf.on_frame()
+    assert perf.stages[STAGE_RENDER].count == 1
@@ -0,0 +1,50 @@
+from array import array
+
+import pytest
+
+from shots import DEFAULT_RADIUS_MM, SHOTS_APPENDED, SHOTS_CLEARED, Shot, ShotStore
+
+
+def test_store_behaves_like_a_sequence_of_shots():
+    store = ShotStore([{"id": 5, "x": 1.0, "y": 2.0}, Shot(7, -1.0, 0.5, 3.0)])
+    assert len(store) == 2
+    assert store[0] == Shot(5, 1.0, 2.0, DEFAULT_RADIUS_MM)
+    assert store[-1].radius_mm == 3.0
+    assert [shot.id for shot in store] == [5, 7]
+    assert [shot.id for shot in reversed(store)] == [7, 5]
+    assert [shot.id for shot in store[1:]] == [7]
+    assert store.last["x"] == -1.0
+    with pytest.raises(IndexError):
+        store[2]
+
+
+def test_id_index_follows_appends_and_clear():
+    store = ShotStore()
+    store.append([Shot(10, 0.0, 0.0)])
+    store.append_columns(
+        array("q", [11, 12]),
+        array("d", [1.0, 2.0]),
+        array("d", [3.0, 4.0]),
+        array("d", [2.8, 2.8]),
+    )
+    assert store.index_of(12) == 2
+    assert store.get_by_id(11) == Shot(11, 1.0, 3.0, 2.8)
+    assert store.get_by_id(99) is None
+
+    store.clear()
+    assert not store
+    assert store.index_of(10) == -1
+    assert store.last is None
+
+
+def test_listeners_get_one_delta_per_change():
+    store = ShotStore()
+    events = []
+    store.subscribe(lambda event: events.append((event.kind, event.start, event.count)))
+    store.append([Shot(1, 0.0, 0.0), Shot(2, 0.0, 0.0)])
+    store.append_columns(array("q", [3]), array("d", [0.0]), array("d", [0.0]), array("d", [2.8]))
+    # пусті зміни нікого не будять
+    store.append([])
+    store.clear()
+    store.clear()
+    assert events == [(SHOTS_APPENDED, 0, 2), (SHOTS_APPENDED, 2, 1), (SHOTS_CLEARED, 0, 3)]
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from spatial import ShotGrid
+
+
+def _grid(points, cell_mm=5.0):
+    grid = ShotGrid(cell_mm)
+    for point_id, (x, y, radius) in enumerate(points, start=1):
+        grid.add(point_id, x, y, radius)
+    return grid
+
+
+def test_hit_prefers_the_topmost_hole():
+    grid = _grid([(0.0, 0.0, 3.0), (1.0, 0.0, 3.0), (20.0, 20.0, 3.0)])
+    assert grid.hit(0.5, 0.0) == 2
+    assert grid.hit(-2.5, 0.0) == 1
+    assert grid.hit(21.0, 19.0) == 3
+    assert grid.hit(10.0, 10.0) is None
+
+
+def test_hit_falls_back_to_the_nearest_edge_within_tolerance():
+    grid = _grid([(0.0, 0.0, 2.0), (10.0, 0.0, 2.0)])
+    assert grid.hit(3.0, 0.0) is None
+    assert grid.hit(3.0, 0.0, tolerance=1.5) == 1
+    assert grid.hit(7.5, 0.0, tolerance=1.0) == 2
+
+
+def test_hit_across_cell_borders():
+    # отвір більший за клітинку: центр в одній клітинці, дотик — у сусідній
+    grid = _grid([(4.9, 4.9, 3.0)], cell_mm=1.0)
+    assert grid.hit(7.0, 6.5) == 1
+
+
+def test_truncate_matches_a_grid_built_from_the_prefix():
+    rng = random.Random(3)
+    points = [(rng.uniform(-30, 30), rng.uniform(-30, 30), 2.8) for _ in range(200)]
+    grid = _grid(points, cell_mm=4.0)
+    grid.truncate(120)
+    expected = _grid(points[:120], cell_mm=4.0)
+
+    assert list(grid.ids) == list(expected.ids)
+    clusters = dict(grid.clusters_in(-40, -40, 40, 40))
+    expected_clusters = dict(expected.clusters_in(-40, -40, 40, 40))
+    assert clusters.keys() == expected_clusters.keys()
+    for cell, cluster in clusters.items():
+        # суми клітинки віднімаються, тож центри — з точністю до округлення
+        assert cluster == pytest.approx(expected_clusters[cell])
+    for x, y, _radius in points[120:]:
+        assert grid.hit(x, y) == expected.hit(x, y)
+
+
+def test_truncate_to_zero_empties_the_cells():
+    grid = _grid([(1.0, 1.0, 2.0), (2.0, 2.0, 2.0)])
+    grid.truncate(0)
+    assert len(grid) == 0
+    assert grid.clusters_in(-10, -10, 10, 10) == []
+    assert grid.hit(1.0, 1.0) is None
+
+
+def test_clusters_in_sums_each_cell():
+    grid = _grid([(1.0, 1.0, 2.0), (3.0, 2.0, 2.0), (7.0, 1.0, 2.0), (50.0, 50.0, 2.0)])
+    clusters = dict(grid.clusters_in(0, 0, 9.9, 9.9))
+    assert clusters == {
+        (0, 0): (2.0, 1.5, 2, -1),
+        # одиночний постріл — як є, з індексом
+        (1, 0): (7.0, 1.0, 1, 2),
+    }
+    assert grid.count_in(0, 0, 9.9, 9.9) == 3
+
+
+def test_indices_in_keeps_drawing_order_and_reaches_into_neighbour_cells():
+    grid = _grid([(12.0, 0.0, 3.0), (0.0, 0.0, 1.0), (-20.0, 0.0, 1.0), (5.5, 0.0, 1.0)])
+    # перший отвір зачіпає прямокутник краєм, хоч центр і поза ним
+    assert grid.indices_in(-1.0, -1.0, 9.5, 1.0) == [0, 1, 3]
+
+
+def test_rebuild_keeps_the_records():
+    grid = _grid([(1.0, 1.0, 2.0), (8.0, 8.0, 2.0)], cell_mm=10.0)
+    grid.rebuild(1.0)
+    assert grid.cell_mm == 1.0
+    assert grid.cell_of(1) == (8, 8)
+    assert grid.hit(8.0, 8.0) == 2
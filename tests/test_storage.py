@@ -0,0 +1,31 @@
+import time
+
+from kivy.clock import Clock
+
+from storage import SessionSnapshot, SessionStore
+
+
+def _tick_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "не дочекались відповіді сховища"
+        Clock.tick()
+        time.sleep(0.005)
+
+
+def test_reads_without_database_get_empty_values_of_their_shape(tmp_path):
+    # тека замість файлу — база не відкривається
+    store = SessionStore(str(tmp_path))
+    answers = {}
+    try:
+        store.read_archive_sessions(0, 10, lambda total, rows: answers.update(sessions=(total, rows)))
+        store.read_archive_shots(1, 0, 10, lambda total, snapshot: answers.update(shots=(total, snapshot)))
+        _tick_until(lambda: len(answers) == 2)
+    finally:
+        store.close()
+
+    assert answers["sessions"] == (0, [])
+    total, snapshot = answers["shots"]
+    assert total == 0
+    assert isinstance(snapshot, SessionSnapshot)
+    assert len(snapshot) == 0 and not len(snapshot.xs)
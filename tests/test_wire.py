@@ -0,0 +1,87 @@
+import math
+from array import array
+
+import pytest
+
+from wire import COORDS_BINARY_TYPE, batch_from_json, decode_binary, decode_coords, encode_binary
+
+
+def test_batch_from_json_skips_bad_points_and_repeats():
+    batch = batch_from_json({
+        "session": 7,
+        "coords": [
+            {"id": 1, "x": 1.5, "y": -2.0, "t": 10.0},
+            {"id": "x", "x": 3.0, "y": 3.0},
+            {"id": 1, "x": 9.0, "y": 9.0},
+            {"id": 2, "x": "nan", "y": 1.0},
+            {"id": 3, "x": None, "y": 4.0, "t": 12.5},
+        ],
+    })
+    assert list(batch.ids) == [1, 2, 3]
+    assert list(batch.xs) == [1.5, 0.0, 0.0]
+    assert list(batch.ys) == [-2.0, 0.0, 0.0]
+    assert batch.session == "7"
+    assert batch.server_time == 12.5
+    assert (batch.min_id, batch.max_id) == (1, 3)
+
+
+@pytest.mark.parametrize("payload", [None, {}, {"coords": None}, [], "text"])
+def test_batch_from_json_without_coords_is_empty(payload):
+    batch = batch_from_json(payload)
+    assert len(batch) == 0
+    assert batch.max_id == -1
+
+
+def test_decode_coords_rejects_broken_json():
+    with pytest.raises(ValueError):
+        decode_coords("application/json", b"{\"coords\": [")
+
+
+def test_binary_round_trip():
+    ids = [3, 1, 2]
+    xs = [0.5, -104.25, 148.5]
+    ys = [-0.75, 2.0, 0.0]
+    data = encode_binary(ids, xs, ys, session="s-1")
+    batch = decode_coords(COORDS_BINARY_TYPE, data)
+    assert list(batch.ids) == ids
+    # float32 на дроті: порівнюємо з точністю до нього
+    assert all(math.isclose(a, b, abs_tol=1e-5) for a, b in zip(batch.xs, xs))
+    assert all(math.isclose(a, b, abs_tol=1e-5) for a, b in zip(batch.ys, ys))
+    assert batch.session == "s-1"
+
+
+def test_binary_without_session_and_shots():
+    batch = decode_binary(encode_binary([], [], []))
+    assert len(batch) == 0
+    assert batch.session is None
+
+
+def test_binary_repeats_and_nan_go_through_json_rules():
+    batch = decode_binary(encode_binary([1, 1, 2], [1.0, 5.0, float("nan")], [2.0, 6.0, 3.0]))
+    assert list(batch.ids) == [1, 2]
+    assert list(batch.xs) == [1.0, 0.0]
+    assert list(batch.ys) == [2.0, 0.0]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"CRD",
+        b"NOPE" + bytes(8),
+        encode_binary([1], [1.0], [1.0])[:-1],
+        encode_binary([1], [1.0], [1.0]) + b"\0",
+    ],
+)
+def test_decode_binary_rejects_malformed_data(data):
+    with pytest.raises(ValueError):
+        decode_binary(data)
+
+
+def test_batch_after_keeps_only_newer_points():
+    batch = batch_from_json([{"id": i, "x": i, "y": -i} for i in (4, 5, 6)])
+    assert batch.after(3) is batch
+    newer = batch.after(4)
+    assert list(newer.ids) == [5, 6]
+    assert list(newer.ys) == [-5.0, -6.0]
+    assert len(batch.after(6)) == 0
+    assert isinstance(newer.ids, array)
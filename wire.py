@@ -0,0 +1,187 @@
+import json
+import math
+import struct
+import sys
+from array import array
+
+try:  # orjson не обовʼязковий: без нього — стандартний json
+    import orjson
+
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - залежить від збірки
+    orjson = None
+    loads = json.loads
+
+# компактний бінарний формат відповідей /coords/*:
+#   заголовок "<4sHHI": магія, довжина токена сесії (utf-8), резерв, кількість;
+#   токен сесії; далі колонки int32 id[n], float32 x[n], float32 y[n] (little-endian)
+COORDS_BINARY_TYPE = "application/x-coords"
+COORDS_BINARY_MAGIC = b"CRD1"
+COORDS_ACCEPT = f"{COORDS_BINARY_TYPE}, application/json;q=0.9"
+_HEADER = struct.Struct("<4sHHI")
+_SWAP_BYTES = sys.byteorder != "little"
+
+# поле відповіді з токеном сесії сервера; новий токен (після /coords/clear
+# чи перезапуску сервера) означає, що наш last_id уже нічого не важить
+SERVER_SESSION_KEYS = ("session", "epoch")
+
+
+class CoordBatch:
+    """Розібрана й перевірена пачка координат — готова до ShotStore.append_columns."""
+
+    __slots__ = ("ids", "xs", "ys", "session", "min_id", "max_id", "server_time")
+
+    def __init__(self, ids=None, xs=None, ys=None, session=None, server_time=None):
+        self.ids = ids if ids is not None else array("q")
+        self.xs = xs if xs is not None else array("d")
+        self.ys = ys if ys is not None else array("d")
+        self.session = session
+        # time.time() найновішого пострілу на сервері (поле t), якщо сервер його дає
+        self.server_time = server_time
+        self.min_id = min(self.ids) if self.ids else -1
+        self.max_id = max(self.ids) if self.ids else -1
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __repr__(self) -> str:
+        return f"CoordBatch({len(self.ids)} shots, session={self.session!r})"
+
+    def after(self, last_id: int) -> "CoordBatch":
+        """Лише точки з id > last_id (стрім і опитування можуть перетнутись)."""
+        if self.min_id > last_id:
+            return self
+        keep = [i for i, point_id in enumerate(self.ids) if point_id > last_id]
+        return CoordBatch(
+            array("q", [self.ids[i] for i in keep]),
+            array("d", [self.xs[i] for i in keep]),
+            array("d", [self.ys[i] for i in keep]),
+            self.session,
+            self.server_time,
+        )
+
+
+def session_of(payload):
+    """Токен сесії з JSON-відповіді або None, якщо сервер його не віддає."""
+    if not isinstance(payload, dict):
+        return None
+    for key in SERVER_SESSION_KEYS:
+        token = payload.get(key)
+        if token is not None:
+            return str(token)
+    return None
+
+
+def decode_coords(content_type: str, data: bytes) -> CoordBatch:
+    """Декодує тіло відповіді /coords/* (JSON або бінарне). Для фонового потоку."""
+    if COORDS_BINARY_TYPE in content_type:
+        return decode_binary(data)
+    return batch_from_json(loads(data) if data else None)
+
+
+def decode_event(data: str) -> CoordBatch:
+    """Декодує data однієї SSE-події стріму."""
+    return batch_from_json(loads(data))
+
+
+def batch_from_json(payload) -> CoordBatch:
+    """{"coords": [...]} або просто список -> CoordBatch.
+
+    Точки без коректного id пропускаються, некоректні x/y стають 0.0,
+    повтори id у межах пачки відкидаються. coords не список або точка не
+    обʼєкт — ValueError, як і для зіпсованого JSON.
+    """
+    if isinstance(payload, dict):
+        coords = payload.get("coords")
+        if coords is None:
+            coords = []
+    elif isinstance(payload, list):
+        coords = payload
+    else:
+        coords = []
+    if not isinstance(coords, list):
+        raise ValueError(f"coords має бути списком, а не {type(coords).__name__}")
+
+    ids = array("q")
+    xs = array("d")
+    ys = array("d")
+    seen = set()
+    for item in coords:
+        if not isinstance(item, dict):
+            raise ValueError(f"точка має бути обʼєктом, а не {type(item).__name__}")
+        try:
+            point_id = int(item.get("id"))
+        except Exception:
+            continue
+        if point_id in seen:
+            continue
+        seen.add(point_id)
+        try:
+            x = float(item.get("x", 0.0))
+            y = float(item.get("y", 0.0))
+        except Exception:
+            x, y = 0.0, 0.0
+        if not (math.isfinite(x) and math.isfinite(y)):
+            x, y = 0.0, 0.0
+        ids.append(point_id)
+        xs.append(x)
+        ys.append(y)
+    return CoordBatch(ids, xs, ys, session_of(payload), _server_time(coords))
+
+
+def _server_time(coords):
+    try:
+        return float(coords[-1]["t"])
+    except Exception:
+        return None
+
+
+def decode_binary(data: bytes) -> CoordBatch:
+    if len(data) < _HEADER.size:
+        raise ValueError("coords: обрізаний заголовок")
+    magic, session_len, _reserved, count = _HEADER.unpack_from(data)
+    if magic != COORDS_BINARY_MAGIC:
+        raise ValueError("coords: невідомий формат")
+    offset = _HEADER.size
+    body_len = session_len + count * 12
+    if len(data) - offset != body_len:
+        raise ValueError("coords: довжина не збігається з заголовком")
+
+    session = data[offset:offset + session_len].decode("utf-8") or None
+    offset += session_len
+    columns = []
+    for typecode in ("i", "f", "f"):
+        column = array(typecode)
+        column.frombytes(data[offset:offset + count * 4])
+        if _SWAP_BYTES:
+            column.byteswap()
+        columns.append(column)
+        offset += count * 4
+
+    raw_ids, raw_xs, raw_ys = columns
+    batch = CoordBatch(array("q", raw_ids), array("d", raw_xs), array("d", raw_ys), session)
+    if len(set(batch.ids)) != count or not all(map(math.isfinite, raw_xs + raw_ys)):
+        # рідкісний випадок — хай розбирає той самий код, що й для JSON
+        return batch_from_json(
+            {
+                "session": session,
+                "coords": [
+                    {"id": point_id, "x": x, "y": y}
+                    for point_id, x, y in zip(batch.ids, batch.xs, batch.ys)
+                ],
+            },
+        )
+    return batch
+
+
+def encode_binary(ids, xs, ys, session=None) -> bytes:
+    """Зворотне до decode_binary (для сервера-заглушки й бенчмарків)."""
+    token = (session or "").encode("utf-8")
+    columns = (array("i", ids), array("f", xs), array("f", ys))
+    if _SWAP_BYTES:
+        for column in columns:
+            column.byteswap()
+    return b"".join(
+        [_HEADER.pack(COORDS_BINARY_MAGIC, len(token), 0, len(columns[0])), token]
+        + [column.tobytes() for column in columns],
+    )